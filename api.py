@@ -0,0 +1,554 @@
+"""HTTP JSON API tanpa UI untuk integrasi massal (registrar, sinkronisasi LMS).
+
+Memakai fungsi data layer app.py yang sama dengan halaman Streamlit, jadi tidak
+ada rerun skrip per permintaan. Proses ini boleh berjalan bersamaan dengan
+`streamlit run app.py` pada file database yang sama: tulisan tiap proses lewat
+writer tunggalnya (BEGIN IMMEDIATE + busy_timeout), dan query cache tiap proses
+dibuang saat proses lain melakukan commit (PRAGMA data_version di thread writer).
+
+Semua endpoint memerlukan header `Authorization: Bearer <token>`. Listing memakai
+paginasi kursor: kirim balik `next_cursor` sebagai parameter `cursor`.
+
+    GET    /api/v1/health
+    GET    /api/v1/users?search=&role=&jurusan=&cursor=&limit=
+    POST   /api/v1/users                 {"users": [...], "default_password": "..."}
+    PATCH  /api/v1/users                 {"users": [{"id": 1, "nickname": "..."}, ...]}
+    GET    /api/v1/users/<id>            PATCH /api/v1/users/<id>
+    GET    /api/v1/tasks?mata_kuliah=&cursor=&limit=
+    POST   /api/v1/tasks                 {"tasks": [{"title", "description", "mata_kuliah", "target_jurusan", ...}]}
+    GET    /api/v1/tasks/<id>            PATCH, DELETE /api/v1/tasks/<id>
+    GET    /api/v1/materials?mata_kuliah=
+    POST   /api/v1/materials             {"materials": [{"title", "link", "mata_kuliah", "target_jurusan", ...}]}
+    GET    /api/v1/materials/<id>        PATCH, DELETE /api/v1/materials/<id>
+    GET    /api/v1/answers?mata_kuliah=&task_id=&status=&username=&cursor=&limit=
+    POST   /api/v1/answers               {"user_id": 1, "task_id": 2}  (draft baru, atau yang sudah ada)
+    GET    /api/v1/answers/<id>
+    PUT    /api/v1/answers/<id>/draft    {"answer": "..."}  (202: ditulis lewat buffer draft)
+    POST   /api/v1/answers/<id>/submit   {"answer": "..."}  (answer opsional)
+    PUT    /api/v1/answers/<id>/score    {"score": 90, "feedback": "..."}
+    POST   /api/v1/scores                {"grades": [{"answer_id": 1, "score": 90, "feedback": "..."}]}
+    GET    /api/v1/gradebook?format=csv|parquet&mata_kuliah=&task_id=&status=&from=&to=&include_answer=1
+
+Contoh:
+    python api.py --port 8502 --token rahasia
+    curl -H "Authorization: Bearer rahasia" "localhost:8502/api/v1/users?role=student&limit=500"
+    curl -X POST -H "Authorization: Bearer rahasia" -d '{"grades": [{"answer_id": 1, "score": 90}]}' \\
+        localhost:8502/api/v1/scores
+"""
+import argparse
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import streamlit.config
+import streamlit.logger
+import tornado.ioloop
+import tornado.web
+
+# app.py dipakai di luar `streamlit run`; peringatan "bare mode" tidak relevan di sini
+streamlit.config.set_option("global.showWarningOnDirectExecution", False)
+streamlit.logger.set_log_level("error")
+
+import app  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+API_PREFIX = "/api/v1"
+API_DEFAULT_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+API_MAX_BATCH = 10000
+API_GRADEBOOK_CHUNK_BYTES = 256 * 1024
+
+USER_FIELDS = ("id", "username", "role", "nickname", "jurusan", "mata_kuliah")
+TASK_LIST_FIELDS = ("id", "title", "mata_kuliah", "target_jurusan", "created_by", "created_at", "deadline")
+TASK_FIELDS = ("id", "title", "description", "mata_kuliah", "target_jurusan", "created_by", "created_at", "deadline")
+MATERIAL_FIELDS = ("id", "title", "link", "mata_kuliah", "target_jurusan", "created_by", "created_at")
+ANSWER_LIST_FIELDS = ("id", "task_id", "task_title", "mata_kuliah", "username", "answer_preview",
+                      "score", "status", "submitted_at", "finalized_at")
+ANSWER_FIELDS = ("id", "task_id", "task_title", "mata_kuliah", "username", "answer", "score", "feedback",
+                 "status", "submitted_at", "finalized_at")
+
+def to_dict(fields, row):
+    item = dict(zip(fields, row))
+    if isinstance(item.get("target_jurusan"), str):
+        item["target_jurusan"] = json.loads(item["target_jurusan"])
+    return item
+
+def encode_cursor(cursor):
+    return None if cursor is None else json.dumps(cursor)
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+# Bentuk kursor per listing, sama dengan next_cursor yang dikembalikan helper halaman app.py
+def user_cursor(cursor):
+    return isinstance(cursor, str)
+
+def task_cursor(cursor):
+    return isinstance(cursor, list) and len(cursor) == 2 and isinstance(cursor[0], str) and is_int(cursor[1])
+
+def decode_cursor(text, valid):
+    """Kursor dari parameter `cursor`; `valid(cursor)` memeriksa bentuknya untuk endpoint ini"""
+    if not text:
+        return None
+    try:
+        cursor = json.loads(text)
+    except ValueError:
+        cursor = None
+    if cursor is None or not valid(cursor):
+        raise tornado.web.HTTPError(400, "cursor tidak valid")
+    return cursor
+
+class ApiHandler(tornado.web.RequestHandler):
+    """Dasar semua endpoint: autentikasi token, body JSON, dan eksekusi data layer di thread pool"""
+
+    def initialize(self, token, executor):
+        self.token = token
+        self.executor = executor
+
+    def prepare(self):
+        header = self.request.headers.get("Authorization", "")
+        if not hmac.compare_digest(header.encode(), f"Bearer {self.token}".encode()):
+            raise tornado.web.HTTPError(401, "token tidak valid")
+
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def write_error(self, status_code, **kwargs):
+        exc = kwargs.get("exc_info", (None, None, None))[1]
+        message = exc.log_message if isinstance(exc, tornado.web.HTTPError) and exc.log_message else self._reason
+        self.finish({"error": message})
+
+    async def call(self, func, *args, **kwargs):
+        """Fungsi data layer bersifat blocking (sqlite3); jalankan di luar event loop"""
+        return await tornado.ioloop.IOLoop.current().run_in_executor(
+            self.executor, lambda: func(*args, **kwargs)
+        )
+
+    def body(self):
+        try:
+            data = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise tornado.web.HTTPError(400, "body bukan JSON yang valid") from None
+        if not isinstance(data, dict):
+            raise tornado.web.HTTPError(400, "body harus berupa objek JSON")
+        return data
+
+    def batch(self, data, name):
+        items = data.get(name)
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise tornado.web.HTTPError(400, f"'{name}' harus berupa list objek")
+        if len(items) > API_MAX_BATCH:
+            raise tornado.web.HTTPError(413, f"maksimal {API_MAX_BATCH} item per permintaan")
+        return items
+
+    def int_argument(self, name, default=None):
+        value = self.get_query_argument(name, None)
+        if value in (None, ""):
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise tornado.web.HTTPError(400, f"'{name}' harus berupa angka") from None
+
+    def date_argument(self, name):
+        value = self.get_query_argument(name, "").strip()
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise tornado.web.HTTPError(400, f"'{name}' harus tanggal ISO (YYYY-MM-DD)") from None
+
+    def page_limit(self):
+        return max(1, min(self.int_argument("limit", API_DEFAULT_PAGE_SIZE), API_MAX_PAGE_SIZE))
+
+    def text_argument(self, name):
+        return self.get_query_argument(name, "").strip() or None
+
+    def page(self, fields, rows, next_cursor):
+        self.finish({"items": [to_dict(fields, row) for row in rows], "next_cursor": encode_cursor(next_cursor)})
+
+def require_text(item, *names):
+    invalid = [name for name in names if not isinstance(item.get(name), str) or not item[name].strip()]
+    if invalid:
+        raise tornado.web.HTTPError(400, f"kolom wajib kosong atau bukan teks: {', '.join(invalid)}")
+
+def created_by_value(item):
+    value = item.get("created_by") or "API"
+    if not isinstance(value, str):
+        raise tornado.web.HTTPError(400, "created_by harus berupa teks")
+    return value
+
+def target_jurusan_value(value):
+    if not isinstance(value, list) or not value or not all(isinstance(j, str) and j.strip() for j in value):
+        raise tornado.web.HTTPError(400, "target_jurusan harus berupa list nama jurusan (string) yang tidak kosong")
+    return value
+
+def deadline_value(value):
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise tornado.web.HTTPError(400, "deadline harus tanggal ISO (YYYY-MM-DD)") from None
+
+def optional_text(item, name):
+    value = item.get(name)
+    if value is not None and not isinstance(value, str):
+        raise tornado.web.HTTPError(400, f"{name} harus berupa teks")
+    return value
+
+def password_value(value):
+    if not isinstance(value, str) or len(value) < app.MIN_PASSWORD_LENGTH:
+        raise tornado.web.HTTPError(400, f"password harus teks minimal {app.MIN_PASSWORD_LENGTH} karakter")
+    return value
+
+def user_change(item, user):
+    """Tuple update_users_info() untuk `item`, divalidasi terhadap baris `user` saat ini.
+
+    Role tidak bisa diubah (sama seperti direktori user di halaman admin); jurusan hanya
+    untuk student dan mata_kuliah hanya untuk lecturer.
+    """
+    role = item.get("role")
+    if role is not None and role not in app.USER_ROLES:
+        raise tornado.web.HTTPError(400, f"role harus salah satu dari {', '.join(app.USER_ROLES)}")
+    if role is not None and role != user[2]:
+        raise tornado.web.HTTPError(400, "role tidak bisa diubah")
+    username, nickname, jurusan, mata_kuliah = (
+        optional_text(item, name) for name in ("username", "nickname", "jurusan", "mata_kuliah")
+    )
+    if username is not None and not username.strip():
+        raise tornado.web.HTTPError(400, "username tidak boleh kosong")
+    if jurusan and user[2] != "student":
+        raise tornado.web.HTTPError(400, "jurusan hanya untuk user student")
+    if mata_kuliah and user[2] != "lecturer":
+        raise tornado.web.HTTPError(400, "mata_kuliah hanya untuk user lecturer")
+    return (user[0], username and username.strip(), nickname, jurusan, mata_kuliah)
+
+def answer_text_value(item):
+    value = item.get("answer")
+    if not isinstance(value, str) or not value.strip():
+        raise tornado.web.HTTPError(400, "answer harus berupa teks yang tidak kosong")
+    return value
+
+def score_value(value):
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= 100:
+        raise tornado.web.HTTPError(400, "score harus bilangan bulat 0-100")
+    return value
+
+# ========== HEALTH ==========
+class HealthHandler(ApiHandler):
+    async def get(self):
+        health = await self.call(app.bootstrap)
+        self.finish({**health, "query_cache": app.query_cache.stats()["entries"], "writers": app.writer_stats()})
+
+# ========== USERS ==========
+class UsersHandler(ApiHandler):
+    async def get(self):
+        rows, next_cursor = await self.call(
+            app.search_users, self.text_argument("search"), self.text_argument("role"),
+            self.text_argument("jurusan"), decode_cursor(self.get_query_argument("cursor", None), user_cursor),
+            self.page_limit(),
+        )
+        self.page(USER_FIELDS, rows, next_cursor)
+
+    async def post(self):
+        data = self.body()
+        result = await self.call(app.import_users, self.batch(data, "users"), data.get("default_password", ""))
+        self.set_status(201 if result["inserted"] else 200)
+        self.finish({
+            "inserted": result["inserted"],
+            "errors": [{"index": number - 1, "username": username, "error": error}
+                       for number, username, error in result["errors"]],
+        })
+
+    async def patch(self):
+        items = self.batch(self.body(), "users")
+        for item in items:
+            if not is_int(item.get("id")):
+                raise tornado.web.HTTPError(400, "setiap user wajib punya 'id' (angka)")
+            if "password" in item:
+                raise tornado.web.HTTPError(400, "password hanya bisa diubah lewat PATCH /users/<id>")
+        users = await self.call(lambda: [app.get_user_by_id(item["id"]) for item in items])
+        missing = [item["id"] for item, user in zip(items, users) if user is None]
+        if missing:
+            raise tornado.web.HTTPError(404, f"user tidak ditemukan: {', '.join(map(str, missing))}")
+        changes = [user_change(item, user) for item, user in zip(items, users)]
+        try:
+            updated = await self.call(app.update_users_info, changes)
+        except sqlite3.IntegrityError:
+            raise tornado.web.HTTPError(409, "username sudah dipakai; tidak ada perubahan disimpan") from None
+        self.finish({"updated": updated})
+
+class UserHandler(ApiHandler):
+    async def get(self, user_id):
+        row = await self.call(app.get_user_by_id, int(user_id))
+        if row is None:
+            raise tornado.web.HTTPError(404, "user tidak ditemukan")
+        self.finish(to_dict(USER_FIELDS, row))
+
+    async def patch(self, user_id):
+        data = self.body()
+        user = await self.call(app.get_user_by_id, int(user_id))
+        if user is None:
+            raise tornado.web.HTTPError(404, "user tidak ditemukan")
+        change = user_change(data, user)
+        password = password_value(data["password"]) if "password" in data else None
+        try:
+            await self.call(app.update_users_info, [change])
+        except sqlite3.IntegrityError:
+            raise tornado.web.HTTPError(409, "username sudah dipakai") from None
+        if password is not None:
+            await self.call(app.update_user_password, int(user_id), password)
+        self.finish(to_dict(USER_FIELDS, await self.call(app.get_user_by_id, int(user_id))))
+
+# ========== TASKS ==========
+class TasksHandler(ApiHandler):
+    async def get(self):
+        rows, next_cursor = await self.call(
+            app.get_tasks_page, self.text_argument("mata_kuliah"),
+            decode_cursor(self.get_query_argument("cursor", None), task_cursor), self.page_limit(),
+        )
+        self.page(TASK_LIST_FIELDS, rows, next_cursor)
+
+    async def post(self):
+        tasks = []
+        for item in self.batch(self.body(), "tasks"):
+            require_text(item, "title", "description", "mata_kuliah")
+            tasks.append((item["title"], item["description"], item["mata_kuliah"],
+                          target_jurusan_value(item.get("target_jurusan")), created_by_value(item),
+                          deadline_value(item.get("deadline"))))
+        # Satu transaksi untuk seluruh batch: gagal satu, tidak ada yang disimpan
+        ids = await self.call(app.add_tasks, tasks)
+        self.set_status(201 if ids else 200)
+        self.finish({"inserted": len(ids), "ids": ids})
+
+class TaskHandler(ApiHandler):
+    async def get(self, task_id):
+        row = await self.call(app.get_task, int(task_id))
+        if row is None:
+            raise tornado.web.HTTPError(404, "tugas tidak ditemukan")
+        self.finish(to_dict(TASK_FIELDS, row))
+
+    async def patch(self, task_id):
+        data = self.body()
+        target_jurusan = data.get("target_jurusan")
+        if target_jurusan is not None:
+            target_jurusan_value(target_jurusan)
+        deadline = deadline_value(data.get("deadline"))
+        if await self.call(app.get_task, int(task_id)) is None:
+            raise tornado.web.HTTPError(404, "tugas tidak ditemukan")
+        await self.call(app.update_task, int(task_id), data.get("title"), data.get("description"),
+                        target_jurusan, deadline)
+        self.finish(to_dict(TASK_FIELDS, await self.call(app.get_task, int(task_id))))
+
+    async def delete(self, task_id):
+        await self.call(app.delete_task, int(task_id))
+        self.set_status(204)
+        self.finish()
+
+# ========== MATERIALS ==========
+class MaterialsHandler(ApiHandler):
+    async def get(self):
+        mata_kuliah = self.text_argument("mata_kuliah")
+        if mata_kuliah:
+            rows = await self.call(app.get_all_materials_by_lecturer, mata_kuliah)
+        else:
+            rows = await self.call(app.get_all_materials)
+        self.finish({"items": [to_dict(MATERIAL_FIELDS, row) for row in rows]})
+
+    async def post(self):
+        materials = []
+        for item in self.batch(self.body(), "materials"):
+            require_text(item, "title", "link", "mata_kuliah")
+            materials.append((item["title"], item["link"], item["mata_kuliah"],
+                              target_jurusan_value(item.get("target_jurusan")), created_by_value(item)))
+        ids = await self.call(app.add_materials, materials)
+        self.set_status(201 if ids else 200)
+        self.finish({"inserted": len(ids), "ids": ids})
+
+class MaterialHandler(ApiHandler):
+    async def get(self, material_id):
+        row = await self.call(app.get_material, int(material_id))
+        if row is None:
+            raise tornado.web.HTTPError(404, "materi tidak ditemukan")
+        self.finish(to_dict(MATERIAL_FIELDS, row))
+
+    async def patch(self, material_id):
+        data = self.body()
+        target_jurusan = data.get("target_jurusan")
+        if target_jurusan is not None:
+            target_jurusan_value(target_jurusan)
+        if await self.call(app.get_material, int(material_id)) is None:
+            raise tornado.web.HTTPError(404, "materi tidak ditemukan")
+        await self.call(app.update_material, int(material_id), data.get("title"), data.get("link"), target_jurusan)
+        self.finish(to_dict(MATERIAL_FIELDS, await self.call(app.get_material, int(material_id))))
+
+    async def delete(self, material_id):
+        await self.call(app.delete_material, int(material_id))
+        self.set_status(204)
+        self.finish()
+
+# ========== ANSWERS & SCORES ==========
+class AnswersHandler(ApiHandler):
+    async def get(self):
+        status = self.text_argument("status")
+        if status not in (None, "draft", "submitted"):
+            raise tornado.web.HTTPError(400, "status harus draft atau submitted")
+        rows, next_cursor = await self.call(
+            app.get_answers_page, decode_cursor(self.get_query_argument("cursor", None), is_int), self.page_limit(),
+            self.text_argument("mata_kuliah"), status, self.int_argument("task_id"), self.text_argument("username"),
+        )
+        self.page(ANSWER_LIST_FIELDS, rows, next_cursor)
+
+    async def post(self):
+        data = self.body()
+        for name in ("user_id", "task_id"):
+            if not is_int(data.get(name)):
+                raise tornado.web.HTTPError(400, f"'{name}' wajib berupa angka")
+        user = await self.call(app.get_user_by_id, data["user_id"])
+        if user is None:
+            raise tornado.web.HTTPError(404, "user tidak ditemukan")
+        if user[2] != "student":
+            raise tornado.web.HTTPError(400, "jawaban hanya bisa dibuat untuk user student")
+        if await self.call(app.get_task, data["task_id"]) is None:
+            raise tornado.web.HTTPError(404, "tugas tidak ditemukan")
+        existing = await self.call(app.get_user_task_answer, user[0], data["task_id"])
+        row = await self.call(app.get_or_create_answer, user[0], user[1], data["task_id"])
+        self.set_status(200 if existing else 201)
+        self.finish(to_dict(ANSWER_FIELDS, await self.call(app.get_answer_detail, row[0])))
+
+class AnswerHandler(ApiHandler):
+    async def get(self, answer_id):
+        row = await self.call(app.get_answer_detail, int(answer_id))
+        if row is None:
+            raise tornado.web.HTTPError(404, "jawaban tidak ditemukan")
+        self.finish(to_dict(ANSWER_FIELDS, row))
+
+class AnswerDraftHandler(ApiHandler):
+    async def put(self, answer_id):
+        text = answer_text_value(self.body())
+        row = await self.call(app.get_answer_detail, int(answer_id))
+        if row is None:
+            raise tornado.web.HTTPError(404, "jawaban tidak ditemukan")
+        if row[8] != "draft":
+            raise tornado.web.HTTPError(409, "jawaban sudah disubmit")
+        # Write-behind seperti tombol Simpan Draft: GET bisa masih melihat teks lama sesaat
+        await self.call(app.save_answer_draft, int(answer_id), text)
+        self.set_status(202)
+        self.finish({"id": int(answer_id), "status": "draft", "answer": text})
+
+class AnswerSubmitHandler(ApiHandler):
+    async def post(self, answer_id):
+        data = self.body()
+        text = answer_text_value(data) if "answer" in data else None
+        row = await self.call(app.get_answer_detail, int(answer_id))
+        if row is None:
+            raise tornado.web.HTTPError(404, "jawaban tidak ditemukan")
+        if row[8] != "draft":
+            raise tornado.web.HTTPError(409, "jawaban sudah disubmit")
+        if text is not None:
+            await self.call(app.save_answer_draft, int(answer_id), text)
+        # finalize_answer menulis draft tertunda lebih dulu, lalu mengunci jawaban
+        await self.call(app.finalize_answer, int(answer_id))
+        self.finish(to_dict(ANSWER_FIELDS, await self.call(app.get_answer_detail, int(answer_id))))
+
+class AnswerScoreHandler(ApiHandler):
+    async def put(self, answer_id):
+        data = self.body()
+        score = score_value(data.get("score"))
+        if await self.call(app.get_answer_detail, int(answer_id)) is None:
+            raise tornado.web.HTTPError(404, "jawaban tidak ditemukan")
+        await self.call(app.update_answer_score, int(answer_id), score, data.get("feedback"))
+        self.finish(to_dict(ANSWER_FIELDS, await self.call(app.get_answer_detail, int(answer_id))))
+
+class ScoresHandler(ApiHandler):
+    async def post(self):
+        items = self.batch(self.body(), "grades")
+        grades = []
+        for item in items:
+            if not isinstance(item.get("answer_id"), int):
+                raise tornado.web.HTTPError(400, "setiap nilai wajib punya 'answer_id' (angka)")
+            grades.append((item["answer_id"], score_value(item.get("score")), item.get("feedback")))
+        updated = await self.call(app.update_answer_scores, grades)
+        self.finish({"updated": updated})
+
+class GradebookHandler(ApiHandler):
+    async def get(self):
+        fmt = self.get_query_argument("format", "csv")
+        if fmt not in app.GRADEBOOK_FORMATS:
+            raise tornado.web.HTTPError(400, f"format harus salah satu dari {', '.join(app.GRADEBOOK_FORMATS)}")
+        status = self.text_argument("status")
+        if status not in (None, "draft", "submitted"):
+            raise tornado.web.HTTPError(400, "status harus draft atau submitted")
+        filters = {
+            "mata_kuliah": self.text_argument("mata_kuliah"),
+            "task_id": self.int_argument("task_id"),
+            "status": status,
+            "date_from": self.date_argument("from"),
+            "date_to": self.date_argument("to"),
+        }
+        include_answer = self.get_query_argument("include_answer", "") in ("1", "true")
+        # Ditulis ke file sementara di thread pool, lalu dikirim per potongan (memori tetap datar)
+        with tempfile.TemporaryFile() as spool:
+            await self.call(app.write_gradebook, spool, fmt, include_answer, **filters)
+            spool.seek(0)
+            self.set_header("Content-Type", "text/csv; charset=utf-8" if fmt == "csv" else "application/octet-stream")
+            self.set_header("Content-Disposition", f'attachment; filename="gradebook.{fmt}"')
+            while chunk := spool.read(API_GRADEBOOK_CHUNK_BYTES):
+                self.write(chunk)
+                await self.flush()
+        self.finish()
+
+def make_app(token, workers=4):
+    settings = {"token": token, "executor": ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")}
+    routes = [
+        (r"/health", HealthHandler),
+        (r"/users", UsersHandler),
+        (r"/users/(\d+)", UserHandler),
+        (r"/tasks", TasksHandler),
+        (r"/tasks/(\d+)", TaskHandler),
+        (r"/materials", MaterialsHandler),
+        (r"/materials/(\d+)", MaterialHandler),
+        (r"/answers", AnswersHandler),
+        (r"/answers/(\d+)", AnswerHandler),
+        (r"/answers/(\d+)/draft", AnswerDraftHandler),
+        (r"/answers/(\d+)/submit", AnswerSubmitHandler),
+        (r"/answers/(\d+)/score", AnswerScoreHandler),
+        (r"/scores", ScoresHandler),
+        (r"/gradebook", GradebookHandler),
+    ]
+    return tornado.web.Application([(API_PREFIX + pattern, handler, settings) for pattern, handler in routes])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--db", default=app.DB_PATH, help=f"database utama (default: {app.DB_PATH})")
+    parser.add_argument("--feedback-db", default=app.FEEDBACK_DB_PATH,
+                        help=f"database feedback (default: {app.FEEDBACK_DB_PATH})")
+    parser.add_argument("--token", default=os.environ.get("ELEARNING_API_TOKEN"),
+                        help="bearer token (default: env ELEARNING_API_TOKEN, atau dibuat acak)")
+    parser.add_argument("--workers", type=int, default=4, help="thread untuk fungsi data layer")
+    args = parser.parse_args(argv)
+
+    app.DB_PATH = args.db
+    app.FEEDBACK_DB_PATH = args.feedback_db
+    app.bootstrap()
+    token = args.token or secrets.token_urlsafe(24)
+    if not args.token:
+        print(f"Token API (acak): {token}", file=sys.stderr)
+    make_app(token, args.workers).listen(args.port, args.host)
+    print(f"API berjalan di http://{args.host}:{args.port}{API_PREFIX}", file=sys.stderr)
+    tornado.ioloop.IOLoop.current().start()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,916 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import sqlite3
-from datetime import datetime
+import os
+import sys
+import queue
+import threading
+import functools
+import time
+import atexit
+import tracemalloc
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timedelta
 import pandas as pd
 import json
+import csv
+import io
+import tempfile
+import re
+import bisect
+import math
+import unicodedata
+from operator import itemgetter
+from urllib.parse import quote
 
 # DATABASE HELPERS
 DB_PATH = "database.db"
 FEEDBACK_DB_PATH = "feedback.db"  # Path untuk database feedback
 
+# Pengaturan koneksi: pragma diterapkan sekali per koneksi, lalu koneksi dipakai ulang
+SQLITE_BUSY_TIMEOUT_MS = 5000
+CONNECTION_POOL_SIZE = 8
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-16000",  # ~16 MB per koneksi
+    "PRAGMA temp_store=MEMORY",
+)
+
+# ========== STORAGE BACKEND ==========
+# Antarmuka penyimpanan adalah helper data di modul ini (add_user, get_tasks_page,
+# search_documents, ...). Setiap helper didaftarkan di STORAGE_HELPERS lewat
+# @cached_query atau @storage_helper, dan panggilannya diteruskan ke backend aktif
+# yang dipilih lewat STORAGE_BACKEND (env ELEARNING_STORAGE):
+#   "sqlite" - file database SQLite di disk (default); implementasinya adalah badan
+#              fungsi helper itu sendiri (pool koneksi, writer tunggal, FTS5)
+#   "memory" - engine Python murni di memori proses (MemoryStorage): tabel dict
+#              dengan indeks sekunder, untuk tes/benchmark tanpa I/O disk
+# Backend lain (mis. server database) cukup menyediakan method untuk setiap nama di
+# STORAGE_HELPERS dengan signature dan bentuk baris yang sama, lalu didaftarkan di
+# STORAGE_BACKENDS. Invalidasi query cache dilakukan decorator, bukan backend.
+STORAGE_BACKEND = os.environ.get("ELEARNING_STORAGE", "sqlite")
+
+class SQLiteStorage:
+    """Backend default: satu file SQLite (WAL) per path database."""
+
+    name = "sqlite"
+    native = True  # helper dijalankan dengan SQL di badan fungsinya sendiri
+
+    def uri(self, path, readonly=False):
+        return f"file:{quote(os.path.abspath(path))}" + ("?mode=ro" if readonly else "")
+
+    def connect(self, path, readonly=False):
+        """Koneksi autocommit dengan pragma standar; readonly menolak semua tulisan"""
+        conn = sqlite3.connect(
+            self.uri(path, readonly),
+            uri=True,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            factory=TracedConnection,
+        )
+        conn.trace_db = os.path.basename(path)
+        if readonly:
+            conn.execute("PRAGMA query_only=1")
+        for pragma in CONNECTION_PRAGMAS:
+            if readonly and ("journal_mode" in pragma or "synchronous" in pragma):
+                continue
+            conn.execute(pragma)
+        return conn
+
+    def attach(self, conn, path, schema, readonly=False):
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (self.uri(path, readonly),))
+
+    def start(self):
+        """Mulai writer kedua database sekarang agar commit proses lain langsung terpantau"""
+        for path in (DB_PATH, FEEDBACK_DB_PATH):
+            _get_writer(path).start()
+
+    def close(self):
+        pass
+
+class ConnectionPool:
+    """Pool kecil koneksi SQLite untuk satu database di backend penyimpanan.
+
+    Koneksi dibuat dalam mode autocommit (isolation_level=None) sehingga query baca
+    tidak membuka transaksi implisit; transaksi tulis dibuka eksplisit lewat
+    `transaction()` dengan BEGIN IMMEDIATE agar lock tulis diambil di awal.
+    """
+
+    def __init__(self, path, storage, size=CONNECTION_POOL_SIZE):
+        self.path = path
+        self.storage = storage
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        return self.storage.connect(self.path)
+
+    @contextmanager
+    def connection(self):
+        """Pinjam satu koneksi dari pool dan kembalikan setelah selesai"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Jalankan blok di dalam satu transaksi tulis (commit/rollback otomatis)"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class ReportingPool(ConnectionPool):
+    """Pool koneksi baca-saja ke database utama dengan database feedback di-ATTACH sebagai `fb`.
+
+    Dipakai untuk laporan yang menggabungkan kedua file dalam satu statement SQL.
+    """
+
+    def __init__(self, path, feedback_path, storage, size=CONNECTION_POOL_SIZE):
+        super().__init__(path, storage, size)
+        self.feedback_path = feedback_path
+
+    def _connect(self):
+        conn = self.storage.connect(self.path, readonly=True)
+        conn.trace_db = "report"
+        self.storage.attach(conn, self.feedback_path, "fb", readonly=True)
+        return conn
+
+# Streamlit mengeksekusi ulang skrip ini di setiap rerun, sehingga variabel modul
+# ikut dibuat ulang. State tingkat proses (pool, bootstrap, dst.) disimpan lewat
+# st.cache_resource agar bertahan lintas rerun dan dibagi oleh semua sesi.
+@st.cache_resource
+def _storage_backends():
+    return {}
+
+_storages = _storage_backends()
+
+def get_storage():
+    """Backend penyimpanan aktif menurut STORAGE_BACKEND"""
+    storage = _storages.get(STORAGE_BACKEND)
+    if storage is None:
+        if STORAGE_BACKEND not in STORAGE_BACKENDS:
+            raise ValueError(f"Backend penyimpanan tidak dikenal: {STORAGE_BACKEND} "
+                             f"(pilihan: {', '.join(STORAGE_BACKENDS)})")
+        storage = STORAGE_BACKENDS[STORAGE_BACKEND]()
+        missing = [] if storage.native else [name for name in STORAGE_HELPERS if not hasattr(storage, name)]
+        if missing:
+            raise NotImplementedError(f"Backend {STORAGE_BACKEND} belum mengimplementasikan: {', '.join(missing)}")
+        storage = _storages.setdefault(STORAGE_BACKEND, storage)
+    return storage
+
+def _sql_storage():
+    """Backend aktif, dipastikan memakai koneksi SQL (pool, writer, migrasi)"""
+    storage = get_storage()
+    if not storage.native:
+        raise RuntimeError(f"Backend penyimpanan {storage.name} tidak memakai koneksi SQL")
+    return storage
+
+@st.cache_resource
+def _connection_pools():
+    return {}
+
+_pools = _connection_pools()
+
+def _get_pool(path):
+    key = (STORAGE_BACKEND, path)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools.setdefault(key, ConnectionPool(path, _sql_storage()))
+    return pool
+
 def get_connection():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """Context manager: `with get_connection() as conn:` meminjam koneksi ke database utama"""
+    return _get_pool(DB_PATH).connection()
 
 # Fungsi koneksi untuk feedback database
 def get_feedback_connection():
-    return sqlite3.connect(FEEDBACK_DB_PATH, check_same_thread=False)
+    return _get_pool(FEEDBACK_DB_PATH).connection()
+
+def get_reporting_connection():
+    """Context manager: koneksi baca-saja ke database utama + feedback (skema `fb`)"""
+    key = (STORAGE_BACKEND, "report", DB_PATH, FEEDBACK_DB_PATH)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools.setdefault(key, ReportingPool(DB_PATH, FEEDBACK_DB_PATH, _sql_storage()))
+    return pool.connection()
+
+def db_transaction():
+    """Context manager transaksi tulis pada database utama"""
+    return _get_pool(DB_PATH).transaction()
+
+def feedback_transaction():
+    """Context manager transaksi tulis pada database feedback"""
+    return _get_pool(FEEDBACK_DB_PATH).transaction()
+
+def close_all_connections():
+    """Tutup semua koneksi idle dan hentikan writer (dipakai saat path database diganti, mis. untuk tes).
+
+    Database backend "memory" ikut dibuang, jadi status bootstrap dan query cache
+    juga direset: bootstrap() berikutnya menjalankan migrasi lagi.
+    """
+    for key in list(_writers):
+        _writers.pop(key).stop()
+    for key in list(_pools):
+        _pools.pop(key).close()
+    for name in list(_storages):
+        _storages.pop(name).close()
+    _bootstrap_status()["ready"].clear()
+    query_cache.invalidate_all()
+
+# ========== QUERY TRACING ==========
+# Instrumentasi opsional di setiap koneksi (pool maupun writer). Saat tracing aktif,
+# setiap statement dicatat ke ring buffer beserta durasi, jumlah baris, helper
+# pemanggil, dan halaman yang sedang dirender. Saat nonaktif biayanya hanya satu
+# pengecekan flag per query.
+QUERY_TRACE_MAX_ENTRIES = 2000
+QUERY_TRACE_STATEMENT_CHARS = 300
+
+class QueryTracer:
+    """Pencatat statement SQL tingkat proses dengan ring buffer terbatas"""
+
+    def __init__(self, max_entries=QUERY_TRACE_MAX_ENTRIES):
+        self.enabled = False
+        self.max_entries = max_entries
+        self._records = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._local = threading.local()  # halaman aktif per thread skrip
+        self._helpers = {}  # helper -> [panggilan, total detik, baris]
+        self._pages = {}  # halaman -> [render, query, total detik]
+        self.since = datetime.now().isoformat()
+
+    @contextmanager
+    def page(self, name):
+        """Tandai query di dalam blok sebagai milik halaman `name`"""
+        self._local.page = name
+        if self.enabled:
+            with self._lock:
+                self._pages.setdefault(name, [0, 0, 0.0])[0] += 1
+        try:
+            yield
+        finally:
+            self._local.page = None
+
+    def begin(self, statement, db):
+        """Buat catatan untuk statement yang akan dieksekusi"""
+        record = {
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "db": db,
+            "helper": _calling_helper(),
+            "page": getattr(self._local, "page", None),
+            "statement": " ".join(statement.split())[:QUERY_TRACE_STATEMENT_CHARS],
+            "duration_ms": 0.0,
+            "rows": 0,
+        }
+        with self._lock:
+            self._records.append(record)
+            self._helpers.setdefault(record["helper"], [0, 0.0, 0])[0] += 1
+            if record["page"] is not None:
+                self._pages.setdefault(record["page"], [0, 0, 0.0])[1] += 1
+        return record
+
+    def account(self, record, elapsed, rows=0):
+        """Tambahkan waktu eksekusi/fetch dan baris ke catatan serta agregatnya"""
+        with self._lock:
+            record["duration_ms"] += 1000 * elapsed
+            record["rows"] += rows
+            helper = self._helpers.setdefault(record["helper"], [0, 0.0, 0])
+            helper[1] += elapsed
+            helper[2] += rows
+            if record["page"] is not None:
+                self._pages.setdefault(record["page"], [0, 0, 0.0])[2] += elapsed
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._helpers.clear()
+            self._pages.clear()
+            self.since = datetime.now().isoformat()
+
+    def slowest(self, limit=20):
+        with self._lock:
+            records = [dict(record) for record in self._records]
+        return sorted(records, key=lambda r: r["duration_ms"], reverse=True)[:limit]
+
+    def helper_stats(self):
+        with self._lock:
+            return [
+                {"helper": name, "calls": calls, "total_ms": 1000 * total, "rows": rows}
+                for name, (calls, total, rows) in self._helpers.items()
+            ]
+
+    def page_stats(self):
+        with self._lock:
+            return [
+                {"page": name, "renders": renders, "queries": queries, "total_ms": 1000 * total}
+                for name, (renders, queries, total) in self._pages.items()
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {"enabled": self.enabled, "records": len(self._records),
+                    "max_entries": self.max_entries, "since": self.since}
+
+# Frame milik lapisan infrastruktur dilewati saat mencari helper pemanggil; jika
+# tidak ada helper (mis. BEGIN/COMMIT milik writer), frame infrastruktur terdekat
+# di luar tracer sendiri yang dipakai
+_TRACE_SELF = {"TracedConnection", "TracedCursor", "QueryTracer"}
+_TRACE_INTERNAL = _TRACE_SELF | {"ConnectionPool", "DatabaseWriter", "QueryCache", "cached_query",
+                                  "storage_helper", "_storage_dispatch"}
+
+def _calling_helper():
+    """Nama fungsi app.py terdekat di stack yang bukan bagian infrastruktur"""
+    filename = _calling_helper.__code__.co_filename
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename == filename:
+            name = code.co_qualname.split(".<locals>")[0]
+            root = name.split(".")[0]
+            if root not in _TRACE_INTERNAL:
+                return name
+            if fallback is None and root not in _TRACE_SELF:
+                fallback = name
+        frame = frame.f_back
+    return fallback or "?"
+
+class TracedConnection(sqlite3.Connection):
+    """Koneksi SQLite yang melapor ke query_tracer saat tracing aktif"""
+    trace_db = "?"
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = TracedCursor if query_tracer.enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        if not query_tracer.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        if not query_tracer.enabled:
+            return super().executemany(sql, parameters)
+        return self.cursor().executemany(sql, parameters)
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor yang mengukur waktu eksekusi dan fetch, serta menghitung baris"""
+    _trace = None
+
+    def _run(self, method, sql, parameters):
+        self._trace = query_tracer.begin(sql, self.connection.trace_db)
+        started = time.perf_counter()
+        try:
+            return method(sql, parameters)
+        finally:
+            query_tracer.account(self._trace, time.perf_counter() - started, max(self.rowcount, 0))
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self._run(super().executemany, sql, parameters)
+
+    def _fetched(self, started, rows):
+        if self._trace is not None:
+            query_tracer.account(self._trace, time.perf_counter() - started, rows)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
 
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0)
+            raise
+        self._fetched(started, 1)
+        return row
+
+@st.cache_resource
+def _query_tracer_store():
+    return QueryTracer()
+
+query_tracer = _query_tracer_store()
+
+# ========== PAGE PROFILER ==========
+# Profil render per halaman: waktu, jumlah widget, dan puncak alokasi memori
+# (tracemalloc) untuk setiap kombinasi halaman dan role. Sampel disimpan dalam
+# jendela bergulir sehingga persentil mengikuti kondisi terbaru.
+PAGE_PROFILE_SAMPLES = 200
+PAGE_RENDER_BUDGET_MS = 500
+
+class PageProfiler:
+    """Pencatat waktu render halaman tingkat proses"""
+
+    def __init__(self, samples=PAGE_PROFILE_SAMPLES):
+        self.enabled = False
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._pages = {}  # (halaman, role) -> {"renders": n, "samples": deque[(ms, widget, KB)]}
+        self.since = datetime.now().isoformat()
+
+    @property
+    def track_memory(self):
+        return tracemalloc.is_tracing()
+
+    def set_track_memory(self, enabled):
+        """Nyalakan/matikan tracemalloc (memperlambat seluruh proses selama aktif)"""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def profile(self, page, role):
+        """Ukur satu render halaman; render yang terputus (rerun/stop) tidak dicatat.
+
+        Puncak memori dihitung dari tracemalloc yang berlaku untuk seluruh proses,
+        jadi angka bisa ikut naik bila sesi lain sedang merender bersamaan.
+        """
+        if not self.enabled:
+            yield
+            return
+        ctx = get_script_run_ctx()
+        widgets_before = len(ctx.widget_ids_this_run) if ctx else 0
+        memory = tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        yield
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        widgets = (len(ctx.widget_ids_this_run) if ctx else 0) - widgets_before
+        peak_kb = (tracemalloc.get_traced_memory()[1] - memory_before) / 1024 if memory else None
+        with self._lock:
+            entry = self._pages.setdefault((page, role), {"renders": 0, "samples": deque(maxlen=self.samples)})
+            entry["renders"] += 1
+            entry["samples"].append((elapsed_ms, widgets, peak_kb))
+
+    def reset(self):
+        with self._lock:
+            self._pages.clear()
+            self.since = datetime.now().isoformat()
+
+    def stats(self):
+        """Ringkasan per (halaman, role) dengan persentil dari jendela sampel"""
+        def percentile(values, p):
+            return values[int(p * (len(values) - 1))] if values else None
+        with self._lock:
+            pages = [(key, entry["renders"], list(entry["samples"])) for key, entry in self._pages.items()]
+        result = []
+        for (page, role), renders, samples in pages:
+            wall = sorted(sample[0] for sample in samples)
+            peaks = sorted(sample[2] for sample in samples if sample[2] is not None)
+            result.append({
+                "page": page,
+                "role": role,
+                "renders": renders,
+                "window": len(samples),
+                "wall_ms_p50": percentile(wall, 0.50),
+                "wall_ms_p95": percentile(wall, 0.95),
+                "wall_ms_max": percentile(wall, 1.0),
+                "widgets_avg": sum(sample[1] for sample in samples) / len(samples),
+                "peak_kb_p50": percentile(peaks, 0.50),
+                "peak_kb_p95": percentile(peaks, 0.95),
+                "over_budget": percentile(wall, 0.95) > PAGE_RENDER_BUDGET_MS,
+            })
+        return sorted(result, key=lambda row: row["wall_ms_p95"], reverse=True)
+
+    def export_json(self):
+        """Ringkasan beserta sampel mentah sebagai JSON"""
+        with self._lock:
+            raw = {f"{page}|{role}": [list(sample) for sample in entry["samples"]]
+                   for (page, role), entry in self._pages.items()}
+        return json.dumps({
+            "since": self.since,
+            "exported_at": datetime.now().isoformat(),
+            "budget_ms": PAGE_RENDER_BUDGET_MS,
+            "sample_fields": ["wall_ms", "widgets", "peak_kb"],
+            "pages": self.stats(),
+            "samples": raw,
+        }, indent=2)
+
+@st.cache_resource
+def _page_profiler_store():
+    return PageProfiler()
+
+page_profiler = _page_profiler_store()
+
+# ========== SINGLE WRITER ==========
+# Semua tulisan ke satu file database lewat satu thread penulis yang memegang koneksi
+# tulisnya sendiri. Operasi dari banyak sesi dikumpulkan dan di-commit bersama
+# (group commit), masing-masing di dalam SAVEPOINT sehingga kegagalan satu operasi
+# tidak membatalkan operasi lain di grup yang sama.
+#
+# Writer juga menjaga query cache tetap koheren antarproses (Streamlit, api.py, skrip):
+# PRAGMA data_version pada koneksi writer hanya berubah karena commit koneksi lain,
+# jadi perubahan itu berarti ada proses lain yang menulis dan cache proses ini dibuang.
+WRITE_QUEUE_MAX_SIZE = 1000
+WRITE_QUEUE_PUT_TIMEOUT_SECONDS = 5
+WRITE_GROUP_MAX_OPERATIONS = 64
+WRITE_LATENCY_SAMPLES = 500
+WRITER_EXTERNAL_CHECK_SECONDS = 1.0
+WRITE_RESULT_TIMEOUT_SECONDS = 120
+
+class WriteQueueFull(Exception):
+    """Antrean writer penuh lebih lama dari batas tunggu (backpressure)"""
+
+class WriteTimeout(Exception):
+    """Operasi tulis tidak selesai dalam WRITE_RESULT_TIMEOUT_SECONDS"""
+
+class DatabaseWriter:
+    """Thread penulis tunggal untuk satu file database SQLite."""
+
+    def __init__(self, path, max_queue=WRITE_QUEUE_MAX_SIZE, group_max=WRITE_GROUP_MAX_OPERATIONS):
+        self.path = path
+        self.group_max = group_max
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._conn = None  # hanya dipakai oleh thread writer
+        self._start_lock = threading.Lock()
+        self._latencies = deque(maxlen=WRITE_LATENCY_SAMPLES)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.commits = 0
+        self.external_changes = 0
+        self._data_version = None
+
+    def submit(self, operation, timeout=WRITE_QUEUE_PUT_TIMEOUT_SECONDS):
+        """Antrekan `operation(conn)`; kembalikan Future berisi nilai kembaliannya"""
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # Dipanggil dari operasi yang sedang berjalan: ikut transaksi grup saat ini
+            future.set_result(operation(self._conn))
+            return future
+        self._ensure_started()
+        try:
+            self._queue.put((operation, future, time.perf_counter()), timeout=timeout)
+        except queue.Full:
+            self.rejected += 1
+            raise WriteQueueFull(f"Antrean tulis {self.path} penuh") from None
+        self.submitted += 1
+        # Thread bisa berhenti di antara cek di atas dan put: _release() sudah selesai
+        # mengosongkan antrean, jadi operasi ini tidak akan diambil siapa pun. _release()
+        # mengosongkan _thread sebelum mengosongkan antrean, sehingga cek ulang setelah
+        # put selalu melihatnya dan memulai thread baru.
+        self._ensure_started()
+        return future
+
+    def execute(self, operation, timeout=WRITE_RESULT_TIMEOUT_SECONDS):
+        """Jalankan operasi tulis dan tunggu hingga di-commit (paling lama `timeout` detik)"""
+        try:
+            return self.submit(operation).result(timeout=timeout)
+        except FutureTimeoutError:
+            raise WriteTimeout(f"Tulisan ke {self.path} tidak selesai dalam {timeout} detik") from None
+
+    def start(self):
+        """Mulai thread writer sekarang (bukan saat tulisan pertama) agar commit proses lain terpantau"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run, name=f"db-writer:{self.path}", daemon=True)
+                    thread.start()
+                    self._thread = thread
+
+    def stop(self):
+        thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self):
+        # Error di luar _commit_group (koneksi gagal dibuka, cek data_version gagal)
+        # menghentikan thread: operasi yang antre digagalkan dengan error tersebut dan
+        # tulisan berikutnya mencoba memulai thread baru.
+        error = RuntimeError(f"Writer {self.path} dihentikan")
+        try:
+            self._conn = _get_pool(self.path)._connect()
+            self._check_external_changes()
+            while True:
+                try:
+                    item = self._queue.get(timeout=WRITER_EXTERNAL_CHECK_SECONDS)
+                except queue.Empty:
+                    self._check_external_changes()
+                    continue
+                if item is None:
+                    return
+                group = [item]
+                while len(group) < self.group_max:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)
+                        break
+                    group.append(item)
+                self._commit_group(group)
+        except Exception as exc:
+            error = exc
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._data_version = None
+            self._release(error)
+
+    def _release(self, error):
+        """Lepas thread writer dan gagalkan semua operasi yang masih antre"""
+        with self._start_lock:
+            self._thread = None
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                self.failed += 1
+                item[1].set_exception(error)
+
+    def _check_external_changes(self):
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._data_version is not None and version != self._data_version:
+            self.external_changes += 1
+            query_cache.invalidate_all()
+        self._data_version = version
+
+    def _commit_group(self, group):
+        conn = self._conn
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._check_external_changes()
+            for operation, future, _ in group:
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    outcomes.append((future, operation(conn), None))
+                    conn.execute("RELEASE write_op")
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    outcomes.append((future, None, exc))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            outcomes = [(future, None, exc) for _, future, _ in group]
+        else:
+            self.commits += 1
+        finished = time.perf_counter()
+        for (_, _, enqueued_at), (future, result, exc) in zip(group, outcomes):
+            self._latencies.append(finished - enqueued_at)
+            if exc is None:
+                self.completed += 1
+                future.set_result(result)
+            else:
+                self.failed += 1
+                future.set_exception(exc)
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        def percentile(p):
+            return 1000 * latencies[int(p * (len(latencies) - 1))] if latencies else 0.0
+        return {
+            "queue_depth": self._queue.qsize(),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "commits": self.commits,
+            "external_changes": self.external_changes,
+            "avg_group_size": (self.completed + self.failed) / self.commits if self.commits else 0.0,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": percentile(1.0),
+        }
+
+@st.cache_resource
+def _database_writers():
+    return {}
+
+_writers = _database_writers()
+
+def _get_writer(path):
+    key = (STORAGE_BACKEND, path)
+    writer = _writers.get(key)
+    if writer is None:
+        writer = _writers.setdefault(key, DatabaseWriter(path))
+    return writer
+
+def write_db(operation):
+    """Jalankan `operation(conn)` di writer database utama; kembalikan hasilnya setelah commit"""
+    return _get_writer(DB_PATH).execute(operation)
+
+def write_feedback_db(operation):
+    """Jalankan `operation(conn)` di writer database feedback"""
+    return _get_writer(FEEDBACK_DB_PATH).execute(operation)
+
+def writer_stats():
+    return {writer.path: writer.stats() for writer in _writers.values()}
+
+# ========== QUERY CACHE ==========
+QUERY_CACHE_MAX_ENTRIES = 512
+
+class QueryCache:
+    """Cache LRU tingkat proses untuk helper baca, diinvalidasi per tabel.
+
+    Setiap entri mencatat tabel yang dibacanya. Helper tulis memanggil
+    `invalidate(tabel...)` setelah commit: entri terkait dibuang dan generasi
+    tabel dinaikkan, sehingga hasil query yang sedang dimuat saat itu tidak ikut
+    disimpan (hasilnya mungkin sudah basi). Selain nama tabel ada tag turunan
+    "answer_drafts": hanya berubah oleh flush teks draft, dan hanya didaftarkan oleh
+    pembaca yang menampilkan isi draft.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, tables)
+        self._generations = {}
+        self._epoch = 0  # naik pada invalidate_all (perubahan dari proses lain)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._per_function = {}  # nama fungsi -> [hits, misses]
+
+    def get_or_load(self, name, tables, key, loader):
+        with self._lock:
+            counters = self._per_function.setdefault(name, [0, 0])
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                counters[0] += 1
+                return self._entries[key][0]
+            self.misses += 1
+            counters[1] += 1
+            generations = [self._epoch] + [self._generations.get(table, 0) for table in tables]
+        value = loader()
+        with self._lock:
+            if generations == [self._epoch] + [self._generations.get(table, 0) for table in tables]:
+                self._entries[key] = (value, tables)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, (_, deps) in self._entries.items() if not deps.isdisjoint(tables)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def invalidate_all(self):
+        """Buang semua entri, termasuk hasil yang sedang dimuat (database diubah proses lain)"""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "per_function": {name: {"hits": h, "misses": m} for name, (h, m) in self._per_function.items()},
+            }
+
+@st.cache_resource
+def _query_cache_store():
+    return QueryCache()
+
+query_cache = _query_cache_store()
+
+# ========== STORAGE HELPERS ==========
+# Registry antarmuka penyimpanan (lihat STORAGE BACKEND). Helper baca memakai
+# @cached_query(tabel_yang_dibaca) atau @storage_helper() jika tidak di-cache;
+# helper tulis memakai @storage_helper(tabel_yang_ditulis).
+STORAGE_HELPERS = {}
+
+def _storage_dispatch(func):
+    """Daftarkan `func` sebagai helper data; panggilan diteruskan ke backend aktif"""
+    name = func.__name__
+    STORAGE_HELPERS[name] = func
+    @functools.wraps(func)
+    def dispatch(*args, **kwargs):
+        storage = get_storage()
+        if storage.native:
+            return func(*args, **kwargs)
+        return getattr(storage, name)(*args, **kwargs)
+    return dispatch
+
+def storage_helper(*tables):
+    """Decorator helper data tanpa cache. `tables` adalah tabel (atau tag) yang ditulis
+    helper: entri query cache yang membacanya dibuang setelah helper selesai tanpa error."""
+    def decorator(func):
+        dispatch = _storage_dispatch(func)
+        if not tables:
+            return dispatch
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = dispatch(*args, **kwargs)
+            query_cache.invalidate(*tables)
+            return result
+        return wrapper
+    return decorator
+
+def cached_query(*tables):
+    """Decorator read-through: hasil disimpan per (fungsi, argumen) sampai salah satu
+    tabel di `tables` ditulis. Nilai yang dikembalikan dipakai bersama antar sesi,
+    jadi pemanggil tidak boleh memodifikasinya."""
+    tables = frozenset(tables)
+    def decorator(func):
+        dispatch = _storage_dispatch(func)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, STORAGE_BACKEND, DB_PATH, FEEDBACK_DB_PATH, args, tuple(sorted(kwargs.items())))
+            return query_cache.get_or_load(func.__name__, tables, key, lambda: dispatch(*args, **kwargs))
+        wrapper.uncached = dispatch
+        return wrapper
+    return decorator
+
+@storage_helper()
 def create_db():
-    conn = get_connection()
+    """Bawa database utama ke versi skema terbaru"""
+    return apply_migrations(db_transaction, MIGRATIONS)
+
+# ========== SCHEMA MIGRATIONS ==========
+# Versi skema disimpan di PRAGMA user_version. Migrasi ke-N dijalankan saat
+# user_version < N, masing-masing di transaksinya sendiri bersama kenaikan versinya.
+# Tambahkan migrasi baru di akhir daftar; jangan ubah migrasi yang sudah dirilis.
+def apply_migrations(transaction, migrations):
+    """Jalankan migrasi yang belum diterapkan; kembalikan versi skema akhir"""
+    while True:
+        with transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(migrations):
+                return version
+            migrations[version](conn)
+            conn.execute(f"PRAGMA user_version={version + 1}")
+
+def _migration_base_schema(conn):
     c = conn.cursor()
     # USERS - Enhanced dengan nickname, jurusan, mata_kuliah
     c.execute("""
@@ -72,15 +966,211 @@ def create_db():
             created_at TEXT
         )
     """)
-    conn.commit()
-    conn.close()
+
+def _migration_target_tables(conn):
+    c = conn.cursor()
+    # TASK_TARGETS / MATERIAL_TARGETS - target jurusan ter-indeks (satu baris per jurusan)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS task_targets (
+            task_id INTEGER NOT NULL,
+            jurusan TEXT NOT NULL,
+            PRIMARY KEY (task_id, jurusan)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_task_targets_jurusan ON task_targets(jurusan, task_id)")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS material_targets (
+            material_id INTEGER NOT NULL,
+            jurusan TEXT NOT NULL,
+            PRIMARY KEY (material_id, jurusan)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_material_targets_jurusan ON material_targets(jurusan, material_id)")
+    migrate_target_jurusan(conn)
+
+def _migration_course_availability(conn):
+    create_course_availability(conn)
+    rebuild_course_availability(conn)
+
+def _migration_answer_indexes(conn):
+    # Satu jawaban per (user_id, task_id): sisakan yang sudah dinilai, lalu submitted, lalu id terkecil.
+    # Baris yang kalah tidak dibuang begitu saja, tapi dipindah ke answers_duplicates.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS answers_duplicates (
+            id INTEGER PRIMARY KEY,
+            task_id INTEGER,
+            user_id INTEGER,
+            username TEXT,
+            answer TEXT,
+            score INTEGER,
+            feedback TEXT,
+            status TEXT,
+            submitted_at TEXT,
+            finalized_at TEXT,
+            kept_answer_id INTEGER,
+            archived_at TEXT
+        )
+    """)
+    conn.execute("""
+        INSERT INTO answers_duplicates
+        SELECT id, task_id, user_id, username, answer, score, feedback, status, submitted_at, finalized_at,
+               kept_answer_id, ?
+        FROM (
+            SELECT answers.*, ROW_NUMBER() OVER ranked AS rn, FIRST_VALUE(id) OVER ranked AS kept_answer_id
+            FROM answers
+            WHERE user_id IS NOT NULL AND task_id IS NOT NULL
+            WINDOW ranked AS (
+                PARTITION BY user_id, task_id
+                ORDER BY score IS NOT NULL DESC, status = 'submitted' DESC, id
+            )
+        )
+        WHERE rn > 1
+    """, (datetime.now().isoformat(),))
+    conn.execute("DELETE FROM answers WHERE id IN (SELECT id FROM answers_duplicates)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_answers_user_task ON answers(user_id, task_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_task_status ON answers(task_id, status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_mata_kuliah ON tasks(mata_kuliah)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_materials_mata_kuliah ON materials(mata_kuliah)")
+
+def _migration_search_index(conn):
+    create_fts_index(conn, "tasks", ("title", "description"))
+    create_fts_index(conn, "materials", ("title",))
+    create_fts_index(conn, "answers", ("answer",))
+
+def _migration_ungraded_answers_index(conn):
+    # Indeks parsial untuk jawaban submitted yang belum dinilai (laporan & antrean penilaian)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_answers_ungraded ON answers(user_id)
+        WHERE status = 'submitted' AND score IS NULL
+    """)
+
+def _migration_user_directory_indexes(conn):
+    # Pencarian prefix username/nickname (range query COLLATE NOCASE) dan filter jurusan di direktori user
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users(username COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_nickname_nocase ON users(nickname COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_jurusan ON users(jurusan, username)")
+
+MIGRATIONS = [
+    _migration_base_schema,
+    _migration_target_tables,
+    _migration_course_availability,
+    _migration_answer_indexes,
+    _migration_search_index,
+    _migration_ungraded_answers_index,
+    _migration_user_directory_indexes,
+]
+
+# ========== TARGET JURUSAN ==========
+# Kolom target_jurusan (JSON) tetap disimpan untuk tampilan; filter memakai tabel *_targets.
+# "Semua Jurusan" disimpan sebagai satu baris wildcard dan selalu ikut dicocokkan.
+ALL_JURUSAN = "Semua Jurusan"
+
+def normalize_target_jurusan(target_jurusan):
+    """Rapikan daftar target: buang duplikat/kosong, wildcard menggantikan jurusan lain"""
+    targets = []
+    for jurusan in target_jurusan:
+        jurusan = jurusan.strip()
+        if not jurusan:
+            continue
+        if jurusan.lower() == ALL_JURUSAN.lower():
+            return [ALL_JURUSAN]
+        if jurusan not in targets:
+            targets.append(jurusan)
+    return targets
+
+def _replace_targets(conn, table, owner_column, owner_id, targets):
+    conn.execute(f"DELETE FROM {table} WHERE {owner_column}=?", (owner_id,))
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {table}({owner_column}, jurusan) VALUES (?, ?)",
+        [(owner_id, jurusan) for jurusan in targets],
+    )
+
+def migrate_target_jurusan(conn):
+    """Isi tabel *_targets dari kolom JSON lama untuk baris yang belum punya target"""
+    for table, targets_table, owner_column in (
+        ("tasks", "task_targets", "task_id"),
+        ("materials", "material_targets", "material_id"),
+    ):
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {targets_table}({owner_column}, jurusan)
+            SELECT {table}.id,
+                   CASE WHEN lower(trim(j.value)) = lower(:all) THEN :all ELSE trim(j.value) END
+            FROM {table}, json_each({table}.target_jurusan) AS j
+            WHERE json_valid({table}.target_jurusan)
+              AND trim(j.value) <> ''
+              AND NOT EXISTS (SELECT 1 FROM {targets_table} WHERE {owner_column} = {table}.id)
+        """, {"all": ALL_JURUSAN})
+
+def create_course_availability(conn):
+    """Buat tabel ketersediaan mata kuliah per jurusan beserta trigger pemeliharanya.
+
+    item_count menghitung jumlah tugas + materi yang menargetkan pasangan
+    (jurusan, mata_kuliah); baris dihapus saat hitungannya mencapai nol.
+    Trigger membaca mata_kuliah dari tasks/materials, jadi baris target harus
+    dihapus sebelum baris induknya.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS course_availability (
+            jurusan TEXT NOT NULL,
+            mata_kuliah TEXT NOT NULL,
+            item_count INTEGER NOT NULL,
+            PRIMARY KEY (jurusan, mata_kuliah)
+        ) WITHOUT ROWID
+    """)
+    for targets_table, owner_column, owner_table in (
+        ("task_targets", "task_id", "tasks"),
+        ("material_targets", "material_id", "materials"),
+    ):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{targets_table}_insert AFTER INSERT ON {targets_table}
+            BEGIN
+                INSERT INTO course_availability(jurusan, mata_kuliah, item_count)
+                SELECT NEW.jurusan, mata_kuliah, 1 FROM {owner_table} WHERE id = NEW.{owner_column}
+                ON CONFLICT(jurusan, mata_kuliah) DO UPDATE SET item_count = item_count + 1;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{targets_table}_delete AFTER DELETE ON {targets_table}
+            BEGIN
+                UPDATE course_availability SET item_count = item_count - 1
+                WHERE jurusan = OLD.jurusan
+                  AND mata_kuliah = (SELECT mata_kuliah FROM {owner_table} WHERE id = OLD.{owner_column});
+                DELETE FROM course_availability WHERE jurusan = OLD.jurusan AND item_count <= 0;
+            END
+        """)
+
+def rebuild_course_availability(conn):
+    """Hitung ulang course_availability dari tabel *_targets"""
+    conn.execute("DELETE FROM course_availability")
+    conn.execute("""
+        INSERT INTO course_availability(jurusan, mata_kuliah, item_count)
+        SELECT jurusan, mata_kuliah, COUNT(*) FROM (
+            SELECT tt.jurusan, t.mata_kuliah FROM task_targets tt JOIN tasks t ON t.id = tt.task_id
+            UNION ALL
+            SELECT mt.jurusan, m.mata_kuliah FROM material_targets mt JOIN materials m ON m.id = mt.material_id
+        )
+        GROUP BY jurusan, mata_kuliah
+    """)
+
+# ========== KEYSET PAGINATION ==========
+# Helper halaman mengambil LIMIT limit + 1 baris: baris ekstra hanya menandakan
+# masih ada halaman berikutnya. Kursor adalah kunci urutan baris terakhir, sehingga
+# halaman berikutnya dibaca lewat indeks tanpa OFFSET.
+def _keyset_page(rows, limit, key_fn):
+    """Potong hasil LIMIT limit + 1 menjadi (rows, next_cursor); next_cursor None di halaman terakhir"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, key_fn(rows[-1])
+    return rows, None
 
 # ========== FEEDBACK DATABASE FUNCTIONS ==========
+@storage_helper()
 def create_feedback_db():
     """Create separate database for feedback"""
-    conn = get_feedback_connection()
-    c = conn.cursor()
-    c.execute("""
+    return apply_migrations(feedback_transaction, FEEDBACK_MIGRATIONS)
+
+def _feedback_migration_base_schema(conn):
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS feedback (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER,
@@ -90,180 +1180,508 @@ def create_feedback_db():
             created_at TEXT
         )
     """)
-    conn.commit()
-    conn.close()
 
+def _feedback_migration_search_index(conn):
+    create_fts_index(conn, "feedback", ("message",))
+
+def _feedback_migration_status(conn):
+    conn.execute("ALTER TABLE feedback ADD COLUMN status TEXT NOT NULL DEFAULT 'open'")
+    conn.execute("ALTER TABLE feedback ADD COLUMN handled_at TEXT")
+    # Antrean: status DESC ('open' sebelum 'handled'), lalu id DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_status_id ON feedback(status, id)")
+
+FEEDBACK_MIGRATIONS = [
+    _feedback_migration_base_schema,
+    _feedback_migration_search_index,
+    _feedback_migration_status,
+]
+
+FEEDBACK_PAGE_SIZE = 25
+FEEDBACK_STATUS_OPEN = "open"
+FEEDBACK_STATUS_HANDLED = "handled"
+
+@storage_helper("feedback")
 def add_feedback(user_id, username, role, message):
     """Add feedback to separate database"""
-    conn = get_feedback_connection()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO feedback(user_id, username, role, message, created_at)
-        VALUES (?, ?, ?, ?, ?)
-    """, (user_id, username, role, message, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
+    def write(conn):
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO feedback(user_id, username, role, message, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (user_id, username, role, message, datetime.now().isoformat()))
+    write_feedback_db(write)
 
+@cached_query("feedback")
 def get_all_feedback():
     """Get all feedback for admin view"""
-    conn = get_feedback_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, user_id, username, role, message, created_at FROM feedback ORDER BY id DESC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with get_feedback_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, user_id, username, role, message, created_at FROM feedback ORDER BY id DESC")
+        return c.fetchall()
+
+@cached_query("feedback")
+def get_feedback_counts(today):
+    """Jumlah feedback per role/status plus jumlah hari ini dan 7 hari terakhir (dihitung di SQL)"""
+    week_start = (datetime.fromisoformat(today) - timedelta(days=6)).date().isoformat()
+    with get_feedback_connection() as conn:
+        rows = conn.execute("""
+            SELECT role, status, COUNT(*), SUM(created_at >= ?), SUM(created_at >= ?)
+            FROM feedback
+            GROUP BY role, status
+        """, (today, week_start)).fetchall()
+    counts = {"total": 0, "today": 0, "last_7_days": 0, "by_role": {}, "by_status": {}}
+    for role, status, count, today_count, week_count in rows:
+        counts["total"] += count
+        counts["today"] += today_count
+        counts["last_7_days"] += week_count
+        counts["by_role"][role] = counts["by_role"].get(role, 0) + count
+        counts["by_status"][status] = counts["by_status"].get(status, 0) + count
+    return counts
+
+@cached_query("feedback")
+def get_feedback_page(cursor=None, limit=FEEDBACK_PAGE_SIZE, status=None, role=None):
+    """Satu halaman antrean feedback: yang masih open dulu, lalu terbaru dulu.
+
+    Paginasi keyset pada (status, id); `cursor` adalah nilai kembalian
+    sebelumnya. Kembalikan (rows, next_cursor); next_cursor None di halaman terakhir.
+    """
+    conditions, params = [], []
+    if cursor is not None:
+        conditions.append("(status, id) < (?, ?)")
+        params.extend(cursor)
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    if role:
+        conditions.append("role = ?")
+        params.append(role)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_feedback_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT id, user_id, username, role, message, created_at, status, handled_at
+            FROM feedback
+            {where}
+            ORDER BY status DESC, id DESC
+            LIMIT ?
+        """, params + [limit + 1]).fetchall()
+    return _keyset_page(rows, limit, lambda row: (row[6], row[0]))
+
+@storage_helper("feedback")
+def mark_feedback_handled(feedback_ids):
+    """Tandai banyak feedback sebagai ditangani dalam satu UPDATE; kembalikan jumlah yang berubah"""
+    ids = json.dumps([int(fid) for fid in feedback_ids])
+    def write(conn):
+        return conn.execute("""
+            UPDATE feedback SET status = ?, handled_at = ?
+            WHERE status = ? AND id IN (SELECT value FROM json_each(?))
+        """, (FEEDBACK_STATUS_HANDLED, datetime.now().isoformat(), FEEDBACK_STATUS_OPEN, ids)).rowcount
+    return write_feedback_db(write)
+
+# ========== CROSS-DATABASE REPORTS ==========
+# Laporan yang menggabungkan feedback.db dengan users/tasks/answers lewat koneksi
+# reporting (feedback di-ATTACH sebagai `fb`), masing-masing satu statement SQL.
+REPORT_MIN_UNGRADED_ANSWERS = 3
+REPORT_ROW_LIMIT = 100
+
+@cached_query("feedback", "users")
+def report_feedback_by_jurusan():
+    """Jumlah feedback mahasiswa per jurusan: (jurusan, mahasiswa, feedback, open)"""
+    with get_reporting_connection() as conn:
+        return conn.execute("""
+            SELECT COALESCE(NULLIF(u.jurusan, ''), '(tanpa jurusan)') AS jurusan,
+                   COUNT(DISTINCT f.user_id), COUNT(*), SUM(f.status = 'open')
+            FROM fb.feedback f
+            LEFT JOIN main.users u ON u.id = f.user_id
+            WHERE f.role = 'student'
+            GROUP BY 1
+            ORDER BY COUNT(*) DESC
+        """).fetchall()
+
+@cached_query("feedback", "users")
+def report_feedback_by_mata_kuliah():
+    """Jumlah feedback dosen per mata kuliah: (mata_kuliah, dosen, feedback, open)"""
+    with get_reporting_connection() as conn:
+        return conn.execute("""
+            SELECT COALESCE(NULLIF(u.mata_kuliah, ''), '(tanpa mata kuliah)') AS mata_kuliah,
+                   COUNT(DISTINCT f.user_id), COUNT(*), SUM(f.status = 'open')
+            FROM fb.feedback f
+            LEFT JOIN main.users u ON u.id = f.user_id
+            WHERE f.role = 'lecturer'
+            GROUP BY 1
+            ORDER BY COUNT(*) DESC
+        """).fetchall()
+
+@cached_query("feedback", "users", "answers")
+def report_feedback_from_ungraded_students(min_ungraded=REPORT_MIN_UNGRADED_ANSWERS, limit=REPORT_ROW_LIMIT):
+    """Mahasiswa pengirim feedback yang punya banyak jawaban submitted belum dinilai.
+
+    Rows: (user_id, username, nickname, jurusan, belum_dinilai, feedback, open, feedback_terakhir).
+    Dimulai dari pengirim feedback; hitungan jawaban memakai indeks (user_id, task_id).
+    """
+    with get_reporting_connection() as conn:
+        return conn.execute("""
+            SELECT u.id, u.username, u.nickname, u.jurusan, ungraded.n, f.total, f.open, f.last_at
+            FROM (
+                SELECT user_id, COUNT(*) AS total, SUM(status = 'open') AS open, MAX(created_at) AS last_at
+                FROM fb.feedback
+                WHERE role = 'student'
+                GROUP BY user_id
+            ) f
+            JOIN main.users u ON u.id = f.user_id
+            JOIN (
+                SELECT a.user_id, COUNT(*) AS n
+                FROM main.answers a
+                WHERE a.status = 'submitted' AND a.score IS NULL
+                  AND a.user_id IN (SELECT user_id FROM fb.feedback WHERE role = 'student')
+                GROUP BY a.user_id
+            ) ungraded ON ungraded.user_id = f.user_id
+            WHERE ungraded.n >= ?
+            ORDER BY ungraded.n DESC, f.total DESC
+            LIMIT ?
+        """, (min_ungraded, limit)).fetchall()
 
 # ========== USER FUNCTIONS ==========
+@storage_helper("users")
 def add_user(username, password, role="student", nickname="", jurusan="", mata_kuliah=""):
     try:
-        conn = get_connection()
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO users(username, password, role, nickname, jurusan, mata_kuliah) 
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (username, password, role, nickname, jurusan, mata_kuliah))
-        conn.commit()
-        conn.close()
-        return True
+        def write(conn):
+            c = conn.cursor()
+            c.execute("""
+                INSERT INTO users(username, password, role, nickname, jurusan, mata_kuliah) 
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (username, password, role, nickname, jurusan, mata_kuliah))
+        write_db(write)
     except sqlite3.IntegrityError:
         return False
+    return True
 
+@storage_helper()
 def user_exists(username):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id FROM users WHERE username=?", (username,))
-    row = c.fetchone()
-    conn.close()
-    return row is not None
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id FROM users WHERE username=?", (username,))
+        return c.fetchone() is not None
 
+@storage_helper()
 def get_user_by_credentials(username, password):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, username, password, role, nickname, jurusan, mata_kuliah 
-        FROM users WHERE username=? AND password=?
-    """, (username, password))
-    row = c.fetchone()
-    conn.close()
-    return row
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, username, password, role, nickname, jurusan, mata_kuliah 
+            FROM users WHERE username=? AND password=?
+        """, (username, password))
+        return c.fetchone()
 
+@storage_helper("users")
 def update_user_password(user_id, new_password):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("UPDATE users SET password=? WHERE id=?", (new_password, user_id))
-    conn.commit()
-    conn.close()
+    def write(conn):
+        conn.execute("UPDATE users SET password=? WHERE id=?", (new_password, user_id))
+    write_db(write)
 
 def update_user_info(user_id, username=None, nickname=None, jurusan=None, mata_kuliah=None):
     """Admin function to update user info"""
-    conn = get_connection()
-    c = conn.cursor()
-    updates = []
-    params = []
-    if username:
-        updates.append("username=?")
-        params.append(username)
-    if nickname is not None:
-        updates.append("nickname=?")
-        params.append(nickname)
-    if jurusan is not None:
-        updates.append("jurusan=?")
-        params.append(jurusan)
-    if mata_kuliah is not None:
-        updates.append("mata_kuliah=?")
-        params.append(mata_kuliah)
-    if updates:
-        params.append(user_id)
-        query = f"UPDATE users SET {', '.join(updates)} WHERE id=?"
-        c.execute(query, params)
-        conn.commit()
-    conn.close()
+    update_users_info([(user_id, username, nickname, jurusan, mata_kuliah)])
+
+@storage_helper("users")
+def update_users_info(changes):
+    """Update banyak user dalam satu transaksi; changes berisi (user_id, username, nickname, jurusan, mata_kuliah).
 
+    Username kosong dan kolom None tidak diubah (sama seperti update_user_info).
+    Username duplikat memunculkan sqlite3.IntegrityError dan seluruh batch dibatalkan.
+    """
+    params = [(username or None, nickname, jurusan, mata_kuliah, user_id)
+              for user_id, username, nickname, jurusan, mata_kuliah in changes]
+    if not params:
+        return 0
+    def write(conn):
+        conn.executemany("""
+            UPDATE users SET
+                username = COALESCE(?, username),
+                nickname = COALESCE(?, nickname),
+                jurusan = COALESCE(?, jurusan),
+                mata_kuliah = COALESCE(?, mata_kuliah)
+            WHERE id = ?
+        """, params)
+    write_db(write)
+    return len(params)
+
+@cached_query("users")
 def list_users():
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, username, role, nickname, jurusan, mata_kuliah FROM users ORDER BY id")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, username, role, nickname, jurusan, mata_kuliah FROM users ORDER BY id")
+        return c.fetchall()
 
+@cached_query("users")
 def get_user_by_id(user_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, username, role, nickname, jurusan, mata_kuliah FROM users WHERE id=?", (user_id,))
-    row = c.fetchone()
-    conn.close()
-    return row
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, username, role, nickname, jurusan, mata_kuliah FROM users WHERE id=?", (user_id,))
+        return c.fetchone()
+
+# ========== USER DIRECTORY ==========
+# Direktori user untuk admin: paginasi keyset pada username dan pencarian prefix
+# lewat range query di indeks COLLATE NOCASE (bukan LIKE '%...%' yang memindai tabel).
+USER_PAGE_SIZE = 50
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def _prefix_bounds(prefix):
+    """Rentang [low, high) untuk prefix; NOCASE hanya melipat huruf ASCII"""
+    low = prefix.translate(_ASCII_LOWER)
+    return low, low[:-1] + chr(min(ord(low[-1]) + 1, sys.maxunicode))
+
+def _user_directory_filter(search=None, role=None, jurusan=None):
+    conditions, params = [], []
+    if search:
+        low, high = _prefix_bounds(search)
+        conditions.append("""(
+            (username >= ? COLLATE NOCASE AND username < ? COLLATE NOCASE)
+            OR (nickname >= ? COLLATE NOCASE AND nickname < ? COLLATE NOCASE)
+        )""")
+        params.extend([low, high, low, high])
+    if role:
+        conditions.append("role = ?")
+        params.append(role)
+    if jurusan:
+        conditions.append("jurusan = ?")
+        params.append(jurusan)
+    return conditions, params
+
+@storage_helper()
+def search_users(search=None, role=None, jurusan=None, cursor=None, limit=USER_PAGE_SIZE):
+    """Satu halaman direktori user, urut username.
+
+    `search` dicocokkan sebagai awalan username atau nickname (tanpa beda huruf besar/kecil).
+    `cursor` adalah username terakhir halaman sebelumnya. Kembalikan (rows, next_cursor).
+    """
+    conditions, params = _user_directory_filter(search, role, jurusan)
+    if cursor is not None:
+        conditions.append("username > ?")
+        params.append(cursor)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT id, username, role, nickname, jurusan, mata_kuliah
+            FROM users
+            {where}
+            ORDER BY username
+            LIMIT ?
+        """, params + [limit + 1]).fetchall()
+    return _keyset_page(rows, limit, lambda row: row[1])
+
+@cached_query("users")
+def count_users(search=None, role=None, jurusan=None):
+    conditions, params = _user_directory_filter(search, role, jurusan)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM users {where}", params).fetchone()[0]
+
+@cached_query("users")
+def get_user_jurusan_list():
+    """Daftar jurusan yang dipakai user (dibaca dari indeks users(jurusan))"""
+    with get_connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT DISTINCT jurusan FROM users WHERE jurusan <> '' ORDER BY jurusan"
+        )]
+
+# ========== BULK USER IMPORT / EXPORT ==========
+USER_ROLES = ("student", "lecturer", "admin")
+USER_EXPORT_FIELDS = ("id", "username", "role", "nickname", "jurusan", "mata_kuliah")
+USER_IMPORT_FIELDS = ("username", "password", "role", "nickname", "jurusan", "mata_kuliah")
+USER_EXPORT_CHUNK_ROWS = 1000
+MIN_PASSWORD_LENGTH = 4
+
+def parse_user_file(data, fmt):
+    """Baca isi file CSV/JSON (bytes atau str) menjadi list dict"""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    if fmt == "csv":
+        return [dict(row) for row in csv.DictReader(io.StringIO(data))]
+    if fmt == "json":
+        rows = json.loads(data)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON harus berupa list objek user")
+        return rows
+    raise ValueError(f"Format tidak dikenal: {fmt}")
+
+def validate_user_rows(rows, default_password=""):
+    """Validasi baris import di memori; kembalikan (baris_valid, error).
+
+    Baris valid berupa (nomor_baris, tuple USER_IMPORT_FIELDS); error berupa
+    (nomor_baris, username, pesan). Nomor baris dimulai dari 1 (baris data pertama).
+    """
+    valid, errors, seen = [], [], set()
+    for number, row in enumerate(rows, start=1):
+        values = {field: str(row.get(field) or "").strip() for field in USER_IMPORT_FIELDS}
+        username = values["username"]
+        values["password"] = values["password"] or default_password
+        values["role"] = values["role"] or "student"
+        if not username:
+            errors.append((number, username, "Username wajib diisi"))
+        elif username in seen:
+            errors.append((number, username, "Username duplikat di dalam file"))
+        elif values["role"] not in USER_ROLES:
+            errors.append((number, username, f"Role tidak valid: {values['role']}"))
+        elif len(values["password"]) < MIN_PASSWORD_LENGTH:
+            errors.append((number, username, f"Password minimal {MIN_PASSWORD_LENGTH} karakter"))
+        else:
+            if values["role"] != "student":
+                values["jurusan"] = ""
+            if values["role"] != "lecturer":
+                values["mata_kuliah"] = ""
+            valid.append((number, tuple(values[field] for field in USER_IMPORT_FIELDS)))
+        seen.add(username)
+    return valid, errors
+
+def import_users(rows, default_password=""):
+    """Import banyak user dalam satu transaksi; kembalikan {"inserted": n, "errors": [...]}."""
+    valid, errors = validate_user_rows(rows, default_password)
+    existing = insert_new_users([values for _, values in valid]) if valid else set()
+    errors.extend((number, values[0], "Username sudah ada") for number, values in valid if values[0] in existing)
+    errors.sort()
+    return {"inserted": len(valid) - len(existing), "errors": errors}
+
+@storage_helper("users")
+def insert_new_users(users):
+    """Tambah user (tuple USER_IMPORT_FIELDS, username unik) yang username-nya belum ada.
+
+    Username yang sudah ada dideteksi dengan satu query berbasis himpunan di dalam
+    transaksi yang sama dengan INSERT (executemany), jadi tidak ada celah race.
+    Kembalikan himpunan username yang dilewati karena sudah ada.
+    """
+    def write(conn):
+        usernames = json.dumps([values[0] for values in users])
+        existing = {row[0] for row in conn.execute(
+            "SELECT username FROM users WHERE username IN (SELECT value FROM json_each(?))", (usernames,)
+        )}
+        conn.executemany("""
+            INSERT INTO users(username, password, role, nickname, jurusan, mata_kuliah)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [values for values in users if values[0] not in existing])
+        return existing
+    return write_db(write)
+
+@storage_helper()
+def iter_user_chunks(chunk_rows=USER_EXPORT_CHUNK_ROWS):
+    """Hasilkan semua user (kolom USER_EXPORT_FIELDS, urut id) per potongan list tuple"""
+    with get_connection() as conn:
+        cursor = conn.execute(f"SELECT {', '.join(USER_EXPORT_FIELDS)} FROM users ORDER BY id")
+        yield from iter(lambda: cursor.fetchmany(chunk_rows), [])
+
+def iter_users_export(fmt="csv", chunk_rows=USER_EXPORT_CHUNK_ROWS):
+    """Hasilkan export kolom list_users() sebagai potongan teks CSV/JSON (streaming per potongan)"""
+    if fmt not in ("csv", "json"):
+        raise ValueError(f"Format tidak dikenal: {fmt}")
+    chunks = iter_user_chunks(chunk_rows)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(USER_EXPORT_FIELDS)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()  # hanya header (belum ada user)
+        return
+    yield "["
+    separator = "\n"
+    for rows in chunks:
+        chunk = []
+        for row in rows:
+            chunk.append(separator + json.dumps(dict(zip(USER_EXPORT_FIELDS, row)), ensure_ascii=False))
+            separator = ",\n"
+        yield "".join(chunk)
+    yield "\n]\n"
 
 # ========== MATERIALS FUNCTIONS ==========
 def add_material(title, link, mata_kuliah, target_jurusan, created_by):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO materials(title, link, mata_kuliah, target_jurusan, created_by, created_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (title, link, mata_kuliah, json.dumps(target_jurusan), created_by, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
+    add_materials([(title, link, mata_kuliah, target_jurusan, created_by)])
 
+@storage_helper("materials")
+def add_materials(materials):
+    """Tambah banyak materi beserta targetnya dalam satu transaksi (semua atau tidak sama sekali).
+
+    materials berisi (title, link, mata_kuliah, target_jurusan, created_by); kembalikan id baru.
+    """
+    created_at = datetime.now().isoformat()
+    rows = [(title, link, mata_kuliah, normalize_target_jurusan(target_jurusan), created_by)
+            for title, link, mata_kuliah, target_jurusan, created_by in materials]
+    if not rows:
+        return []
+    def write(conn):
+        ids, targets = [], []
+        for title, link, mata_kuliah, target_jurusan, created_by in rows:
+            material_id = conn.execute("""
+                INSERT INTO materials(title, link, mata_kuliah, target_jurusan, created_by, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (title, link, mata_kuliah, json.dumps(target_jurusan), created_by, created_at)).lastrowid
+            ids.append(material_id)
+            targets.extend((material_id, jurusan) for jurusan in target_jurusan)
+        conn.executemany("INSERT OR IGNORE INTO material_targets(material_id, jurusan) VALUES (?, ?)", targets)
+        return ids
+    return write_db(write)
+
+@cached_query("materials")
 def get_materials_by_mata_kuliah_jurusan(mata_kuliah, jurusan):
     """Get materials filtered by mata kuliah and jurusan"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at 
-        FROM materials 
-        WHERE mata_kuliah=?
-        ORDER BY id DESC
-    """, (mata_kuliah,))
-    rows = c.fetchall()
-    conn.close()
-    # Filter by jurusan
-    filtered = []
-    for row in rows:
-        target = json.loads(row[4])
-        if jurusan in target or "Semua Jurusan" in target:
-            filtered.append(row)
-    return filtered
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at 
+            FROM materials 
+            WHERE mata_kuliah=?
+              AND id IN (SELECT material_id FROM material_targets WHERE jurusan IN (?, ?))
+            ORDER BY id DESC
+        """, (mata_kuliah, jurusan, ALL_JURUSAN))
+        return c.fetchall()
 
+@cached_query("materials")
 def get_all_materials_by_lecturer(mata_kuliah):
     """Get all materials created by lecturer for their mata kuliah"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at 
-        FROM materials 
-        WHERE mata_kuliah=?
-        ORDER BY id DESC
-    """, (mata_kuliah,))
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at 
+            FROM materials 
+            WHERE mata_kuliah=?
+            ORDER BY id DESC
+        """, (mata_kuliah,))
+        return c.fetchall()
 
+@cached_query("materials")
 def get_all_materials():
     """Admin: get all materials"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at 
-        FROM materials 
-        ORDER BY id DESC
-    """)
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at 
+            FROM materials 
+            ORDER BY id DESC
+        """)
+        return c.fetchall()
+
+@cached_query("materials")
+def get_material(material_id):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, link, mata_kuliah, target_jurusan, created_by, created_at
+            FROM materials WHERE id=?
+        """, (material_id,))
+        return c.fetchone()
 
+@storage_helper("materials")
 def delete_material(material_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("DELETE FROM materials WHERE id=?", (material_id,))
-    conn.commit()
-    conn.close()
+    def write(conn):
+        conn.execute("DELETE FROM material_targets WHERE material_id=?", (material_id,))
+        conn.execute("DELETE FROM materials WHERE id=?", (material_id,))
+    write_db(write)
 
+@storage_helper("materials")
 def update_material(material_id, title=None, link=None, target_jurusan=None):
     """Admin function to update material"""
-    conn = get_connection()
-    c = conn.cursor()
     updates = []
     params = []
     if title:
@@ -273,88 +1691,148 @@ def update_material(material_id, title=None, link=None, target_jurusan=None):
         updates.append("link=?")
         params.append(link)
     if target_jurusan:
+        target_jurusan = normalize_target_jurusan(target_jurusan)
         updates.append("target_jurusan=?")
         params.append(json.dumps(target_jurusan))
     if updates:
         params.append(material_id)
         query = f"UPDATE materials SET {', '.join(updates)} WHERE id=?"
-        c.execute(query, params)
-        conn.commit()
-    conn.close()
+        def write(conn):
+            conn.execute(query, params)
+            if target_jurusan:
+                _replace_targets(conn, "material_targets", "material_id", material_id, target_jurusan)
+        write_db(write)
 
 # ========== TASKS FUNCTIONS ==========
 def add_task(title, description, mata_kuliah, target_jurusan, created_by, deadline=None):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO tasks(title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (title, description, mata_kuliah, json.dumps(target_jurusan), created_by, datetime.now().isoformat(), deadline))
-    conn.commit()
-    conn.close()
+    add_tasks([(title, description, mata_kuliah, target_jurusan, created_by, deadline)])
+
+@storage_helper("tasks")
+def add_tasks(tasks):
+    """Tambah banyak tugas beserta targetnya dalam satu transaksi (semua atau tidak sama sekali).
 
+    tasks berisi (title, description, mata_kuliah, target_jurusan, created_by, deadline); kembalikan id baru.
+    """
+    created_at = datetime.now().isoformat()
+    rows = [(title, description, mata_kuliah, normalize_target_jurusan(target_jurusan), created_by, deadline)
+            for title, description, mata_kuliah, target_jurusan, created_by, deadline in tasks]
+    if not rows:
+        return []
+    def write(conn):
+        ids, targets = [], []
+        for title, description, mata_kuliah, target_jurusan, created_by, deadline in rows:
+            task_id = conn.execute("""
+                INSERT INTO tasks(title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (title, description, mata_kuliah, json.dumps(target_jurusan), created_by, created_at, deadline)).lastrowid
+            ids.append(task_id)
+            targets.extend((task_id, jurusan) for jurusan in target_jurusan)
+        conn.executemany("INSERT OR IGNORE INTO task_targets(task_id, jurusan) VALUES (?, ?)", targets)
+        return ids
+    return write_db(write)
+
+@cached_query("tasks")
 def get_tasks_by_mata_kuliah_jurusan(mata_kuliah, jurusan):
     """Get tasks filtered by mata kuliah and jurusan"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
-        FROM tasks 
-        WHERE mata_kuliah=?
-        ORDER BY id
-    """, (mata_kuliah,))
-    rows = c.fetchall()
-    conn.close()
-    # Filter by jurusan
-    filtered = []
-    for row in rows:
-        target = json.loads(row[4])
-        if jurusan in target or "Semua Jurusan" in target:
-            filtered.append(row)
-    return filtered
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
+            FROM tasks 
+            WHERE mata_kuliah=?
+              AND id IN (SELECT task_id FROM task_targets WHERE jurusan IN (?, ?))
+            ORDER BY id
+        """, (mata_kuliah, jurusan, ALL_JURUSAN))
+        return c.fetchall()
 
+@cached_query("tasks")
 def get_all_tasks_by_lecturer(mata_kuliah):
     """Get all tasks created by lecturer for their mata kuliah"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
-        FROM tasks 
-        WHERE mata_kuliah=?
-        ORDER BY id
-    """, (mata_kuliah,))
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
+            FROM tasks 
+            WHERE mata_kuliah=?
+            ORDER BY id
+        """, (mata_kuliah,))
+        return c.fetchall()
 
+@cached_query("tasks")
 def get_all_tasks():
     """Admin: get all tasks"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
-        FROM tasks 
-        ORDER BY id
-    """)
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
+            FROM tasks 
+            ORDER BY id
+        """)
+        return c.fetchall()
+
+@cached_query("tasks")
+def get_task_mata_kuliah_list():
+    """Daftar mata kuliah yang memiliki tugas (dibaca dari indeks tasks(mata_kuliah))"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT DISTINCT mata_kuliah FROM tasks ORDER BY mata_kuliah")
+        return [row[0] for row in c.fetchall()]
 
+@cached_query("tasks")
+def get_task_titles(mata_kuliah):
+    """(id, title) tugas satu mata kuliah untuk pilihan filter, tanpa deskripsi"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, title FROM tasks WHERE mata_kuliah=? ORDER BY id", (mata_kuliah,))
+        return c.fetchall()
+
+TASKS_PAGE_SIZE = 25
+
+@storage_helper()
+def get_tasks_page(mata_kuliah=None, cursor=None, limit=TASKS_PAGE_SIZE):
+    """Satu halaman daftar tugas (tanpa deskripsi), urut mata kuliah lalu id.
+
+    Paginasi keyset pada (mata_kuliah, id) lewat indeks tasks(mata_kuliah);
+    `cursor` adalah nilai kembalian sebelumnya. Kembalikan (rows, next_cursor).
+    """
+    conditions, params = [], []
+    if mata_kuliah:
+        conditions.append("mata_kuliah = ?")
+        params.append(mata_kuliah)
+    if cursor is not None:
+        conditions.append("(mata_kuliah, id) > (?, ?)")
+        params.extend(cursor)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT id, title, mata_kuliah, target_jurusan, created_by, created_at, deadline
+            FROM tasks
+            {where}
+            ORDER BY mata_kuliah, id
+            LIMIT ?
+        """, params + [limit + 1]).fetchall()
+    return _keyset_page(rows, limit, lambda row: (row[2], row[0]))
+
+@cached_query("tasks")
+def count_tasks(mata_kuliah=None):
+    with get_connection() as conn:
+        if mata_kuliah:
+            return conn.execute("SELECT COUNT(*) FROM tasks WHERE mata_kuliah=?", (mata_kuliah,)).fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+@cached_query("tasks")
 def get_task(task_id):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
-        FROM tasks WHERE id=?
-    """, (task_id,))
-    row = c.fetchone()
-    conn.close()
-    return row
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline 
+            FROM tasks WHERE id=?
+        """, (task_id,))
+        return c.fetchone()
 
+@storage_helper("tasks")
 def update_task(task_id, title=None, description=None, target_jurusan=None, deadline=None):
     """Admin function to update task"""
-    conn = get_connection()
-    c = conn.cursor()
     updates = []
     params = []
     if title:
@@ -364,6 +1842,7 @@ def update_task(task_id, title=None, description=None, target_jurusan=None, dead
         updates.append("description=?")
         params.append(description)
     if target_jurusan:
+        target_jurusan = normalize_target_jurusan(target_jurusan)
         updates.append("target_jurusan=?")
         params.append(json.dumps(target_jurusan))
     if deadline is not None:
@@ -372,123 +1851,1790 @@ def update_task(task_id, title=None, description=None, target_jurusan=None, dead
     if updates:
         params.append(task_id)
         query = f"UPDATE tasks SET {', '.join(updates)} WHERE id=?"
-        c.execute(query, params)
-        conn.commit()
-    conn.close()
+        def write(conn):
+            conn.execute(query, params)
+            if target_jurusan:
+                _replace_targets(conn, "task_targets", "task_id", task_id, target_jurusan)
+        write_db(write)
+
+@storage_helper("tasks", "answers")
+def delete_task(task_id):
+    """Admin function to delete task"""
+    def write(conn):
+        conn.execute("DELETE FROM task_targets WHERE task_id=?", (task_id,))
+        conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+        conn.execute("DELETE FROM answers WHERE task_id=?", (task_id,))
+    write_db(write)
+
+# ========== DRAFT WRITE-BEHIND BUFFER ==========
+DRAFT_FLUSH_INTERVAL_SECONDS = 0.5
+DRAFT_FLUSH_LATENCY_SAMPLES = 200
+
+class DraftWriteBuffer:
+    """Buffer write-behind untuk simpan draft jawaban.
+
+    Simpanan untuk answer_id yang sama dalam satu jendela flush digabung (yang
+    terakhir menang), lalu thread latar menulis semuanya dalam satu transaksi
+    per database. `flush()` bisa dipanggil sinkron, mis. sebelum finalisasi.
+    """
+
+    def __init__(self, flush_interval=DRAFT_FLUSH_INTERVAL_SECONDS):
+        self.flush_interval = flush_interval
+        self._pending = {}  # answer_id -> (answer_text, saved_at, db_path)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._latencies = deque(maxlen=DRAFT_FLUSH_LATENCY_SAMPLES)
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.errors = 0
+
+    def save(self, answer_id, answer_text):
+        with self._lock:
+            if answer_id in self._pending:
+                self.coalesced += 1
+            self._pending[answer_id] = (answer_text, datetime.now().isoformat(), DB_PATH)
+            self.enqueued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="draft-write-behind", daemon=True)
+                self._thread.start()
+
+    def pending_text(self, answer_id):
+        """Teks draft yang belum di-flush (None jika tidak ada) untuk read-your-writes"""
+        entry = self._pending.get(answer_id)
+        return entry[0] if entry else None
+
+    def flush(self, answer_ids=None):
+        """Tulis draft tertunda (semua, atau hanya answer_ids) secara sinkron"""
+        with self._flush_lock:
+            with self._lock:
+                if answer_ids is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {aid: self._pending.pop(aid) for aid in answer_ids if aid in self._pending}
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            by_path = {}
+            for answer_id, (answer_text, saved_at, db_path) in batch.items():
+                by_path.setdefault(db_path, []).append((answer_text, saved_at, answer_id))
+            try:
+                for db_path, drafts in by_path.items():
+                    write_answer_drafts(db_path, drafts)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                    # Kembalikan ke antrean kecuali sudah ada simpanan yang lebih baru
+                    for answer_id, entry in batch.items():
+                        self._pending.setdefault(answer_id, entry)
+                raise
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += len(batch)
+                self._latencies.append(time.perf_counter() - started)
+            return len(batch)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass  # sudah dihitung di self.errors; dicoba lagi pada putaran berikutnya
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            oldest = min((entry[1] for entry in self._pending.values()), default=None)
+            return {
+                "queue_depth": len(self._pending),
+                "oldest_pending_at": oldest,
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "errors": self.errors,
+                "flush_latency_ms_avg": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+                "flush_latency_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+                "flush_latency_ms_max": 1000 * latencies[-1] if latencies else 0.0,
+            }
+
+@st.cache_resource
+def _draft_buffer_store():
+    buffer = DraftWriteBuffer()
+    atexit.register(buffer.flush)
+    return buffer
+
+draft_buffer = _draft_buffer_store()
+
+# ========== ANSWERS FUNCTIONS ==========
+def get_or_create_answer(user_id, username, task_id):
+    """Get existing draft or create new one"""
+    row = get_user_task_answer(user_id, task_id)
+    if row:
+        pending = draft_buffer.pending_text(row[0]) if row[2] == "draft" else None
+        return row if pending is None else (row[0], pending) + row[2:]
+    return create_answer_draft(user_id, username, task_id)
+
+_USER_TASK_ANSWER_QUERY = """
+    SELECT id, answer, status, submitted_at, finalized_at 
+    FROM answers 
+    WHERE user_id=? AND task_id=?
+"""
+
+@storage_helper()
+def get_user_task_answer(user_id, task_id):
+    """(id, answer, status, submitted_at, finalized_at) jawaban user untuk satu tugas, atau None"""
+    with get_connection() as conn:
+        return conn.execute(_USER_TASK_ANSWER_QUERY, (user_id, task_id)).fetchone()
+
+@storage_helper("answers")
+def create_answer_draft(user_id, username, task_id):
+    """Buat draft kosong untuk (user, task) dan kembalikan barisnya seperti get_user_task_answer().
+
+    UNIQUE(user_id, task_id) membuat insert yang balapan diabaikan.
+    """
+    def write(conn):
+        conn.execute("""
+            INSERT OR IGNORE INTO answers(task_id, user_id, username, answer, status, submitted_at)
+            VALUES (?, ?, ?, '', 'draft', ?)
+        """, (task_id, user_id, username, datetime.now().isoformat()))
+        return conn.execute(_USER_TASK_ANSWER_QUERY, (user_id, task_id)).fetchone()
+    return write_db(write)
+
+def save_answer_draft(answer_id, answer_text):
+    """Save answer as draft (can be edited); ditulis lewat draft_buffer (write-behind)"""
+    draft_buffer.save(answer_id, answer_text)
+
+# Flush hanya mengubah teks draft yang sudah ada; pembaca jawaban submitted
+# (penilaian, analitik, laporan) tidak bergantung pada tag ini
+@storage_helper("answer_drafts")
+def write_answer_drafts(db_path, drafts):
+    """Tulis draft dari draft_buffer ke database `db_path`; drafts berisi (answer_text, saved_at, answer_id).
+
+    Jawaban yang sudah submitted tidak diubah.
+    """
+    def write(conn):
+        conn.executemany("""
+            UPDATE answers 
+            SET answer=?, submitted_at=? 
+            WHERE id=? AND status='draft'
+        """, drafts)
+    _get_writer(db_path).execute(write)
+
+@storage_helper("answers")
+def upsert_answer_draft(user_id, username, task_id, answer_text):
+    """Simpan draft untuk (user, task), membuat barisnya pada penyimpanan pertama.
+
+    Jawaban yang sudah submitted tidak ditimpa. Mengembalikan answer_id.
+    """
+    def write(conn):
+        conn.execute("""
+            INSERT INTO answers(task_id, user_id, username, answer, status, submitted_at)
+            VALUES (?, ?, ?, ?, 'draft', ?)
+            ON CONFLICT(user_id, task_id) DO UPDATE
+            SET answer=excluded.answer, submitted_at=excluded.submitted_at
+            WHERE answers.status = 'draft'
+        """, (task_id, user_id, username, answer_text, datetime.now().isoformat()))
+        return conn.execute("SELECT id FROM answers WHERE user_id=? AND task_id=?", (user_id, task_id)).fetchone()
+    return write_db(write)[0]
+
+def finalize_answer(answer_id):
+    """Finalize answer (lock from editing)"""
+    draft_buffer.flush([answer_id])
+    submit_answer(answer_id)
+
+@storage_helper("answers")
+def submit_answer(answer_id):
+    """Tandai jawaban submitted; draft tertunda harus sudah di-flush (lihat finalize_answer)"""
+    def write(conn):
+        conn.execute("""
+            UPDATE answers 
+            SET status='submitted', finalized_at=? 
+            WHERE id=?
+        """, (datetime.now().isoformat(), answer_id))
+    write_db(write)
+
+@cached_query("answers")
+def get_answers_for_task(task_id):
+    """Get all submitted answers for a task"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, task_id, user_id, username, answer, score, feedback, status, submitted_at, finalized_at 
+            FROM answers 
+            WHERE task_id=? AND status='submitted'
+            ORDER BY id
+        """, (task_id,))
+        return c.fetchall()
+
+def get_answers_for_user_tasks(user_id, mata_kuliah):
+    """Jawaban user untuk semua tugas satu mata kuliah dalam satu query (tanpa menulis apa pun).
+
+    Mengembalikan dict task_id -> (id, answer, status, submitted_at, finalized_at, score, feedback);
+    tugas yang belum pernah disimpan tidak punya entri. Teks draft yang belum di-flush hanya
+    menimpa jawaban yang masih draft (flush juga tidak mengubah jawaban submitted).
+    """
+    answers = {}
+    for row in get_user_course_answers(user_id, mata_kuliah):
+        pending = draft_buffer.pending_text(row[1]) if row[3] == "draft" else None
+        answers[row[0]] = row[1:] if pending is None else (row[1], pending) + row[3:]
+    return answers
+
+@storage_helper()
+def get_user_course_answers(user_id, mata_kuliah):
+    """Baris (task_id, id, answer, status, submitted_at, finalized_at, score, feedback) untuk
+    get_answers_for_user_tasks(), tanpa draft yang belum di-flush"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT answers.task_id, answers.id, answers.answer, answers.status, answers.submitted_at,
+                   answers.finalized_at, answers.score, answers.feedback
+            FROM tasks
+            JOIN answers ON answers.task_id = tasks.id AND answers.user_id = ?
+            WHERE tasks.mata_kuliah = ?
+        """, (user_id, mata_kuliah))
+        return c.fetchall()
+
+@cached_query("answers", "answer_drafts", "tasks")
+def get_answers_for_user_by_mata_kuliah(user_id, mata_kuliah):
+    """Get user's answers filtered by mata kuliah"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT answers.id, tasks.title, answers.answer, answers.score, answers.feedback, 
+                   answers.status, answers.submitted_at, answers.finalized_at
+            FROM answers 
+            JOIN tasks ON answers.task_id = tasks.id
+            WHERE answers.user_id=? AND tasks.mata_kuliah=?
+            ORDER BY answers.id
+        """, (user_id, mata_kuliah))
+        return c.fetchall()
+
+def update_answer_score(answer_id, score, feedback=None):
+    update_answer_scores([(answer_id, score, feedback)])
+
+@storage_helper("answers")
+def update_answer_scores(grades):
+    """Simpan banyak nilai dalam satu transaksi; grades berisi (answer_id, score, feedback).
+
+    Kembalikan jumlah jawaban yang benar-benar diubah (answer_id yang tidak ada tidak dihitung).
+    """
+    params = [(score, feedback, answer_id) for answer_id, score, feedback in grades]
+    if not params:
+        return 0
+    def write(conn):
+        return conn.executemany("UPDATE answers SET score=?, feedback=? WHERE id=?", params).rowcount
+    return write_db(write)
+
+@cached_query("answers", "tasks")
+def get_submitted_answers_by_mata_kuliah(mata_kuliah):
+    """Lecturer: semua jawaban submitted untuk seluruh tugas satu mata kuliah"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT answers.id, answers.task_id, tasks.title, answers.username, answers.answer,
+                   answers.score, answers.feedback, answers.finalized_at
+            FROM tasks
+            JOIN answers ON answers.task_id = tasks.id AND answers.status = 'submitted'
+            WHERE tasks.mata_kuliah=?
+            ORDER BY tasks.id, answers.id
+        """, (mata_kuliah,))
+        return c.fetchall()
+
+@storage_helper()
+def get_all_answers():
+    """Admin: get all answers"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT answers.id, answers.task_id, tasks.title, tasks.mata_kuliah, 
+                   answers.username, answers.answer, answers.score, answers.feedback, 
+                   answers.status, answers.submitted_at, answers.finalized_at
+            FROM answers 
+            JOIN tasks ON answers.task_id=tasks.id
+            ORDER BY answers.id DESC
+        """)
+        return c.fetchall()
+
+ANSWERS_PAGE_SIZE = 50
+ANSWER_PREVIEW_CHARS = 80
+
+def _like_prefix(text):
+    """Pola LIKE untuk pencocokan awalan; % dan _ dari input di-escape"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+@storage_helper()
+def get_answers_page(before_id=None, limit=ANSWERS_PAGE_SIZE, mata_kuliah=None, status=None,
+                     task_id=None, username=None):
+    """Admin: satu halaman jawaban terbaru dengan kursor keyset pada answers.id.
+
+    Mengembalikan (rows, next_before_id); next_before_id None berarti halaman terakhir.
+    Kolom jawaban hanya berisi pratinjau; isi lengkap lewat get_answer_detail().
+    """
+    where = []
+    params = [ANSWER_PREVIEW_CHARS, ANSWER_PREVIEW_CHARS]
+    if before_id is not None:
+        where.append("answers.id < ?")
+        params.append(before_id)
+    if mata_kuliah:
+        where.append("tasks.mata_kuliah = ?")
+        params.append(mata_kuliah)
+    if status:
+        where.append("answers.status = ?")
+        params.append(status)
+    if task_id is not None:
+        where.append("answers.task_id = ?")
+        params.append(task_id)
+    if username:
+        where.append("answers.username LIKE ? ESCAPE '\\'")
+        params.append(_like_prefix(username))
+    params.append(limit + 1)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f"""
+            SELECT answers.id, answers.task_id, tasks.title, tasks.mata_kuliah, answers.username,
+                   CASE WHEN length(answers.answer) > ? THEN substr(answers.answer, 1, ?) || '…'
+                        ELSE answers.answer END,
+                   answers.score, answers.status, answers.submitted_at, answers.finalized_at
+            FROM answers
+            JOIN tasks ON answers.task_id=tasks.id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY answers.id DESC
+            LIMIT ?
+        """, params)
+        rows = c.fetchall()
+    return _keyset_page(rows, limit, lambda row: row[0])
+
+@storage_helper()
+def get_answer_detail(answer_id):
+    """Admin: satu jawaban lengkap (isi jawaban dan feedback)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT answers.id, answers.task_id, tasks.title, tasks.mata_kuliah, 
+                   answers.username, answers.answer, answers.score, answers.feedback, 
+                   answers.status, answers.submitted_at, answers.finalized_at
+            FROM answers 
+            JOIN tasks ON answers.task_id=tasks.id
+            WHERE answers.id=?
+        """, (answer_id,))
+        return c.fetchone()
+
+# ========== GRADEBOOK EXPORT ==========
+# Export nilai di-stream dari cursor SQLite per potongan tetap ke CSV/Parquet, jadi
+# memori tetap datar berapa pun jumlah jawaban. Urutan mengikuti id jawaban: tanpa
+# filter tabel dibaca berurutan tanpa sort; dengan filter tugas/mata kuliah hanya
+# subset itu yang diurutkan.
+GRADEBOOK_CHUNK_ROWS = 5000
+GRADEBOOK_FORMATS = ("csv", "parquet")
+GRADEBOOK_UI_MAX_BYTES = 50 * 1024 * 1024  # batas export yang dimuat ke memori untuk download di browser
+GRADEBOOK_FIELDS = (
+    "answer_id", "task_id", "task_title", "mata_kuliah", "user_id", "username", "nickname",
+    "jurusan", "status", "score", "feedback", "submitted_at", "finalized_at",
+)
+GRADEBOOK_INT_FIELDS = {"answer_id", "task_id", "user_id", "score"}
+
+@storage_helper()
+def iter_gradebook_chunks(mata_kuliah=None, task_id=None, status=None, date_from=None, date_to=None,
+                          include_answer=False, chunk_rows=GRADEBOOK_CHUNK_ROWS):
+    """Hasilkan baris gradebook per potongan (list tuple) sesuai filter.
+
+    date_from/date_to (date atau string ISO, inklusif) memfilter submitted_at.
+    Kolom mengikuti `gradebook_fields(include_answer)`.
+    """
+    conditions, params = [], []
+    if mata_kuliah:
+        conditions.append("t.mata_kuliah = ?")
+        params.append(mata_kuliah)
+    if task_id:
+        conditions.append("a.task_id = ?")
+        params.append(task_id)
+    if status:
+        conditions.append("a.status = ?")
+        params.append(status)
+    if date_from:
+        conditions.append("a.submitted_at >= ?")
+        params.append(str(date_from))
+    if date_to:
+        conditions.append("a.submitted_at < ?")
+        params.append((date.fromisoformat(str(date_to)) + timedelta(days=1)).isoformat())
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_connection() as conn:
+        cursor = conn.execute(f"""
+            SELECT a.id, a.task_id, t.title, t.mata_kuliah, a.user_id, a.username, u.nickname,
+                   u.jurusan, a.status, a.score, a.feedback, a.submitted_at, a.finalized_at
+                   {", a.answer" if include_answer else ""}
+            FROM answers a
+            JOIN tasks t ON t.id = a.task_id
+            LEFT JOIN users u ON u.id = a.user_id
+            {where}
+            ORDER BY a.id
+        """, params)
+        yield from iter(lambda: cursor.fetchmany(chunk_rows), [])
+
+def gradebook_fields(include_answer=False):
+    return GRADEBOOK_FIELDS + (("answer",) if include_answer else ())
+
+def write_gradebook(target, fmt="csv", include_answer=False, chunk_rows=GRADEBOOK_CHUNK_ROWS, **filters):
+    """Tulis gradebook ke `target` (path atau file biner); kembalikan jumlah baris.
+
+    Parquet ditulis per row group memakai pyarrow (terpasang bersama Streamlit).
+    """
+    if fmt not in GRADEBOOK_FORMATS:
+        raise ValueError(f"Format tidak dikenal: {fmt}")
+    fields = gradebook_fields(include_answer)
+    chunks = iter_gradebook_chunks(include_answer=include_answer, chunk_rows=chunk_rows, **filters)
+    total = 0
+    if fmt == "csv":
+        with open(target, "wb") if isinstance(target, str) else nullcontext(target) as raw:
+            text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(fields)
+            for rows in chunks:
+                writer.writerows(rows)
+                total += len(rows)
+            text.flush()
+            text.detach()  # file milik pemanggil tidak ikut ditutup
+        return total
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([(name, pa.int64() if name in GRADEBOOK_INT_FIELDS else pa.string()) for name in fields])
+    with pq.ParquetWriter(target, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema,
+            ))
+            total += len(rows)
+    return total
+
+def export_gradebook(fmt="csv", include_answer=False, max_bytes=GRADEBOOK_UI_MAX_BYTES, **filters):
+    """Buat gradebook di file sementara lalu kembalikan (isi_bytes, jumlah_baris, ukuran_bytes) untuk download.
+
+    isi_bytes None jika file melebihi max_bytes: export sebesar itu tidak dimuat ke
+    memori, pakai export_gradebook.py atau GET /api/v1/gradebook yang men-stream file.
+    """
+    with tempfile.TemporaryFile() as spool:
+        total = write_gradebook(spool, fmt, include_answer, **filters)
+        size = spool.tell()
+        if max_bytes is not None and size > max_bytes:
+            return None, total, size
+        spool.seek(0)
+        return spool.read(), total, size
+
+# ========== COURSE ANALYTICS ==========
+# Analitik nilai per mata kuliah: satu ekstrak SQL dimuat ke pandas, lalu semua
+# statistik dihitung secara vektor (groupby/pivot/cut) tanpa loop Python per baris.
+SCORE_BINS = list(range(0, 101, 10))
+SCORE_BIN_LABELS = [f"{low + (low > 0)}-{high}" for low, high in zip(SCORE_BINS, SCORE_BINS[1:])]
+
+@cached_query("answers", "tasks", "users")
+def get_course_analytics(mata_kuliah):
+    """Statistik nilai satu mata kuliah; dict berisi overall, per_task, per_student, matrix, histogram.
+
+    Rata-rata/median/simpangan baku dihitung dari jawaban submitted yang sudah dinilai.
+    submission_rate = submitted / mahasiswa yang menjadi target tugas;
+    grading_rate = dinilai / submitted. submission_rate dibatasi 1.0 karena target tugas
+    bisa diubah setelah mahasiswa mengumpulkan. DataFrame dipakai bersama antar sesi (jangan diubah).
+    """
+    with get_connection() as conn:
+        answers = pd.read_sql_query("""
+            SELECT a.username, a.task_id, a.status, a.score
+            FROM answers a
+            JOIN tasks t ON t.id = a.task_id
+            WHERE t.mata_kuliah = ?
+        """, conn, params=(mata_kuliah,))
+        tasks = pd.read_sql_query("""
+            WITH students AS (
+                SELECT jurusan, COUNT(*) AS n FROM users WHERE role = 'student' GROUP BY jurusan
+            )
+            SELECT t.id AS task_id, t.title, COALESCE(SUM(s.n), 0) AS eligible
+            FROM tasks t
+            LEFT JOIN task_targets tt ON tt.task_id = t.id
+            LEFT JOIN students s ON tt.jurusan = ? OR s.jurusan = tt.jurusan
+            WHERE t.mata_kuliah = ?
+            GROUP BY t.id
+            ORDER BY t.id
+        """, conn, params=(ALL_JURUSAN, mata_kuliah)).set_index("task_id")
+    return summarize_course_analytics(answers, tasks)
+
+def summarize_course_analytics(answers, tasks):
+    """Hitung statistik get_course_analytics() dari ekstrak mentahnya.
+
+    answers: DataFrame (username, task_id, status, score) jawaban mata kuliah itu;
+    tasks: DataFrame (title, eligible) ber-index task_id, urut id.
+    """
+    submitted = answers[answers["status"] == "submitted"]
+    graded = submitted.dropna(subset=["score"])
+    scores = graded["score"].astype(float)
+
+    per_task = scores.groupby(graded["task_id"]).agg(["mean", "median", "std"]).reindex(tasks.index)
+    per_task.insert(0, "title", tasks["title"])
+    per_task["eligible"] = tasks["eligible"]
+    per_task["submitted"] = submitted.groupby("task_id").size().reindex(tasks.index, fill_value=0)
+    per_task["graded"] = graded.groupby("task_id").size().reindex(tasks.index, fill_value=0)
+    per_task["submission_rate"] = (
+        per_task["submitted"] / per_task["eligible"].where(per_task["eligible"] > 0)
+    ).clip(upper=1.0)
+    per_task["grading_rate"] = per_task["graded"] / per_task["submitted"].where(per_task["submitted"] > 0)
+
+    matrix = graded.pivot_table(index="username", columns="task_id", values="score", aggfunc="first")
+    matrix = matrix.reindex(columns=[tid for tid in tasks.index if tid in matrix.columns])
+    per_student = pd.DataFrame({
+        "mean": matrix.mean(axis=1),
+        "median": matrix.median(axis=1),
+        "std": matrix.std(axis=1),
+        "graded": matrix.count(axis=1),
+    }).reindex(submitted["username"].unique())
+    per_student.insert(0, "submitted", submitted.groupby("username").size())
+    per_student["graded"] = per_student["graded"].fillna(0).astype(int)
+    per_student = per_student.sort_values("mean", ascending=False)
+    matrix.columns = [f"{tasks.at[tid, 'title']} ({tid})" for tid in matrix.columns]
+
+    bins = pd.cut(scores, bins=SCORE_BINS, labels=SCORE_BIN_LABELS, include_lowest=True)
+    histogram = pd.crosstab(graded["task_id"], bins).reindex(
+        index=tasks.index, columns=SCORE_BIN_LABELS, fill_value=0
+    )
+
+    eligible_total = int(per_task["eligible"].sum())
+    overall = {
+        "students": int(submitted["username"].nunique()),
+        "tasks": len(tasks),
+        "submitted": len(submitted),
+        "graded": len(graded),
+        "mean": scores.mean(),
+        "median": scores.median(),
+        "std": scores.std(),
+        "submission_rate": min(1.0, len(submitted) / eligible_total) if eligible_total else None,
+        "grading_rate": len(graded) / len(submitted) if len(submitted) else None,
+    }
+    return {
+        "overall": overall,
+        "per_task": per_task,
+        "per_student": per_student,
+        "matrix": matrix,
+        "histogram": histogram,
+    }
+
+# ========== FULL-TEXT SEARCH ==========
+# Indeks FTS5 external-content (<tabel>_fts) yang dijaga sinkron oleh trigger, jadi
+# teks tidak disimpan dua kali. Hasil diurutkan dengan BM25 (judul diberi bobot lebih).
+SEARCH_PAGE_SIZE = 20
+SEARCH_SNIPPET_TOKENS = 16
+# BM25 menghitung skor untuk setiap dokumen yang cocok; untuk kata yang sangat umum
+# hanya N kecocokan terbaru (rowid terbesar) yang diperingkat agar tetap cepat
+SEARCH_RANK_CANDIDATES = 5000
+SEARCH_KINDS_BY_ROLE = {
+    "admin": ["Tugas", "Materi", "Jawaban", "Feedback"],
+    "lecturer": ["Tugas", "Materi", "Jawaban"],
+}
+# jenis -> (tabel FTS, join ke tabel asal, kolom hasil, bobot bm25, filter dosen)
+SEARCH_SOURCES = {
+    "Tugas": (
+        "tasks_fts", "JOIN tasks t ON t.id = tasks_fts.rowid",
+        "t.id, t.title, t.mata_kuliah || ' · deadline ' || COALESCE(t.deadline, '-')",
+        ", 10.0, 1.0", "t.mata_kuliah = ?",
+    ),
+    "Materi": (
+        "materials_fts", "JOIN materials m ON m.id = materials_fts.rowid",
+        "m.id, m.title, m.mata_kuliah || ' · ' || COALESCE(m.link, '')",
+        "", "m.mata_kuliah = ?",
+    ),
+    "Jawaban": (
+        "answers_fts", "JOIN answers a ON a.id = answers_fts.rowid JOIN tasks t ON t.id = a.task_id",
+        "a.id, t.title || ' — ' || a.username, t.mata_kuliah || ' · ' || a.status",
+        "", "t.mata_kuliah = ? AND a.status = 'submitted'",
+    ),
+    "Feedback": (
+        "feedback_fts", "JOIN feedback f ON f.id = feedback_fts.rowid",
+        "f.id, f.username, f.role || ' · ' || substr(f.created_at, 1, 10)",
+        "", None,
+    ),
+}
+
+def create_fts_index(conn, table, columns):
+    """Buat indeks FTS5 untuk `table`, trigger sinkronisasinya, lalu isi dari data yang ada"""
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{col}" for col in columns)
+    old_values = ", ".join(f"old.{col}" for col in columns)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+            {cols}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_fts(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    # Hanya perubahan kolom teks yang memicu pengindeksan ulang (bukan nilai/status)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {cols} ON {table} BEGIN
+            INSERT INTO {table}_fts({table}_fts, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {table}_fts(rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    """)
+    conn.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+def _fts_query(text):
+    """Ubah input bebas menjadi query FTS5 aman (AND semua kata).
+
+    Hanya kata terakhir yang dicocokkan sebagai awalan (sedang diketik); awalan
+    tanpa indeks prefix mahal pada tabel besar.
+    """
+    words = [f'"{word}"' for word in re.findall(r"\w+", text)]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+@storage_helper()
+def search_documents(kind, text, mata_kuliah=None, offset=0, limit=SEARCH_PAGE_SIZE):
+    """Cari `text` di satu jenis dokumen; kembalikan (rows, ada_halaman_berikutnya).
+
+    Setiap row berisi (id, judul, konteks, cuplikan). Jika `mata_kuliah` diisi
+    (pencarian dosen), hasil dibatasi ke mata kuliah itu dan jawaban yang sudah submitted.
+    """
+    if kind not in SEARCH_SOURCES:
+        raise ValueError(f"Jenis pencarian tidak dikenal: {kind}")
+    fts, joins, columns, weights, lecturer_scope = SEARCH_SOURCES[kind]
+    match = _fts_query(text)
+    if not match or (mata_kuliah is not None and lecturer_scope is None):
+        return [], False
+    scope, scope_params = "", []
+    if mata_kuliah is not None:
+        scope, scope_params = f"AND {lecturer_scope}", [mata_kuliah]
+    sql = f"""
+        SELECT {columns}, snippet({fts}, -1, '**', '**', '…', {SEARCH_SNIPPET_TOKENS})
+        FROM {fts} {joins}
+        WHERE {fts} MATCH ? {scope}
+          AND {fts}.rowid >= COALESCE((
+              SELECT MIN(rowid) FROM (
+                  SELECT {fts}.rowid AS rowid FROM {fts} {joins}
+                  WHERE {fts} MATCH ? {scope}
+                  ORDER BY {fts}.rowid DESC LIMIT ?
+              )
+          ), 0)
+        ORDER BY bm25({fts}{weights})
+        LIMIT ? OFFSET ?
+    """
+    params = [match, *scope_params, match, *scope_params, SEARCH_RANK_CANDIDATES, limit + 1, offset]
+    connect = get_feedback_connection if kind == "Feedback" else get_connection
+    with connect() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return rows[:limit], len(rows) > limit
+
+# ========== MEMORY STORAGE ==========
+# Backend "memory": engine Python murni yang mengimplementasikan setiap helper di
+# STORAGE_HELPERS. Tabel disimpan sebagai dict id -> baris (dict kolom -> nilai),
+# dengan indeks sekunder yang dijaga di setiap tulisan, setara indeks SQLite yang
+# dipakai helper versi SQL: username unik dan urut, awalan NOCASE username/nickname,
+# user per jurusan, tugas/materi per mata kuliah beserta target jurusannya,
+# course_availability, jawaban per (user, tugas)/tugas/user, antrean feedback per
+# status, dan indeks kata (BM25) pengganti FTS5. Satu lock per backend membuat setiap
+# helper atomik seperti satu transaksi. Isi hilang saat close() atau saat proses
+# berhenti dan tidak dibagi antarproses (api.py dan Streamlit yang berbagi data butuh "sqlite").
+_USER_ROW = itemgetter("id", "username", "role", "nickname", "jurusan", "mata_kuliah")
+_USER_LOGIN_ROW = itemgetter("id", "username", "password", "role", "nickname", "jurusan", "mata_kuliah")
+_TASK_ROW = itemgetter("id", "title", "description", "mata_kuliah", "target_jurusan", "created_by",
+                       "created_at", "deadline")
+_MATERIAL_ROW = itemgetter("id", "title", "link", "mata_kuliah", "target_jurusan", "created_by", "created_at")
+_ANSWER_ROW = itemgetter("id", "task_id", "user_id", "username", "answer", "score", "feedback", "status",
+                         "submitted_at", "finalized_at")
+_USER_TASK_ANSWER_ROW = itemgetter("id", "answer", "status", "submitted_at", "finalized_at")
+_FEEDBACK_ROW = itemgetter("id", "user_id", "username", "role", "message", "created_at", "status", "handled_at")
+_SEARCH_TOKEN = re.compile(r"[^\W_]+")
+
+def _sorted_remove(items, item):
+    index = bisect.bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
+
+def _nocase(text):
+    """Kunci urut COLLATE NOCASE (hanya huruf ASCII yang dilipat)"""
+    return (text or "").translate(_ASCII_LOWER)
+
+def _fold_token(token):
+    if token.isascii():
+        return token.lower()
+    return "".join(ch for ch in unicodedata.normalize("NFKD", token.lower()) if not unicodedata.combining(ch))
+
+def _search_tokens(text):
+    """Token seperti tokenizer FTS5 unicode61 remove_diacritics: huruf kecil tanpa diakritik"""
+    return [_fold_token(token) for token in _SEARCH_TOKEN.findall(text or "")]
+
+def _concat(*parts):
+    """Operator || SQL: NULL jika salah satu bagian NULL"""
+    return None if any(part is None for part in parts) else "".join(str(part) for part in parts)
+
+class MemorySearchIndex:
+    """Indeks kata kolom teks satu tabel, pengganti FTS5 di backend "memory".
+
+    Token mengikuti tokenizer unicode61 remove_diacritics; skor memakai rumus
+    bm25() FTS5 (frekuensi dikali bobot kolom, panjang dokumen semua kolom).
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, columns, weights=None):
+        self.columns = columns
+        self.weights = weights or (1.0,) * len(columns)
+        self.postings = {}  # kata -> {id: frekuensi berbobot}
+        self.lengths = {}  # id -> jumlah token semua kolom
+        self.total_length = 0
+        self._terms = None  # kata terurut untuk pencocokan awalan; dibuat ulang saat kosakata berubah
+
+    def add(self, doc_id, row):
+        frequencies, length = {}, 0
+        for column, weight in zip(self.columns, self.weights):
+            tokens = _search_tokens(row[column])
+            length += len(tokens)
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+        for token, frequency in frequencies.items():
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                self._terms = None
+            docs[doc_id] = frequency
+        self.lengths[doc_id] = length
+        self.total_length += length
+
+    def remove(self, doc_id, row):
+        length = self.lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for column in self.columns:
+            for token in _search_tokens(row[column]):
+                docs = self.postings.get(token)
+                if docs is not None and docs.pop(doc_id, None) is not None and not docs:
+                    del self.postings[token]
+                    self._terms = None
+
+    def update(self, doc_id, old, new):
+        """Indeks ulang hanya jika kolom teks berubah (seperti trigger AFTER UPDATE OF)"""
+        if any(old[column] != new[column] for column in self.columns):
+            self.remove(doc_id, old)
+            self.add(doc_id, new)
+
+    def _phrase(self, word, prefix):
+        if not prefix:
+            return self.postings.get(word, {})
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        merged = {}
+        for index in range(bisect.bisect_left(self._terms, word), len(self._terms)):
+            term = self._terms[index]
+            if not term.startswith(word):
+                break
+            for doc_id, frequency in self.postings[term].items():
+                merged[doc_id] = merged.get(doc_id, 0.0) + frequency
+        return merged
+
+    def match(self, words):
+        """Dokumen yang memuat semua kata (kata terakhir sebagai awalan); kembalikan (ids, frasa)"""
+        phrases = [self._phrase(word, index == len(words) - 1) for index, word in enumerate(words)]
+        rarest = min(phrases, key=len)
+        return [doc_id for doc_id in rarest if all(doc_id in docs for docs in phrases)], phrases
+
+    def rank(self, doc_id, phrases):
+        """Skor bm25() (negatif; makin kecil makin relevan)"""
+        total = len(self.lengths)
+        average = self.total_length / total if total else 0.0
+        norm = self.K1 * (1 - self.B + self.B * self.lengths[doc_id] / (average or 1.0))
+        score = 0.0
+        for docs in phrases:
+            idf = max(math.log((total - len(docs) + 0.5) / (len(docs) + 0.5)), 1e-6)
+            frequency = docs.get(doc_id, 0.0)
+            score += idf * frequency * (self.K1 + 1) / (frequency + norm)
+        return -score
+
+def _search_snippet(texts, words, size=SEARCH_SNIPPET_TOKENS):
+    """Cuplikan seperti snippet() FTS5: `size` token dari kolom dengan kecocokan terbanyak,
+    kata yang cocok diapit ** dan bagian yang terpotong ditandai …"""
+    last_word = len(words) - 1
+    def hit(token):
+        return any(token == word or (index == last_word and token.startswith(word))
+                   for index, word in enumerate(words))
+    best = None
+    for text in texts:
+        if not text:
+            continue
+        spans = [match.span() for match in _SEARCH_TOKEN.finditer(text)]
+        hits = [hit(_fold_token(text[start:end])) for start, end in spans]
+        if best is None or sum(hits) > sum(best[2]):
+            best = (text, spans, hits)
+    if best is None:
+        return ""
+    text, spans, hits = best
+    first = 0
+    if len(spans) > size:
+        windows = [sum(hits[start:start + size]) for start in range(len(spans) - size + 1)]
+        first = windows.index(max(windows))
+    end_token = min(first + size, len(spans))
+    parts = ["…"] if first else []
+    position = spans[first][0] if first else 0
+    for index in range(first, end_token):
+        start, end = spans[index]
+        parts.append(text[position:start])
+        parts.append(f"**{text[start:end]}**" if hits[index] else text[start:end])
+        position = end
+    parts.append(text[position:] if end_token == len(spans) else "…")
+    return "".join(parts)
+
+class MemoryDatabase:
+    """Isi satu database backend "memory": tabel dict per id plus indeks sekundernya.
+
+    Semua perubahan lewat method di sini agar indeks tetap sinkron; pemanggil
+    (MemoryStorage) memegang lock backend.
+    """
+
+    def __init__(self):
+        self.sequences = {}  # tabel -> id terakhir (AUTOINCREMENT: id tidak dipakai ulang)
+        self.users = {}
+        self.usernames = {}  # username -> id (UNIQUE)
+        self.users_by_username = []  # (username, id) terurut: direktori user dan kursornya
+        self.users_by_username_nocase = []  # (username NOCASE, id) terurut: pencarian awalan
+        self.users_by_nickname_nocase = []
+        self.users_by_jurusan = {}  # jurusan -> [(username, id)] terurut
+        self.students_by_jurusan = {}  # jurusan -> jumlah mahasiswa
+        self.tasks = {}
+        self.materials = {}
+        self.items_by_course = {"tasks": {}, "materials": {}}  # mata_kuliah -> {id: None} urut id
+        self.targets = {"tasks": {}, "materials": {}}  # id -> [jurusan]
+        self.course_availability = {}  # jurusan -> {mata_kuliah: item_count}
+        self.answers = {}
+        self.answer_ids = []  # id terurut (paginasi dan export tanpa sort)
+        self.answers_by_user_task = {}  # (user_id, task_id) -> id (UNIQUE)
+        self.answers_by_task = {}  # task_id -> {id: None} urut id
+        self.answers_by_user = {}  # user_id -> {id: None} urut id
+        self.feedback = {}
+        self.feedback_by_status = {}  # status -> [id] terurut
+        self.search = {
+            "tasks": MemorySearchIndex(("title", "description"), (10.0, 1.0)),
+            "materials": MemorySearchIndex(("title",)),
+            "answers": MemorySearchIndex(("answer",)),
+            "feedback": MemorySearchIndex(("message",)),
+        }
+
+    def _new_id(self, table, row_id=None):
+        row_id = row_id if row_id is not None else self.sequences.get(table, 0) + 1
+        self.sequences[table] = max(self.sequences.get(table, 0), row_id)
+        return row_id
+
+    # ----- users -----
+    def insert_user(self, row):
+        username = row["username"]
+        if username is not None and username in self.usernames:
+            raise sqlite3.IntegrityError("UNIQUE constraint failed: users.username")
+        row["id"] = self._new_id("users", row.get("id"))
+        self.users[row["id"]] = row
+        self._index_user(row)
+        return row["id"]
+
+    def _index_user(self, row):
+        user_id, key = row["id"], (row["username"] or "", row["id"])
+        if row["username"] is not None:
+            self.usernames[row["username"]] = user_id
+        bisect.insort(self.users_by_username, key)
+        bisect.insort(self.users_by_username_nocase, (_nocase(row["username"]), user_id))
+        bisect.insort(self.users_by_nickname_nocase, (_nocase(row["nickname"]), user_id))
+        bisect.insort(self.users_by_jurusan.setdefault(row["jurusan"], []), key)
+        if row["role"] == "student":
+            self.students_by_jurusan[row["jurusan"]] = self.students_by_jurusan.get(row["jurusan"], 0) + 1
+
+    def _unindex_user(self, row):
+        user_id, key = row["id"], (row["username"] or "", row["id"])
+        self.usernames.pop(row["username"], None)
+        _sorted_remove(self.users_by_username, key)
+        _sorted_remove(self.users_by_username_nocase, (_nocase(row["username"]), user_id))
+        _sorted_remove(self.users_by_nickname_nocase, (_nocase(row["nickname"]), user_id))
+        same_jurusan = self.users_by_jurusan.get(row["jurusan"], [])
+        _sorted_remove(same_jurusan, key)
+        if not same_jurusan:
+            self.users_by_jurusan.pop(row["jurusan"], None)
+        if row["role"] == "student":
+            self.students_by_jurusan[row["jurusan"]] -= 1
+            if not self.students_by_jurusan[row["jurusan"]]:
+                del self.students_by_jurusan[row["jurusan"]]
+
+    def update_user(self, user_id, changes):
+        row = self.users.get(user_id)
+        if row is None:
+            return 0
+        owner = self.usernames.get(changes.get("username"), user_id)
+        if owner != user_id:
+            raise sqlite3.IntegrityError("UNIQUE constraint failed: users.username")
+        if any(column in changes for column in ("username", "nickname", "jurusan")):
+            self._unindex_user(row)
+            row.update(changes)
+            self._index_user(row)
+        else:
+            row.update(changes)
+        return 1
+
+    def restore_users(self, rows):
+        """Kembalikan user ke salinan `rows` (rollback batch yang gagal)"""
+        for user_id in rows:
+            self._unindex_user(self.users[user_id])
+        for user_id, row in rows.items():
+            self.users[user_id] = row
+            self._index_user(row)
+
+    # ----- tasks / materials -----
+    def insert_item(self, table, row, targets):
+        row["id"] = self._new_id(table, row.get("id"))
+        getattr(self, table)[row["id"]] = row
+        self.items_by_course[table].setdefault(row["mata_kuliah"], {})[row["id"]] = None
+        self.search[table].add(row["id"], row)
+        self.set_targets(table, row["id"], targets)
+        return row["id"]
+
+    def set_targets(self, table, item_id, targets):
+        mata_kuliah = getattr(self, table)[item_id]["mata_kuliah"]
+        for jurusan in self.targets[table].pop(item_id, []):
+            courses = self.course_availability[jurusan]
+            courses[mata_kuliah] -= 1
+            if not courses[mata_kuliah]:
+                del courses[mata_kuliah]
+                if not courses:
+                    del self.course_availability[jurusan]
+        targets = list(dict.fromkeys(targets))
+        for jurusan in targets:
+            courses = self.course_availability.setdefault(jurusan, {})
+            courses[mata_kuliah] = courses.get(mata_kuliah, 0) + 1
+        if targets:
+            self.targets[table][item_id] = targets
+
+    def update_item(self, table, item_id, changes):
+        row = getattr(self, table).get(item_id)
+        if row is None:
+            return 0
+        old = dict(row)
+        row.update(changes)
+        self.search[table].update(item_id, old, row)
+        return 1
+
+    def delete_item(self, table, item_id):
+        row = getattr(self, table).get(item_id)
+        if row is None:
+            return 0
+        self.set_targets(table, item_id, [])
+        self.search[table].remove(item_id, row)
+        same_course = self.items_by_course[table][row["mata_kuliah"]]
+        del same_course[item_id]
+        if not same_course:
+            del self.items_by_course[table][row["mata_kuliah"]]
+        del getattr(self, table)[item_id]
+        return 1
+
+    def item_targets_match(self, table, item_id, jurusan):
+        targets = self.targets[table].get(item_id, ())
+        return jurusan in targets or ALL_JURUSAN in targets
+
+    def course_ids(self, table, mata_kuliah):
+        return self.items_by_course[table].get(mata_kuliah, {})
+
+    # ----- answers -----
+    def insert_answer(self, row):
+        key = (row["user_id"], row["task_id"])
+        if None not in key and key in self.answers_by_user_task:
+            raise sqlite3.IntegrityError("UNIQUE constraint failed: answers.user_id, answers.task_id")
+        row["id"] = answer_id = self._new_id("answers", row.get("id"))
+        self.answers[answer_id] = row
+        if answer_id > (self.answer_ids[-1] if self.answer_ids else 0):
+            self.answer_ids.append(answer_id)
+        else:
+            bisect.insort(self.answer_ids, answer_id)
+        if None not in key:
+            self.answers_by_user_task[key] = answer_id
+        self.answers_by_task.setdefault(row["task_id"], {})[answer_id] = None
+        self.answers_by_user.setdefault(row["user_id"], {})[answer_id] = None
+        self.search["answers"].add(answer_id, row)
+        return answer_id
+
+    def update_answer(self, answer_id, changes):
+        row = self.answers.get(answer_id)
+        if row is None:
+            return 0
+        old = dict(row)
+        row.update(changes)
+        self.search["answers"].update(answer_id, old, row)
+        return 1
+
+    def delete_answer(self, answer_id):
+        row = self.answers.pop(answer_id)
+        _sorted_remove(self.answer_ids, answer_id)
+        key = (row["user_id"], row["task_id"])
+        if self.answers_by_user_task.get(key) == answer_id:
+            del self.answers_by_user_task[key]
+        for index, owner in ((self.answers_by_task, row["task_id"]), (self.answers_by_user, row["user_id"])):
+            del index[owner][answer_id]
+            if not index[owner]:
+                del index[owner]
+        self.search["answers"].remove(answer_id, row)
+
+    # ----- feedback -----
+    def insert_feedback(self, row):
+        row["id"] = self._new_id("feedback", row.get("id"))
+        self.feedback[row["id"]] = row
+        bisect.insort(self.feedback_by_status.setdefault(row["status"], []), row["id"])
+        self.search["feedback"].add(row["id"], row)
+        return row["id"]
+
+    def set_feedback_status(self, feedback_id, status, handled_at):
+        row = self.feedback[feedback_id]
+        _sorted_remove(self.feedback_by_status[row["status"]], feedback_id)
+        bisect.insort(self.feedback_by_status.setdefault(status, []), feedback_id)
+        row["status"], row["handled_at"] = status, handled_at
+
+    # ----- import dari file SQLite -----
+    def load(self, conn):
+        """Muat tabel yang ada di koneksi SQLite `conn` (database utama atau feedback)"""
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        def rows(table):
+            cursor = conn.execute(f"SELECT * FROM {table} ORDER BY id")
+            columns = [column[0] for column in cursor.description]
+            return (dict(zip(columns, values)) for values in cursor)
+        def stored_targets(table, owner_column):
+            targets = {}
+            if table in tables:
+                for owner_id, jurusan in conn.execute(f"SELECT {owner_column}, jurusan FROM {table}"):
+                    targets.setdefault(owner_id, []).append(jurusan)
+            return targets
+        if "users" in tables:
+            for row in rows("users"):
+                self.insert_user(row)
+        for table, targets_table, owner_column in (
+            ("tasks", "task_targets", "task_id"),
+            ("materials", "material_targets", "material_id"),
+        ):
+            if table not in tables:
+                continue
+            targets = stored_targets(targets_table, owner_column)
+            for row in rows(table):
+                if targets_table not in tables:
+                    try:
+                        targets[row["id"]] = normalize_target_jurusan(json.loads(row["target_jurusan"] or "[]"))
+                    except (TypeError, ValueError):
+                        targets[row["id"]] = []
+                self.insert_item(table, row, targets.get(row["id"], []))
+        if "answers" in tables:
+            for row in rows("answers"):
+                self.insert_answer(row)
+        if "feedback" in tables:
+            for row in rows("feedback"):
+                row.setdefault("status", FEEDBACK_STATUS_OPEN)
+                row.setdefault("handled_at", None)
+                self.insert_feedback(row)
+        if "sqlite_sequence" in tables:
+            for name, seq in conn.execute("SELECT name, seq FROM sqlite_sequence"):
+                self.sequences[name] = max(self.sequences.get(name, 0), seq)
+
+class MemoryStorage:
+    """Backend "memory": semua helper data dijalankan di atas MemoryDatabase per path database."""
+
+    name = "memory"
+    native = False
+
+    def __init__(self):
+        self._databases = {}
+        self._lock = threading.RLock()
+
+    def _database(self, path):
+        database = self._databases.get(path)
+        if database is None:
+            database = self._databases.setdefault(path, MemoryDatabase())
+        return database
+
+    def _main(self):
+        return self._database(DB_PATH)
+
+    def _feedback(self):
+        return self._database(FEEDBACK_DB_PATH)
+
+    def load_file(self, path, source):
+        """Ganti isi database `path` dengan tabel dari file SQLite `source`"""
+        conn = sqlite3.connect(SQLiteStorage().uri(source, readonly=True), uri=True)
+        try:
+            database = MemoryDatabase()
+            database.load(conn)
+        finally:
+            conn.close()
+        with self._lock:
+            self._databases[path] = database
+
+    def start(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            self._databases.clear()
+
+    # ----- skema -----
+    def create_db(self):
+        with self._lock:
+            self._main()
+        return len(MIGRATIONS)
+
+    def create_feedback_db(self):
+        with self._lock:
+            self._feedback()
+        return len(FEEDBACK_MIGRATIONS)
+
+    # ----- feedback -----
+    def add_feedback(self, user_id, username, role, message):
+        with self._lock:
+            self._feedback().insert_feedback({
+                "user_id": user_id, "username": username, "role": role, "message": message,
+                "created_at": datetime.now().isoformat(), "status": FEEDBACK_STATUS_OPEN, "handled_at": None,
+            })
+
+    def get_all_feedback(self):
+        with self._lock:
+            feedback = self._feedback().feedback
+            return [_FEEDBACK_ROW(feedback[fid])[:6] for fid in reversed(feedback)]
+
+    def get_feedback_counts(self, today):
+        week_start = (datetime.fromisoformat(today) - timedelta(days=6)).date().isoformat()
+        counts = {"total": 0, "today": 0, "last_7_days": 0, "by_role": {}, "by_status": {}}
+        groups = {}  # (role, status) -> jumlah, dilipat dengan urutan GROUP BY versi SQL
+        with self._lock:
+            for row in self._feedback().feedback.values():
+                created_at = row["created_at"]
+                counts["total"] += 1
+                counts["today"] += created_at is not None and created_at >= today
+                counts["last_7_days"] += created_at is not None and created_at >= week_start
+                key = (row["role"], row["status"])
+                groups[key] = groups.get(key, 0) + 1
+        for (role, status), count in sorted(groups.items()):
+            counts["by_role"][role] = counts["by_role"].get(role, 0) + count
+            counts["by_status"][status] = counts["by_status"].get(status, 0) + count
+        return counts
+
+    def _feedback_queue(self, database, cursor=None, status=None):
+        """Feedback urut (status DESC, id DESC) setelah `cursor`, dibaca dari feedback_by_status"""
+        for queue_status in sorted(database.feedback_by_status, reverse=True):
+            if (status and queue_status != status) or (cursor is not None and queue_status > cursor[0]):
+                continue
+            ids = database.feedback_by_status[queue_status]
+            end = bisect.bisect_left(ids, cursor[1]) if cursor is not None and queue_status == cursor[0] else len(ids)
+            for index in range(end - 1, -1, -1):
+                yield database.feedback[ids[index]]
+
+    def get_feedback_page(self, cursor=None, limit=FEEDBACK_PAGE_SIZE, status=None, role=None):
+        rows = []
+        with self._lock:
+            for row in self._feedback_queue(self._feedback(), cursor, status):
+                if role and row["role"] != role:
+                    continue
+                rows.append(_FEEDBACK_ROW(row))
+                if len(rows) > limit:
+                    break
+        return _keyset_page(rows, limit, lambda row: (row[6], row[0]))
+
+    def mark_feedback_handled(self, feedback_ids):
+        handled_at = datetime.now().isoformat()
+        changed = 0
+        with self._lock:
+            database = self._feedback()
+            for feedback_id in dict.fromkeys(int(fid) for fid in feedback_ids):
+                row = database.feedback.get(feedback_id)
+                if row is not None and row["status"] == FEEDBACK_STATUS_OPEN:
+                    database.set_feedback_status(feedback_id, FEEDBACK_STATUS_HANDLED, handled_at)
+                    changed += 1
+        return changed
+
+    # ----- laporan lintas database -----
+    def _feedback_by_user_field(self, role, field, missing_label):
+        senders, totals, open_counts = {}, {}, {}
+        with self._lock:
+            users = self._main().users
+            for row in self._feedback().feedback.values():
+                if row["role"] != role:
+                    continue
+                user = users.get(row["user_id"])
+                value = (user[field] if user is not None else None) or missing_label
+                senders.setdefault(value, set())
+                if row["user_id"] is not None:
+                    senders[value].add(row["user_id"])
+                totals[value] = totals.get(value, 0) + 1
+                open_counts[value] = open_counts.get(value, 0) + (row["status"] == FEEDBACK_STATUS_OPEN)
+        rows = [(value, len(senders[value]), total, open_counts[value]) for value, total in totals.items()]
+        return sorted(rows, key=lambda row: (-row[2], row[0]))
+
+    def report_feedback_by_jurusan(self):
+        return self._feedback_by_user_field("student", "jurusan", "(tanpa jurusan)")
+
+    def report_feedback_by_mata_kuliah(self):
+        return self._feedback_by_user_field("lecturer", "mata_kuliah", "(tanpa mata kuliah)")
+
+    def report_feedback_from_ungraded_students(self, min_ungraded=REPORT_MIN_UNGRADED_ANSWERS, limit=REPORT_ROW_LIMIT):
+        senders = {}
+        with self._lock:
+            database = self._main()
+            for row in self._feedback().feedback.values():
+                if row["role"] != "student":
+                    continue
+                total, open_count, last_at = senders.get(row["user_id"], (0, 0, None))
+                created_at = row["created_at"]
+                if last_at is None or (created_at is not None and created_at > last_at):
+                    last_at = created_at
+                senders[row["user_id"]] = (total + 1, open_count + (row["status"] == FEEDBACK_STATUS_OPEN), last_at)
+            rows = []
+            for user_id, (total, open_count, last_at) in senders.items():
+                user = database.users.get(user_id)
+                if user is None:
+                    continue
+                ungraded = sum(
+                    1 for answer_id in database.answers_by_user.get(user_id, ())
+                    if database.answers[answer_id]["status"] == "submitted" and database.answers[answer_id]["score"] is None
+                )
+                if ungraded and ungraded >= min_ungraded:
+                    rows.append((user["id"], user["username"], user["nickname"], user["jurusan"],
+                                 ungraded, total, open_count, last_at))
+        rows.sort(key=lambda row: (-row[4], -row[5]))
+        return rows[:limit]
+
+    # ----- users -----
+    def add_user(self, username, password, role="student", nickname="", jurusan="", mata_kuliah=""):
+        with self._lock:
+            try:
+                self._main().insert_user({"username": username, "password": password, "role": role,
+                                          "nickname": nickname, "jurusan": jurusan, "mata_kuliah": mata_kuliah})
+            except sqlite3.IntegrityError:
+                return False
+        return True
+
+    def user_exists(self, username):
+        with self._lock:
+            return username in self._main().usernames
+
+    def get_user_by_credentials(self, username, password):
+        with self._lock:
+            database = self._main()
+            user = database.users.get(database.usernames.get(username))
+            return _USER_LOGIN_ROW(user) if user is not None and user["password"] == password else None
+
+    def update_user_password(self, user_id, new_password):
+        with self._lock:
+            self._main().update_user(user_id, {"password": new_password})
+
+    def update_users_info(self, changes):
+        changes = [(user_id, username or None, nickname, jurusan, mata_kuliah)
+                   for user_id, username, nickname, jurusan, mata_kuliah in changes]
+        if not changes:
+            return 0
+        with self._lock:
+            database = self._main()
+            original = {user_id: dict(database.users[user_id]) for user_id, *_ in changes if user_id in database.users}
+            try:
+                for user_id, username, nickname, jurusan, mata_kuliah in changes:
+                    values = {"username": username, "nickname": nickname, "jurusan": jurusan,
+                              "mata_kuliah": mata_kuliah}
+                    database.update_user(user_id, {column: value for column, value in values.items()
+                                                   if value is not None})
+            except sqlite3.IntegrityError:
+                database.restore_users(original)
+                raise
+        return len(changes)
+
+    def list_users(self):
+        with self._lock:
+            users = self._main().users
+            return [_USER_ROW(users[user_id]) for user_id in users]
+
+    def get_user_by_id(self, user_id):
+        with self._lock:
+            user = self._main().users.get(user_id)
+            return None if user is None else _USER_ROW(user)
+
+    def _user_directory(self, database, search=None, role=None, jurusan=None, cursor=None):
+        """User yang cocok dengan filter direktori, urut username (setelah `cursor`)"""
+        if search:
+            low, high = _prefix_bounds(search)
+            ids = set()
+            for index in (database.users_by_username_nocase, database.users_by_nickname_nocase):
+                start = bisect.bisect_left(index, (low,))
+                end = bisect.bisect_left(index, (high,), start)
+                ids.update(user_id for _, user_id in index[start:end])
+            keys = sorted((database.users[user_id]["username"] or "", user_id) for user_id in ids)
+        elif jurusan:
+            keys = database.users_by_jurusan.get(jurusan, [])
+        else:
+            keys = database.users_by_username
+        start = 0 if cursor is None else bisect.bisect_right(keys, (cursor, math.inf))
+        for index in range(start, len(keys)):
+            user = database.users[keys[index][1]]
+            if (role and user["role"] != role) or (jurusan and user["jurusan"] != jurusan):
+                continue
+            yield user
+
+    def search_users(self, search=None, role=None, jurusan=None, cursor=None, limit=USER_PAGE_SIZE):
+        rows = []
+        with self._lock:
+            for user in self._user_directory(self._main(), search, role, jurusan, cursor):
+                rows.append(_USER_ROW(user))
+                if len(rows) > limit:
+                    break
+        return _keyset_page(rows, limit, lambda row: row[1])
+
+    def count_users(self, search=None, role=None, jurusan=None):
+        with self._lock:
+            database = self._main()
+            if not (search or role or jurusan):
+                return len(database.users)
+            return sum(1 for _ in self._user_directory(database, search, role, jurusan))
+
+    def get_user_jurusan_list(self):
+        with self._lock:
+            return sorted(jurusan for jurusan in self._main().users_by_jurusan if jurusan)
+
+    def insert_new_users(self, users):
+        with self._lock:
+            database = self._main()
+            existing = {values[0] for values in users if values[0] in database.usernames}
+            new_usernames = [values[0] for values in users if values[0] not in existing]
+            if len(set(new_usernames)) != len(new_usernames):
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: users.username")
+            for values in users:
+                if values[0] not in existing:
+                    database.insert_user(dict(zip(USER_IMPORT_FIELDS, values)))
+        return existing
+
+    def iter_user_chunks(self, chunk_rows=USER_EXPORT_CHUNK_ROWS):
+        with self._lock:
+            database = self._main()
+            ids = list(database.users)
+        for start in range(0, len(ids), chunk_rows):
+            with self._lock:
+                chunk = [_USER_ROW(database.users[user_id]) for user_id in ids[start:start + chunk_rows]
+                         if user_id in database.users]
+            if chunk:
+                yield chunk
+
+    # ----- tasks / materials -----
+    def _add_items(self, table, items):
+        created_at = datetime.now().isoformat()
+        with self._lock:
+            database = self._main()
+            ids = []
+            for row, targets in items:
+                row.update(target_jurusan=json.dumps(targets), created_at=created_at)
+                ids.append(database.insert_item(table, row, targets))
+        return ids
+
+    def _update_item(self, table, item_id, changes, target_jurusan):
+        if target_jurusan:
+            target_jurusan = normalize_target_jurusan(target_jurusan)
+            changes["target_jurusan"] = json.dumps(target_jurusan)
+        if not changes:
+            return
+        with self._lock:
+            database = self._main()
+            if database.update_item(table, item_id, changes) and target_jurusan:
+                database.set_targets(table, item_id, target_jurusan)
+
+    def _course_items(self, table, row_fn, mata_kuliah, jurusan=None, newest_first=False):
+        with self._lock:
+            database = self._main()
+            rows = getattr(database, table)
+            ids = database.course_ids(table, mata_kuliah)
+            return [row_fn(rows[item_id]) for item_id in (reversed(ids) if newest_first else ids)
+                    if jurusan is None or database.item_targets_match(table, item_id, jurusan)]
+
+    def add_materials(self, materials):
+        return self._add_items("materials", [
+            ({"title": title, "link": link, "mata_kuliah": mata_kuliah, "created_by": created_by},
+             normalize_target_jurusan(target_jurusan))
+            for title, link, mata_kuliah, target_jurusan, created_by in materials
+        ])
+
+    def get_materials_by_mata_kuliah_jurusan(self, mata_kuliah, jurusan):
+        return self._course_items("materials", _MATERIAL_ROW, mata_kuliah, jurusan, newest_first=True)
+
+    def get_all_materials_by_lecturer(self, mata_kuliah):
+        return self._course_items("materials", _MATERIAL_ROW, mata_kuliah, newest_first=True)
+
+    def get_all_materials(self):
+        with self._lock:
+            materials = self._main().materials
+            return [_MATERIAL_ROW(materials[material_id]) for material_id in reversed(materials)]
+
+    def get_material(self, material_id):
+        with self._lock:
+            material = self._main().materials.get(material_id)
+            return None if material is None else _MATERIAL_ROW(material)
+
+    def delete_material(self, material_id):
+        with self._lock:
+            self._main().delete_item("materials", material_id)
+
+    def update_material(self, material_id, title=None, link=None, target_jurusan=None):
+        changes = {column: value for column, value in (("title", title), ("link", link)) if value}
+        self._update_item("materials", material_id, changes, target_jurusan)
+
+    def add_tasks(self, tasks):
+        return self._add_items("tasks", [
+            ({"title": title, "description": description, "mata_kuliah": mata_kuliah,
+              "created_by": created_by, "deadline": deadline},
+             normalize_target_jurusan(target_jurusan))
+            for title, description, mata_kuliah, target_jurusan, created_by, deadline in tasks
+        ])
+
+    def get_tasks_by_mata_kuliah_jurusan(self, mata_kuliah, jurusan):
+        return self._course_items("tasks", _TASK_ROW, mata_kuliah, jurusan)
+
+    def get_all_tasks_by_lecturer(self, mata_kuliah):
+        return self._course_items("tasks", _TASK_ROW, mata_kuliah)
+
+    def get_all_tasks(self):
+        with self._lock:
+            return [_TASK_ROW(task) for task in self._main().tasks.values()]
+
+    def get_task_mata_kuliah_list(self):
+        with self._lock:
+            return sorted(self._main().items_by_course["tasks"])
+
+    def get_task_titles(self, mata_kuliah):
+        return self._course_items("tasks", itemgetter("id", "title"), mata_kuliah)
+
+    def get_tasks_page(self, mata_kuliah=None, cursor=None, limit=TASKS_PAGE_SIZE):
+        page_row = itemgetter("id", "title", "mata_kuliah", "target_jurusan", "created_by", "created_at", "deadline")
+        rows = []
+        with self._lock:
+            database = self._main()
+            courses = [mata_kuliah] if mata_kuliah else sorted(database.items_by_course["tasks"])
+            task_ids = (task_id for course in courses if cursor is None or course >= cursor[0]
+                        for task_id in database.course_ids("tasks", course)
+                        if cursor is None or (course, task_id) > tuple(cursor))
+            for task_id in task_ids:
+                rows.append(page_row(database.tasks[task_id]))
+                if len(rows) > limit:
+                    break
+        return _keyset_page(rows, limit, lambda row: (row[2], row[0]))
 
-def delete_task(task_id):
-    """Admin function to delete task"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("DELETE FROM tasks WHERE id=?", (task_id,))
-    c.execute("DELETE FROM answers WHERE task_id=?", (task_id,))
-    conn.commit()
-    conn.close()
+    def count_tasks(self, mata_kuliah=None):
+        with self._lock:
+            database = self._main()
+            return len(database.course_ids("tasks", mata_kuliah)) if mata_kuliah else len(database.tasks)
 
-# ========== ANSWERS FUNCTIONS ==========
-def get_or_create_answer(user_id, username, task_id):
-    """Get existing draft or create new one"""
-    conn = get_connection()
-    c = conn.cursor()
-    # Check if answer exists
-    c.execute("""
-        SELECT id, answer, status, submitted_at, finalized_at 
-        FROM answers 
-        WHERE user_id=? AND task_id=?
-    """, (user_id, task_id))
-    row = c.fetchone()
-    if row:
-        conn.close()
-        return row
-    else:
-        # Create new draft
-        c.execute("""
-            INSERT INTO answers(task_id, user_id, username, answer, status, submitted_at)
-            VALUES (?, ?, ?, '', 'draft', ?)
-        """, (task_id, user_id, username, datetime.now().isoformat()))
-        conn.commit()
-        answer_id = c.lastrowid
-        conn.close()
-        return (answer_id, '', 'draft', datetime.now().isoformat(), None)
+    def get_task(self, task_id):
+        with self._lock:
+            task = self._main().tasks.get(task_id)
+            return None if task is None else _TASK_ROW(task)
 
-def save_answer_draft(answer_id, answer_text):
-    """Save answer as draft (can be edited)"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE answers 
-        SET answer=?, submitted_at=? 
-        WHERE id=?
-    """, (answer_text, datetime.now().isoformat(), answer_id))
-    conn.commit()
-    conn.close()
+    def update_task(self, task_id, title=None, description=None, target_jurusan=None, deadline=None):
+        changes = {column: value for column, value in (("title", title), ("description", description)) if value}
+        if deadline is not None:
+            changes["deadline"] = deadline
+        self._update_item("tasks", task_id, changes, target_jurusan)
 
-def finalize_answer(answer_id):
-    """Finalize answer (lock from editing)"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE answers 
-        SET status='submitted', finalized_at=? 
-        WHERE id=?
-    """, (datetime.now().isoformat(), answer_id))
-    conn.commit()
-    conn.close()
+    def delete_task(self, task_id):
+        with self._lock:
+            database = self._main()
+            database.delete_item("tasks", task_id)
+            for answer_id in list(database.answers_by_task.get(task_id, ())):
+                database.delete_answer(answer_id)
 
-def get_answers_for_task(task_id):
-    """Get all submitted answers for a task"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, task_id, user_id, username, answer, score, feedback, status, submitted_at, finalized_at 
-        FROM answers 
-        WHERE task_id=? AND status='submitted'
-        ORDER BY id
-    """, (task_id,))
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    def get_available_mata_kuliah_for_student(self, jurusan):
+        with self._lock:
+            availability = self._main().course_availability
+            return sorted(set(availability.get(jurusan, ())) | set(availability.get(ALL_JURUSAN, ())))
 
-def get_answers_for_user_by_mata_kuliah(user_id, mata_kuliah):
-    """Get user's answers filtered by mata kuliah"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT answers.id, tasks.title, answers.answer, answers.score, answers.feedback, 
-               answers.status, answers.submitted_at, answers.finalized_at
-        FROM answers 
-        JOIN tasks ON answers.task_id = tasks.id
-        WHERE answers.user_id=? AND tasks.mata_kuliah=?
-        ORDER BY answers.id
-    """, (user_id, mata_kuliah))
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    # ----- answers -----
+    def get_user_task_answer(self, user_id, task_id):
+        with self._lock:
+            database = self._main()
+            answer_id = database.answers_by_user_task.get((user_id, task_id))
+            return None if answer_id is None else _USER_TASK_ANSWER_ROW(database.answers[answer_id])
 
-def update_answer_score(answer_id, score, feedback=None):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("UPDATE answers SET score=?, feedback=? WHERE id=?", (score, feedback, answer_id))
-    conn.commit()
-    conn.close()
+    def create_answer_draft(self, user_id, username, task_id):
+        with self._lock:
+            database = self._main()
+            if (user_id, task_id) not in database.answers_by_user_task:
+                database.insert_answer({
+                    "task_id": task_id, "user_id": user_id, "username": username, "answer": "", "score": None,
+                    "feedback": None, "status": "draft", "submitted_at": datetime.now().isoformat(),
+                    "finalized_at": None,
+                })
+            return self.get_user_task_answer(user_id, task_id)
 
-def get_all_answers():
-    """Admin: get all answers"""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT answers.id, answers.task_id, tasks.title, tasks.mata_kuliah, 
-               answers.username, answers.answer, answers.score, answers.feedback, 
-               answers.status, answers.submitted_at, answers.finalized_at
-        FROM answers 
-        JOIN tasks ON answers.task_id=tasks.id
-        ORDER BY answers.id DESC
-    """)
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    def write_answer_drafts(self, db_path, drafts):
+        with self._lock:
+            database = self._database(db_path)
+            for answer_text, saved_at, answer_id in drafts:
+                answer = database.answers.get(answer_id)
+                if answer is not None and answer["status"] == "draft":
+                    database.update_answer(answer_id, {"answer": answer_text, "submitted_at": saved_at})
+
+    def upsert_answer_draft(self, user_id, username, task_id, answer_text):
+        saved_at = datetime.now().isoformat()
+        with self._lock:
+            database = self._main()
+            answer_id = database.answers_by_user_task.get((user_id, task_id))
+            if answer_id is None:
+                return database.insert_answer({
+                    "task_id": task_id, "user_id": user_id, "username": username, "answer": answer_text,
+                    "score": None, "feedback": None, "status": "draft", "submitted_at": saved_at,
+                    "finalized_at": None,
+                })
+            if database.answers[answer_id]["status"] == "draft":
+                database.update_answer(answer_id, {"answer": answer_text, "submitted_at": saved_at})
+            return answer_id
+
+    def submit_answer(self, answer_id):
+        with self._lock:
+            self._main().update_answer(answer_id, {"status": "submitted", "finalized_at": datetime.now().isoformat()})
+
+    def get_answers_for_task(self, task_id):
+        with self._lock:
+            answers = self._main().answers
+            return [_ANSWER_ROW(answers[answer_id]) for answer_id in self._main().answers_by_task.get(task_id, ())
+                    if answers[answer_id]["status"] == "submitted"]
+
+    def _user_course_answers(self, database, user_id, mata_kuliah):
+        """Jawaban user (urut id) untuk tugas mata kuliah itu, beserta barisan tugasnya"""
+        for answer_id in database.answers_by_user.get(user_id, ()):
+            answer = database.answers[answer_id]
+            task = database.tasks.get(answer["task_id"])
+            if task is not None and task["mata_kuliah"] == mata_kuliah:
+                yield answer, task
+
+    def get_user_course_answers(self, user_id, mata_kuliah):
+        with self._lock:
+            return [(answer["task_id"], answer["id"], answer["answer"], answer["status"], answer["submitted_at"],
+                     answer["finalized_at"], answer["score"], answer["feedback"])
+                    for answer, _ in self._user_course_answers(self._main(), user_id, mata_kuliah)]
+
+    def get_answers_for_user_by_mata_kuliah(self, user_id, mata_kuliah):
+        with self._lock:
+            return [(answer["id"], task["title"], answer["answer"], answer["score"], answer["feedback"],
+                     answer["status"], answer["submitted_at"], answer["finalized_at"])
+                    for answer, task in self._user_course_answers(self._main(), user_id, mata_kuliah)]
+
+    def update_answer_scores(self, grades):
+        with self._lock:
+            database = self._main()
+            return sum(database.update_answer(answer_id, {"score": score, "feedback": feedback})
+                       for answer_id, score, feedback in grades)
+
+    def get_submitted_answers_by_mata_kuliah(self, mata_kuliah):
+        rows = []
+        with self._lock:
+            database = self._main()
+            for task_id in database.course_ids("tasks", mata_kuliah):
+                title = database.tasks[task_id]["title"]
+                for answer_id in database.answers_by_task.get(task_id, ()):
+                    answer = database.answers[answer_id]
+                    if answer["status"] == "submitted":
+                        rows.append((answer_id, task_id, title, answer["username"], answer["answer"],
+                                     answer["score"], answer["feedback"], answer["finalized_at"]))
+        return rows
+
+    def _answer_detail(self, database, answer):
+        task = database.tasks.get(answer["task_id"])
+        if task is None:
+            return None
+        return (answer["id"], answer["task_id"], task["title"], task["mata_kuliah"], answer["username"],
+                answer["answer"], answer["score"], answer["feedback"], answer["status"],
+                answer["submitted_at"], answer["finalized_at"])
+
+    def get_all_answers(self):
+        with self._lock:
+            database = self._main()
+            rows = (self._answer_detail(database, database.answers[answer_id])
+                    for answer_id in reversed(database.answer_ids))
+            return [row for row in rows if row is not None]
+
+    def get_answers_page(self, before_id=None, limit=ANSWERS_PAGE_SIZE, mata_kuliah=None, status=None,
+                         task_id=None, username=None):
+        prefix = username.translate(_ASCII_LOWER) if username else None
+        rows = []
+        with self._lock:
+            database = self._main()
+            ids = list(database.answers_by_task.get(task_id, ())) if task_id is not None else database.answer_ids
+            end = len(ids) if before_id is None else bisect.bisect_left(ids, before_id)
+            for index in range(end - 1, -1, -1):
+                answer = database.answers[ids[index]]
+                task = database.tasks.get(answer["task_id"])
+                if task is None or (mata_kuliah and task["mata_kuliah"] != mata_kuliah) \
+                        or (status and answer["status"] != status) \
+                        or (prefix and not (answer["username"] or "").translate(_ASCII_LOWER).startswith(prefix)):
+                    continue
+                text = answer["answer"]
+                if text is not None and len(text) > ANSWER_PREVIEW_CHARS:
+                    text = text[:ANSWER_PREVIEW_CHARS] + "…"
+                rows.append((answer["id"], answer["task_id"], task["title"], task["mata_kuliah"], answer["username"],
+                             text, answer["score"], answer["status"], answer["submitted_at"], answer["finalized_at"]))
+                if len(rows) > limit:
+                    break
+        return _keyset_page(rows, limit, lambda row: row[0])
+
+    def get_answer_detail(self, answer_id):
+        with self._lock:
+            database = self._main()
+            answer = database.answers.get(answer_id)
+            return None if answer is None else self._answer_detail(database, answer)
+
+    # ----- gradebook, analitik, pencarian -----
+    def iter_gradebook_chunks(self, mata_kuliah=None, task_id=None, status=None, date_from=None, date_to=None,
+                              include_answer=False, chunk_rows=GRADEBOOK_CHUNK_ROWS):
+        date_from = str(date_from) if date_from else None
+        date_until = (date.fromisoformat(str(date_to)) + timedelta(days=1)).isoformat() if date_to else None
+        with self._lock:
+            database = self._main()
+            if task_id:
+                ids = list(database.answers_by_task.get(task_id, ()))
+            elif mata_kuliah:
+                ids = sorted(answer_id for tid in database.course_ids("tasks", mata_kuliah)
+                             for answer_id in database.answers_by_task.get(tid, ()))
+            else:
+                ids = list(database.answer_ids)
+        for start in range(0, len(ids), chunk_rows):
+            chunk = []
+            with self._lock:
+                for answer_id in ids[start:start + chunk_rows]:
+                    answer = database.answers.get(answer_id)
+                    task = database.tasks.get(answer["task_id"]) if answer is not None else None
+                    if task is None or (mata_kuliah and task["mata_kuliah"] != mata_kuliah) \
+                            or (status and answer["status"] != status):
+                        continue
+                    submitted_at = answer["submitted_at"]
+                    if (date_from and (submitted_at is None or submitted_at < date_from)) \
+                            or (date_until and (submitted_at is None or submitted_at >= date_until)):
+                        continue
+                    user = database.users.get(answer["user_id"]) or {"nickname": None, "jurusan": None}
+                    row = (answer_id, answer["task_id"], task["title"], task["mata_kuliah"], answer["user_id"],
+                           answer["username"], user["nickname"], user["jurusan"], answer["status"], answer["score"],
+                           answer["feedback"], submitted_at, answer["finalized_at"])
+                    chunk.append(row + (answer["answer"],) if include_answer else row)
+            if chunk:
+                yield chunk
+
+    def get_course_analytics(self, mata_kuliah):
+        with self._lock:
+            database = self._main()
+            task_ids = list(database.course_ids("tasks", mata_kuliah))
+            all_students = sum(database.students_by_jurusan.values())
+            answers = [(answer["username"], task_id, answer["status"], answer["score"])
+                       for task_id in task_ids for answer_id in database.answers_by_task.get(task_id, ())
+                       for answer in (database.answers[answer_id],)]
+            tasks = [(task_id, database.tasks[task_id]["title"], sum(
+                         all_students if jurusan == ALL_JURUSAN else database.students_by_jurusan.get(jurusan, 0)
+                         for jurusan in database.targets["tasks"].get(task_id, ())))
+                     for task_id in task_ids]
+        return summarize_course_analytics(
+            pd.DataFrame(answers, columns=["username", "task_id", "status", "score"]),
+            pd.DataFrame(tasks, columns=["task_id", "title", "eligible"]).set_index("task_id"),
+        )
+
+    def _search_row(self, kind, main, feedback, doc_id, mata_kuliah):
+        """(id, judul, konteks, kolom teks) satu dokumen hasil pencarian, atau None jika di luar cakupan"""
+        if kind == "Tugas":
+            task = main.tasks[doc_id]
+            if mata_kuliah is not None and task["mata_kuliah"] != mata_kuliah:
+                return None
+            return (doc_id, task["title"], _concat(task["mata_kuliah"], " · deadline ",
+                                                            "-" if task["deadline"] is None else task["deadline"]),
+                    (task["title"], task["description"]))
+        if kind == "Materi":
+            material = main.materials[doc_id]
+            if mata_kuliah is not None and material["mata_kuliah"] != mata_kuliah:
+                return None
+            return (doc_id, material["title"], _concat(material["mata_kuliah"], " · ",
+                                                               "" if material["link"] is None else material["link"]),
+                    (material["title"],))
+        if kind == "Jawaban":
+            answer = main.answers[doc_id]
+            task = main.tasks.get(answer["task_id"])
+            if task is None or (mata_kuliah is not None and (task["mata_kuliah"] != mata_kuliah
+                                                             or answer["status"] != "submitted")):
+                return None
+            return (doc_id, _concat(task["title"], " — ", answer["username"]),
+                    _concat(task["mata_kuliah"], " · ", answer["status"]), (answer["answer"],))
+        row = feedback.feedback[doc_id]
+        created_at = row["created_at"]
+        return (doc_id, row["username"], _concat(row["role"], " · ", None if created_at is None else created_at[:10]),
+                (row["message"],))
+
+    def search_documents(self, kind, text, mata_kuliah=None, offset=0, limit=SEARCH_PAGE_SIZE):
+        if kind not in SEARCH_SOURCES:
+            raise ValueError(f"Jenis pencarian tidak dikenal: {kind}")
+        words = _search_tokens(text)
+        if not words or (mata_kuliah is not None and kind == "Feedback"):
+            return [], False
+        table = {"Tugas": "tasks", "Materi": "materials", "Jawaban": "answers", "Feedback": "feedback"}[kind]
+        with self._lock:
+            main, feedback = self._main(), self._feedback()
+            index = (feedback if kind == "Feedback" else main).search[table]
+            ids, phrases = index.match(words)
+            found = []
+            for doc_id in sorted(ids, reverse=True):
+                row = self._search_row(kind, main, feedback, doc_id, mata_kuliah)
+                if row is not None:
+                    found.append(row)
+                    if len(found) == SEARCH_RANK_CANDIDATES:
+                        break
+            found.sort(key=lambda row: (index.rank(row[0], phrases), row[0]))
+            page = found[offset:offset + limit + 1]
+        rows = [(doc_id, title, context, _search_snippet(texts, words)) for doc_id, title, context, texts in page]
+        return rows[:limit], len(rows) > limit
+
+STORAGE_BACKENDS = {
+    SQLiteStorage.name: SQLiteStorage,
+    MemoryStorage.name: MemoryStorage,
+}
 
 # ========== UI PAGES ==========
+def page_cursor(key, filters):
+    """Kursor keyset halaman aktif daftar `key` dan nomor halamannya (mulai dari 1).
+
+    Tumpukan kursor disimpan di session_state dan di-reset ke halaman pertama saat
+    `filters` berubah. Dipanggil sebelum query halaman; tombolnya lewat paginator().
+    """
+    if f"{key}_cursors" not in st.session_state or st.session_state[f"{key}_filters"] != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+    return cursors[-1], len(cursors)
+
+@contextmanager
+def write_guard():
+    """`with write_guard():` di sekitar tulisan dari halaman: jika writer penuh atau lambat,
+    tampilkan st.error dan lewati sisa blok (pesan sukses, rerun) alih-alih traceback"""
+    try:
+        yield
+    except WriteQueueFull:
+        st.error("❌ Server sedang sibuk menyimpan data lain; perubahan belum disimpan. Coba lagi sebentar lagi.")
+    except WriteTimeout:
+        st.error("❌ Penyimpanan belum selesai setelah ditunggu lama. Muat ulang halaman untuk memeriksa "
+                 "apakah perubahan sudah tersimpan sebelum mencoba lagi.")
+
+def paginator(key, next_cursor, caption):
+    """Tombol sebelumnya/berikutnya dan caption "Halaman n · caption" untuk daftar `key`"""
+    cursors = st.session_state[f"{key}_cursors"]
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Sebelumnya", disabled=len(cursors) == 1, key=f"{key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Halaman {len(cursors)} · {caption}")
+    with col3:
+        if st.button("Berikutnya ➡️", disabled=next_cursor is None, key=f"{key}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
 def login_page():
     st.title("🔐 Login E-Learning")
     st.write("Masuk dengan akun Anda")
@@ -516,6 +3662,54 @@ def dashboard_page(user):
     st.write(f"Selamat datang, **{nickname}**!")
     if role == "admin":
         st.info("🔧 Anda adalah Admin. Gunakan menu di sidebar untuk mengelola sistem.")
+        with st.expander("⚙️ Statistik Query Cache", expanded=False):
+            stats = query_cache.stats()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Cache Hit", stats["hits"])
+            with col2:
+                st.metric("Cache Miss", stats["misses"])
+            with col3:
+                st.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+            st.caption(
+                f"{stats['entries']}/{stats['max_entries']} entri · "
+                f"{stats['evictions']} eviction · {stats['invalidations']} entri diinvalidasi"
+            )
+            if stats["per_function"]:
+                df = pd.DataFrame(
+                    [(name, c["hits"], c["misses"]) for name, c in stats["per_function"].items()],
+                    columns=["Fungsi", "Hit", "Miss"],
+                )
+                st.dataframe(df, hide_index=True)
+        with st.expander("⚙️ Statistik Buffer Draft", expanded=False):
+            stats = draft_buffer.stats()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Antrean Draft", stats["queue_depth"])
+            with col2:
+                st.metric("Flush p95", f"{stats['flush_latency_ms_p95']:.1f} ms")
+            with col3:
+                st.metric("Simpanan Digabung", stats["coalesced"])
+            st.caption(
+                f"{stats['flushed_rows']} baris dalam {stats['flushes']} flush · "
+                f"rata-rata {stats['flush_latency_ms_avg']:.1f} ms · maks {stats['flush_latency_ms_max']:.1f} ms · "
+                f"{stats['errors']} error"
+            )
+        with st.expander("⚙️ Statistik Writer Database", expanded=False):
+            for path, stats in writer_stats().items():
+                st.markdown(f"**{path}**")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Antrean Tulis", stats["queue_depth"])
+                with col2:
+                    st.metric("Latensi p95", f"{stats['latency_ms_p95']:.1f} ms")
+                with col3:
+                    st.metric("Rata-rata Grup", f"{stats['avg_group_size']:.1f}")
+                st.caption(
+                    f"{stats['completed']} selesai · {stats['failed']} gagal · "
+                    f"{stats['rejected']} ditolak (antrean penuh) · {stats['commits']} commit · "
+                    f"{stats['external_changes']} perubahan dari proses lain · p50 {stats['latency_ms_p50']:.1f} ms · maks {stats['latency_ms_max']:.1f} ms"
+                )
     elif role == "lecturer":
         mata_kuliah = user[6]
         st.info(f"👨‍🏫 Anda adalah Dosen mata kuliah: **{mata_kuliah}**")
@@ -533,9 +3727,10 @@ def dashboard_page(user):
             if not feedback_msg.strip():
                 st.error("Pesan feedback tidak boleh kosong")
             else:
-                add_feedback(user[0], user[1], user[3], feedback_msg.strip())
-                st.success("✅ Feedback berhasil dikirim! Admin akan meninjau pesan Anda segera.")
-                st.rerun()
+                with write_guard():
+                    add_feedback(user[0], user[1], user[3], feedback_msg.strip())
+                    st.success("✅ Feedback berhasil dikirim! Admin akan meninjau pesan Anda segera.")
+                    st.rerun()
     # ====== AKHIR TAMBAHAN ======
     
     st.markdown("---")
@@ -554,45 +3749,132 @@ def dashboard_page(user):
             elif len(new_pass) < 4:
                 st.error("Password baru minimal 4 karakter")
             else:
-                update_user_password(user[0], new_pass)
-                st.success("✅ Password berhasil diubah! Silakan login kembali.")
-                st.session_state.clear()
-                st.rerun()
+                with write_guard():
+                    update_user_password(user[0], new_pass)
+                    st.success("✅ Password berhasil diubah! Silakan login kembali.")
+                    st.session_state.clear()
+                    st.rerun()
+
+def gradebook_export_section(mata_kuliah, tasks):
+    """Export gradebook (CSV/Parquet) for admin (mata_kuliah None = all) or lecturer"""
+    with st.expander("📤 Export Gradebook", expanded=False):
+        task_titles = {t[0]: t[1] for t in tasks}
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            task_id = st.selectbox(
+                "Tugas", [None] + list(task_titles), key="gb_task",
+                format_func=lambda tid: "Semua Tugas" if tid is None else f"{task_titles[tid]} (ID: {tid})",
+            )
+        with col2:
+            selected_status = st.selectbox("Status", ["Semua Status", "submitted", "draft"], key="gb_status")
+        with col3:
+            date_range = st.date_input("Rentang tanggal submit", value=(), key="gb_dates")
+        col1, col2 = st.columns(2)
+        with col1:
+            fmt = st.radio("Format", list(GRADEBOOK_FORMATS), horizontal=True, key="gb_format")
+        with col2:
+            include_answer = st.checkbox("Sertakan teks jawaban", key="gb_answer")
+        params = {
+            "mata_kuliah": mata_kuliah,
+            "task_id": task_id,
+            "status": None if selected_status == "Semua Status" else selected_status,
+            "date_from": date_range[0] if len(date_range) > 0 else None,
+            "date_to": date_range[1] if len(date_range) > 1 else None,
+        }
+        request = (fmt, include_answer, tuple(params.items()))
+        # Export dibuat saat diminta saja dan dibuang dari session setelah di-download
+        # atau saat filter berubah, agar isi file tidak tertahan di memori per sesi
+        if st.button("📦 Siapkan Export", key="gb_prepare"):
+            data, total, size = export_gradebook(fmt, include_answer, **params)
+            if data is None:
+                st.session_state.pop("gradebook_export", None)
+                st.warning(
+                    f"Export {total} baris ({size / 1024 / 1024:.0f} MB) melebihi batas "
+                    f"{GRADEBOOK_UI_MAX_BYTES // 1024 // 1024} MB untuk download lewat browser. "
+                    "Persempit filter, atau gunakan `python export_gradebook.py` / `GET /api/v1/gradebook`."
+                )
+            else:
+                st.session_state["gradebook_export"] = (request, data, total)
+        prepared = st.session_state.get("gradebook_export")
+        if prepared and prepared[0] != request:
+            del st.session_state["gradebook_export"]
+        elif prepared:
+            st.caption(f"{prepared[2]} baris · {len(prepared[1]) / 1024:.0f} KB")
+            st.download_button(
+                "⬇️ Download Gradebook", prepared[1],
+                file_name=f"gradebook_{mata_kuliah or 'semua'}_{datetime.now():%Y%m%d}.{fmt}".replace(" ", "_"),
+                mime="text/csv" if fmt == "csv" else "application/vnd.apache.parquet",
+                key="gb_download",
+                on_click=st.session_state.pop, args=("gradebook_export", None),
+            )
 
 # ========== ADMIN PAGES ==========
+def user_directory_changes(original, edited):
+    """Ubah hasil st.data_editor direktori user menjadi argumen update_users_info.
+    Kolom per sel tidak bisa dikunci, jadi edit Jurusan pada non-student dan Mata Kuliah
+    pada non-lecturer dikembalikan terpisah sebagai (username, role, kolom) untuk diperingatkan"""
+    role_columns = {"Jurusan": "student", "Mata Kuliah": "lecturer"}
+    changes, ignored = [], []
+    for index, row in edited.iterrows():
+        edited_columns = [column for column in edited.columns if row[column] != original.at[index, column]]
+        for column in edited_columns:
+            if role_columns.get(column, row["Role"]) != row["Role"]:
+                ignored.append((original.at[index, "Username"], row["Role"], column))
+        if any(role_columns.get(column, row["Role"]) == row["Role"] for column in edited_columns):
+            changes.append((int(row["ID"]), row["Username"].strip(), row["Nickname"],
+                            row["Jurusan"] if row["Role"] == "student" else None,
+                            row["Mata Kuliah"] if row["Role"] == "lecturer" else None))
+    return changes, ignored
+
+def user_directory_section():
+    """Direktori user berhalaman dengan pencarian prefix dan edit massal lewat tabel"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        search = st.text_input("Cari username / nickname", placeholder="Awalan, contoh: budi", key="users_search").strip()
+    with col2:
+        role = st.selectbox("Role", ["Semua Role", *USER_ROLES], key="users_role")
+    with col3:
+        jurusan = st.selectbox("Jurusan", ["Semua Jurusan", *get_user_jurusan_list()], key="users_jurusan")
+    role = None if role == "Semua Role" else role
+    jurusan = None if jurusan == "Semua Jurusan" else jurusan
+
+    filters = (search, role, jurusan)
+    cursor, _ = page_cursor("users", filters)
+    rows, next_cursor = search_users(search, role, jurusan, cursor)
+    if not rows:
+        st.info("Tidak ada user untuk filter ini")
+        return
+
+    columns = ["ID", "Username", "Role", "Nickname", "Jurusan", "Mata Kuliah"]
+    df = pd.DataFrame(rows, columns=columns).fillna("")
+    # Key editor ikut halaman & filter agar edit yang belum disimpan tidak terbawa ke baris lain
+    edited = st.data_editor(
+        df, use_container_width=True, hide_index=True, disabled=["ID", "Role"],
+        key=f"users_editor_{cursor}_{filters}",
+    )
+    changes, ignored = user_directory_changes(df, edited)
+
+    paginator("users", next_cursor, f"{len(rows)} dari {count_users(search, role, jurusan)} user · "
+              "Jurusan hanya untuk student, Mata Kuliah hanya untuk lecturer")
+    if ignored:
+        st.warning("Edit berikut tidak akan disimpan karena kolomnya tidak berlaku untuk role user tersebut: "
+                   + ", ".join(f"{column} untuk {username} ({role})" for username, role, column in ignored))
+
+    if st.button(f"💾 Simpan {len(changes)} Perubahan", disabled=not changes, key="users_save"):
+        with write_guard():
+            try:
+                updated = update_users_info(changes)
+            except sqlite3.IntegrityError:
+                st.error("Username sudah dipakai user lain; tidak ada perubahan yang disimpan")
+            else:
+                st.success(f"✅ {updated} user berhasil diupdate")
+                st.rerun()
+
 def manage_users_admin_page():
     """Admin page to manage all users"""
     st.header("👥 Manajemen User (Admin)")
-    # List all users
     st.subheader("📋 Daftar User")
-    users = list_users()
-    if users:
-        for u in users:
-            user_id, username, role, nickname, jurusan, mata_kuliah = u
-            with st.expander(f"👤 {nickname or username} ({role})", expanded=False):
-                with st.form(f"edit_user_{user_id}"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        new_username = st.text_input("Username", value=username, key=f"un_{user_id}")
-                        new_nickname = st.text_input("Nickname", value=nickname or "", key=f"nn_{user_id}")
-                    with col2:
-                        if role == "student":
-                            new_jurusan = st.text_input("Jurusan", value=jurusan or "", key=f"jr_{user_id}")
-                            st.write("")
-                        elif role == "lecturer":
-                            new_mata_kuliah = st.text_input("Mata Kuliah", value=mata_kuliah or "", key=f"mk_{user_id}")
-                            st.write("")
-                        else:
-                            st.write("Admin tidak perlu info tambahan")
-                    if st.form_submit_button("💾 Update User"):
-                        if role == "student":
-                            update_user_info(user_id, new_username, new_nickname, new_jurusan, None)
-                        elif role == "lecturer":
-                            update_user_info(user_id, new_username, new_nickname, None, new_mata_kuliah)
-                        else:
-                            update_user_info(user_id, new_username, new_nickname, None, None)
-                        st.success(f"✅ User {new_username} berhasil diupdate")
-                        st.rerun()
+    user_directory_section()
     st.markdown("---")
     st.subheader("➕ Tambah User Baru")
     with st.form("add_user_form"):
@@ -619,111 +3901,123 @@ def manage_users_admin_page():
             elif user_exists(new_username):
                 st.error("Username sudah ada")
             else:
-                ok = add_user(new_username, new_password, new_role, new_nickname, new_jurusan, new_mata_kuliah)
-                if ok:
-                    st.success(f"✅ User '{new_username}' berhasil dibuat")
-                    st.rerun()
+                with write_guard():
+                    ok = add_user(new_username, new_password, new_role, new_nickname, new_jurusan, new_mata_kuliah)
+                    if ok:
+                        st.success(f"✅ User '{new_username}' berhasil dibuat")
+                        st.rerun()
+                    else:
+                        st.error("Gagal membuat user")
+    st.markdown("---")
+    st.subheader("📥 Import User (CSV/JSON)")
+    st.caption(f"Kolom: {', '.join(USER_IMPORT_FIELDS)}. Role kosong dianggap student; kolom lain (mis. id) diabaikan.")
+    with st.form("import_users_form"):
+        upload = st.file_uploader("File user", type=["csv", "json"])
+        default_password = st.text_input("Password default (untuk baris tanpa password)", type="password")
+        if st.form_submit_button("📥 Import"):
+            if upload is None:
+                st.error("Pilih file terlebih dahulu")
+            else:
+                fmt = "json" if upload.name.lower().endswith(".json") else "csv"
+                try:
+                    rows = parse_user_file(upload.getvalue(), fmt)
+                except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+                    st.error(f"File tidak bisa dibaca: {exc}")
                 else:
-                    st.error("Gagal membuat user")
+                    with write_guard():
+                        result = import_users(rows, default_password)
+                        st.session_state["users_import_result"] = (len(rows), result)
+    if "users_import_result" in st.session_state:
+        total, result = st.session_state["users_import_result"]
+        st.success(f"✅ {result['inserted']} dari {total} user berhasil diimport")
+        if result["errors"]:
+            st.warning(f"{len(result['errors'])} baris gagal")
+            st.dataframe(pd.DataFrame(result["errors"], columns=["Baris", "Username", "Error"]),
+                         use_container_width=True, hide_index=True)
+    st.subheader("📤 Export User")
+    col1, col2 = st.columns(2)
+    with col1:
+        export_fmt = st.radio("Format", ["csv", "json"], horizontal=True, key="users_export_fmt")
+    with col2:
+        # Export dibuat saat diminta saja, bukan di setiap rerun halaman ini
+        if st.button("📦 Siapkan Export"):
+            st.session_state["users_export"] = (export_fmt, "".join(iter_users_export(export_fmt)).encode("utf-8"))
+    if st.session_state.get("users_export", (None,))[0] == export_fmt:
+        st.download_button(
+            "⬇️ Download", st.session_state["users_export"][1],
+            file_name=f"users_{datetime.now():%Y%m%d}.{export_fmt}",
+            mime="text/csv" if export_fmt == "csv" else "application/json",
+        )
 
 def manage_tasks_admin_page():
-    """Admin page to manage all tasks, grouped by mata kuliah"""
+    """Admin page to manage all tasks (paginated, filtered in SQL)"""
     st.header("📝 Manajemen Tugas (Admin)")
-    # Get all tasks
-    all_tasks = get_all_tasks()
-    if not all_tasks:
+    mata_kuliah_list = get_task_mata_kuliah_list()
+    if not mata_kuliah_list:
         st.info("Belum ada tugas")
         return
-        
-    # Extract unique mata_kuliah
-    mata_kuliah_list = sorted(list(set(task[3] for task in all_tasks)))
-    
-    # Add selectbox for filtering by mata_kuliah
     selected_mk = st.selectbox("Filter berdasarkan Mata Kuliah", ["Semua Mata Kuliah"] + mata_kuliah_list)
-    
-    # Filter tasks based on selection
-    if selected_mk == "Semua Mata Kuliah":
-        tasks_to_display = all_tasks
-    else:
-        tasks_to_display = [t for t in all_tasks if t[3] == selected_mk]
-    
-    if not tasks_to_display:
-        st.info(f"Tidak ada tugas untuk mata kuliah {selected_mk}")
+    task_list_section(None if selected_mk == "Semua Mata Kuliah" else selected_mk, "admin_tasks")
+
+def task_list_section(mata_kuliah, key):
+    """Daftar tugas berhalaman; form edit hanya dibuat untuk tugas yang sedang dibuka"""
+    cursor, page = page_cursor(key, mata_kuliah)
+    rows, next_cursor = get_tasks_page(mata_kuliah, cursor)
+    if not rows:
+        st.info(f"Tidak ada tugas untuk mata kuliah {mata_kuliah}" if mata_kuliah else "Belum ada tugas")
         return
-        
-    # Display tasks grouped by mata_kuliah if showing all
-    if selected_mk == "Semua Mata Kuliah":
-        # Group tasks by mata_kuliah
-        from collections import defaultdict
-        grouped_tasks = defaultdict(list)
-        for t in tasks_to_display:
-            grouped_tasks[t[3]].append(t)  # t[3] is mata_kuliah
-            
-        # Display each group
-        for mk, mk_tasks in grouped_tasks.items():
-            st.markdown("---")
-            st.subheader(f"📚 Mata Kuliah: {mk}")
-            
-            # Display tasks for this mata_kuliah with local index
-            for local_idx, t in enumerate(mk_tasks, 1):
-                tid, title, desc, mata_kuliah, target_jurusan, created_by, created_at, deadline = t
-                target_list = json.loads(target_jurusan)
-                with st.expander(f"📄 Tugas {local_idx}: {title}", expanded=False):  # Diubah di sini
-                    st.write(f"**Dibuat oleh:** {created_by}")
-                    st.write(f"**Target Jurusan:** {', '.join(target_list)}")
-                    if deadline:
-                        st.write(f"**Deadline:** {deadline}")
-                    st.caption(f"Dibuat pada {created_at}")
-                    with st.form(f"edit_task_{tid}"):
-                        new_title = st.text_input("Judul", value=title, key=f"title_all_{tid}")
-                        new_desc = st.text_area("Deskripsi", value=desc, key=f"desc_all_{tid}")
-                        new_deadline = st.date_input(
-                            "Deadline", 
-                            value=None if not deadline else datetime.fromisoformat(deadline).date(),
-                            key=f"deadline_all_{tid}"
-                        )
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            if st.form_submit_button("💾 Update", key=f"update_all_{tid}"):
-                                update_task(tid, new_title, new_desc, None, new_deadline.isoformat() if new_deadline else None)
-                                st.success("✅ Tugas berhasil diupdate")
-                                st.rerun()
-                        with col2:
-                            if st.form_submit_button("🗑️ Hapus", type="secondary", key=f"delete_all_{tid}"):
-                                delete_task(tid)
-                                st.success("✅ Tugas dihapus")
-                                st.rerun()
-    else:
-        # Display tasks for selected mata_kuliah with local index
-        st.subheader(f"📚 Tugas untuk Mata Kuliah: {selected_mk}")
-        for local_idx, t in enumerate(tasks_to_display, 1):
-            tid, title, desc, mata_kuliah, target_jurusan, created_by, created_at, deadline = t
-            target_list = json.loads(target_jurusan)
-            with st.expander(f"📄 Tugas {local_idx}: {title}", expanded=False):  # Diubah di sini
-                st.write(f"**Dibuat oleh:** {created_by}")
-                st.write(f"**Target Jurusan:** {', '.join(target_list)}")
-                if deadline:
-                    st.write(f"**Deadline:** {deadline}")
-                st.caption(f"Dibuat pada {created_at}")
-                with st.form(f"edit_task_{tid}"):
-                    new_title = st.text_input("Judul", value=title, key=f"title_sel_{tid}")
-                    new_desc = st.text_area("Deskripsi", value=desc, key=f"desc_sel_{tid}")
-                    new_deadline = st.date_input(
-                        "Deadline", 
-                        value=None if not deadline else datetime.fromisoformat(deadline).date(),
-                        key=f"deadline_sel_{tid}"
-                    )
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        if st.form_submit_button("💾 Update", key=f"update_sel_{tid}"):
-                            update_task(tid, new_title, new_desc, None, new_deadline.isoformat() if new_deadline else None)
-                            st.success("✅ Tugas berhasil diupdate")
-                            st.rerun()
-                    with col2:
-                        if st.form_submit_button("🗑️ Hapus", type="secondary", key=f"delete_sel_{tid}"):
-                            delete_task(tid)
-                            st.success("✅ Tugas dihapus")
-                            st.rerun()
+
+    offset = (page - 1) * TASKS_PAGE_SIZE
+    df = pd.DataFrame(
+        [(offset + i, tid, title, mk, ", ".join(json.loads(target_jurusan)), deadline or "-", created_by)
+         for i, (tid, title, mk, target_jurusan, created_by, created_at, deadline) in enumerate(rows, 1)],
+        columns=["No", "ID", "Judul", "Mata Kuliah", "Target Jurusan", "Deadline", "Dibuat oleh"],
+    )
+    if mata_kuliah:
+        df = df.drop(columns="Mata Kuliah")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    paginator(key, next_cursor, f"{len(rows)} dari {count_tasks(mata_kuliah)} tugas")
+
+    titles = {row[0]: f"{offset + i}. {row[1]}" for i, row in enumerate(rows, 1)}
+    task_id = st.selectbox("📂 Buka Tugas", [None, *titles], key=f"{key}_open",
+                           format_func=lambda tid: "Pilih tugas untuk dilihat / diedit" if tid is None else titles[tid])
+    if task_id is not None:
+        task_edit_form(task_id, key)
+
+def task_edit_form(task_id, key):
+    """Detail dan form edit/hapus untuk satu tugas"""
+    task = get_task(task_id)
+    if not task:
+        st.warning("Tugas sudah dihapus")
+        return
+    tid, title, desc, mata_kuliah, target_jurusan, created_by, created_at, deadline = task
+    st.write(f"**Mata Kuliah:** {mata_kuliah} | **Dibuat oleh:** {created_by}")
+    st.write(f"**Target Jurusan:** {', '.join(json.loads(target_jurusan))}")
+    if deadline:
+        st.write(f"**Deadline:** {deadline}")
+    st.caption(f"Dibuat pada {created_at}")
+    with st.form(f"{key}_edit_{tid}"):
+        new_title = st.text_input("Judul", value=title, key=f"{key}_title_{tid}")
+        new_desc = st.text_area("Deskripsi", value=desc, key=f"{key}_desc_{tid}")
+        new_deadline = st.date_input(
+            "Deadline",
+            value=None if not deadline else datetime.fromisoformat(deadline).date(),
+            key=f"{key}_deadline_{tid}",
+        )
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if st.form_submit_button("💾 Update"):
+                with write_guard():
+                    update_task(tid, new_title, new_desc, None, new_deadline.isoformat() if new_deadline else None)
+                    st.success("✅ Tugas berhasil diupdate")
+                    st.rerun()
+        with col2:
+            if st.form_submit_button("🗑️ Hapus", type="secondary"):
+                with write_guard():
+                    delete_task(tid)
+                    st.success("✅ Tugas dihapus")
+                    st.rerun()
 
 def manage_materials_admin_page():
     """Admin page to manage all materials"""
@@ -740,71 +4034,364 @@ def manage_materials_admin_page():
                 col1, col2 = st.columns([3, 1])
                 with col2:
                     if st.button("🗑️ Hapus", key=f"del_mat_{mid}"):
-                        delete_material(mid)
-                        st.success("✅ Materi dihapus")
-                        st.rerun()
+                        with write_guard():
+                            delete_material(mid)
+                            st.success("✅ Materi dihapus")
+                            st.rerun()
     else:
         st.info("Belum ada materi")
 
 def view_all_answers_admin_page():
-    """Admin view all answers"""
+    """Admin view all answers (paginated, filtered in SQL)"""
     st.header("📊 Semua Jawaban (Admin)")
-    rows = get_all_answers()
-    if rows:
-        df = pd.DataFrame(rows, columns=[
-            "ID", "Task ID", "Task Title", "Mata Kuliah", 
-            "Username", "Answer", "Score", "Feedback", 
-            "Status", "Submitted", "Finalized"
-        ])
-        st.dataframe(df, use_container_width=True, hide_index=True)
-    else:
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        selected_mk = st.selectbox("Mata Kuliah", ["Semua Mata Kuliah"] + get_task_mata_kuliah_list())
+    mata_kuliah = None if selected_mk == "Semua Mata Kuliah" else selected_mk
+    with col2:
+        # Pilihan tugas hanya dimuat untuk satu mata kuliah agar tidak membaca semua tugas
+        tasks = get_task_titles(mata_kuliah) if mata_kuliah else []
+        task_titles = {t[0]: t[1] for t in tasks}
+        task_id = st.selectbox(
+            "Tugas", [None] + list(task_titles), disabled=mata_kuliah is None,
+            help="Pilih mata kuliah untuk memfilter per tugas",
+            format_func=lambda tid: "Semua Tugas" if tid is None else f"{task_titles[tid]} (ID: {tid})",
+        )
+    with col3:
+        selected_status = st.selectbox("Status", ["Semua Status", "submitted", "draft"])
+    status = None if selected_status == "Semua Status" else selected_status
+    with col4:
+        username = st.text_input("Username (awalan)").strip()
+    gradebook_export_section(mata_kuliah, tasks)
+
+    before_id, _ = page_cursor("answers", (mata_kuliah, task_id, status, username))
+    rows, next_cursor = get_answers_page(before_id, ANSWERS_PAGE_SIZE, mata_kuliah, status, task_id, username)
+    if not rows:
         st.info("Belum ada jawaban")
+        return
+    df = pd.DataFrame(rows, columns=[
+        "ID", "Task ID", "Task Title", "Mata Kuliah",
+        "Username", "Answer", "Score",
+        "Status", "Submitted", "Finalized"
+    ])
+    event = st.dataframe(
+        df, use_container_width=True, hide_index=True,
+        on_select="rerun", selection_mode="single-row", key="answers_table",
+    )
+    paginator("answers", next_cursor, f"{len(rows)} jawaban")
+
+    if event.selection.rows:
+        detail = get_answer_detail(int(df.iloc[event.selection.rows[0]]["ID"]))
+        if detail:
+            ans_id, _, title, mk, ans_username, answer, score, feedback, ans_status, submitted_at, finalized_at = detail
+            st.markdown("---")
+            st.subheader(f"📝 {title} — {ans_username}")
+            st.caption(f"{mk} · Status: {ans_status} · Submitted: {submitted_at} · Finalized: {finalized_at or '-'}")
+            st.write(f"**Jawaban:** {answer}")
+            if score is not None:
+                st.metric("Score", f"{score}/100")
+            if feedback:
+                st.info(f"**Feedback:** {feedback}")
+
+# ========== SEARCH PAGE ==========
+def search_page(user):
+    """Full-text search for admin (all data) and lecturer (own mata kuliah)"""
+    st.header("🔎 Pencarian")
+    role = user[3]
+    mata_kuliah = user[6] if role == "lecturer" else None
+    if mata_kuliah:
+        st.caption(f"Hasil dibatasi ke mata kuliah **{mata_kuliah}** (jawaban yang sudah submitted)")
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        text = st.text_input("Kata kunci", placeholder="Contoh: kalkulus integral").strip()
+    with col2:
+        kind = st.radio("Cari di", SEARCH_KINDS_BY_ROLE[role], horizontal=True)
+    if not text:
+        st.info("Masukkan kata kunci untuk mulai mencari")
+        return
+
+    # Halaman di-reset setiap kali kata kunci atau jenis dokumen berubah
+    if st.session_state.get("search_filters") != (text, kind):
+        st.session_state["search_filters"] = (text, kind)
+        st.session_state["search_page"] = 0
+    page = st.session_state["search_page"]
+    started = time.perf_counter()
+    rows, has_next = search_documents(kind, text, mata_kuliah, page * SEARCH_PAGE_SIZE)
+    elapsed_ms = 1000 * (time.perf_counter() - started)
+    if not rows:
+        st.info("Tidak ada hasil")
+        return
+    st.caption(f"Halaman {page + 1} · {len(rows)} hasil · {elapsed_ms:.1f} ms")
+    for doc_id, title, context, snippet in rows:
+        st.markdown(f"**{title}** (ID: {doc_id})  \n{context}")
+        st.markdown(f"> {' '.join(snippet.split())}")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("⬅️ Sebelumnya", disabled=page == 0, key="search_prev"):
+            st.session_state["search_page"] -= 1
+            st.rerun()
+    with col2:
+        if st.button("Berikutnya ➡️", disabled=not has_next, key="search_next"):
+            st.session_state["search_page"] += 1
+            st.rerun()
+
+# ========== COURSE ANALYTICS PAGE ==========
+def course_analytics_page(user):
+    """Analitik nilai per mata kuliah (admin: pilih mata kuliah, lecturer: mata kuliahnya sendiri)"""
+    st.header("📈 Analitik Nilai")
+    if user[3] == "lecturer":
+        mata_kuliah = user[6]
+        st.caption(f"Mata kuliah: **{mata_kuliah}**")
+    else:
+        courses = get_task_mata_kuliah_list()
+        if not courses:
+            st.info("Belum ada tugas")
+            return
+        mata_kuliah = st.selectbox("Mata Kuliah", courses, key="analytics_mk")
+
+    analytics = get_course_analytics(mata_kuliah)
+    overall = analytics["overall"]
+    if not overall["tasks"]:
+        st.info("Belum ada tugas untuk mata kuliah ini")
+        return
+
+    def fmt(value, pattern="{:.1f}"):
+        return "-" if value is None or pd.isna(value) else pattern.format(value)
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Tugas", overall["tasks"])
+    with col2:
+        st.metric("Mahasiswa Mengumpulkan", overall["students"])
+    with col3:
+        st.metric("Rata-rata Nilai", fmt(overall["mean"]), help=f"Median {fmt(overall['median'])} · SD {fmt(overall['std'])}")
+    with col4:
+        st.metric("Tingkat Pengumpulan", fmt(overall["submission_rate"], "{:.0%}"))
+    with col5:
+        st.metric("Sudah Dinilai", fmt(overall["grading_rate"], "{:.0%}"), help=f"{overall['graded']} dari {overall['submitted']} jawaban")
+
+    percent = st.column_config.NumberColumn(format="percent")
+    number = st.column_config.NumberColumn(format="%.1f")
+    st.subheader("Per Tugas")
+    st.dataframe(
+        analytics["per_task"],
+        use_container_width=True,
+        column_config={
+            "title": "Judul",
+            "mean": number, "median": number, "std": number,
+            "eligible": "Target", "submitted": "Dikumpulkan", "graded": "Dinilai",
+            "submission_rate": percent, "grading_rate": percent,
+        },
+    )
+
+    st.subheader("Distribusi Nilai")
+    histogram = analytics["histogram"]
+    if overall["graded"]:
+        st.bar_chart(histogram.sum())
+        with st.expander("Distribusi per tugas"):
+            st.dataframe(histogram.rename(index=analytics["per_task"]["title"]), use_container_width=True)
+    else:
+        st.info("Belum ada jawaban yang dinilai")
+
+    st.subheader("Per Mahasiswa")
+    st.dataframe(
+        analytics["per_student"],
+        use_container_width=True,
+        column_config={
+            "submitted": "Dikumpulkan", "graded": "Dinilai",
+            "mean": number, "median": number, "std": number,
+        },
+    )
+    with st.expander("Matriks nilai (mahasiswa × tugas)"):
+        st.dataframe(analytics["matrix"], use_container_width=True)
 
 # ========== ADMIN FEEDBACK PAGE ==========
 def view_feedback_admin_page():
-    """Admin page to view all feedback from users"""
+    """Admin page to triage feedback from users (open first, paginated)"""
     st.header("📣 Feedback dari Users")
     
-    # Filter options
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.write("Daftar semua feedback yang dikirim oleh users")
-    
-    feedbacks = get_all_feedback()
-    if feedbacks:
-        # Stats
-        total_feedback = len(feedbacks)
-        student_feedback = len([f for f in feedbacks if f[3] == "student"])
-        lecturer_feedback = len([f for f in feedbacks if f[3] == "lecturer"])
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Feedback", total_feedback)
-        with col2:
-            st.metric("Dari Mahasiswa", student_feedback)
-        with col3:
-            st.metric("Dari Dosen", lecturer_feedback)
-        
-        st.markdown("---")
-        
-        # Display feedback
-        for fb in feedbacks:
-            fb_id, user_id, username, role, message, created_at = fb
-            created_date = created_at.split("T")[0] if created_at else ""
-            
-            with st.expander(f"👤 **{username}** ({role}) - 📅 {created_date}", expanded=False):
-                st.markdown(f"**Pesan:**\n{message}")
-                
-                # Add response button (could be expanded to actual response feature)
-                if st.button("✅ Tandai sebagai Ditangani", key=f"handled_{fb_id}"):
-                    # In a real system, you might add a "handled" status or delete the feedback
-                    # For now, we'll just show a success message
-                    st.success(f"Feedback dari {username} telah ditangani")
-                    # You could implement deletion here if desired
-    else:
+    counts = get_feedback_counts(datetime.now().date().isoformat())
+    if not counts["total"]:
         st.info("Belum ada feedback dari users")
         st.image("https://static.vecteezy.com/system/resources/previews/004/180/790/non_2x/illustration-of-people-giving-feedback-flat-design-style-vector.jpg", 
                 width=300, caption="Belum ada feedback")
+        return
+
+    # Stats
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Feedback", counts["total"])
+    with col2:
+        st.metric("Belum Ditangani", counts["by_status"].get(FEEDBACK_STATUS_OPEN, 0))
+    with col3:
+        st.metric("Dari Mahasiswa", counts["by_role"].get("student", 0))
+    with col4:
+        st.metric("Dari Dosen", counts["by_role"].get("lecturer", 0))
+    st.caption(f"Hari ini: {counts['today']} · 7 hari terakhir: {counts['last_7_days']}")
+
+    with st.expander("📈 Laporan Feedback", expanded=False):
+        st.markdown("**Feedback mahasiswa per jurusan**")
+        st.dataframe(pd.DataFrame(
+            report_feedback_by_jurusan(), columns=["Jurusan", "Mahasiswa", "Feedback", "Belum Ditangani"],
+        ), use_container_width=True, hide_index=True)
+        st.markdown("**Feedback dosen per mata kuliah**")
+        st.dataframe(pd.DataFrame(
+            report_feedback_by_mata_kuliah(), columns=["Mata Kuliah", "Dosen", "Feedback", "Belum Ditangani"],
+        ), use_container_width=True, hide_index=True)
+        st.markdown(f"**Pengirim feedback dengan ≥ {REPORT_MIN_UNGRADED_ANSWERS} jawaban belum dinilai**")
+        st.dataframe(pd.DataFrame(
+            report_feedback_from_ungraded_students(),
+            columns=["User ID", "Username", "Nama", "Jurusan", "Belum Dinilai", "Feedback", "Belum Ditangani", "Feedback Terakhir"],
+        ), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+
+    # Filter options
+    col1, col2 = st.columns(2)
+    with col1:
+        status_label = st.selectbox("Status", ["Semua (open dulu)", "Belum Ditangani", "Sudah Ditangani"])
+    status = {"Belum Ditangani": FEEDBACK_STATUS_OPEN, "Sudah Ditangani": FEEDBACK_STATUS_HANDLED}.get(status_label)
+    with col2:
+        role_label = st.selectbox("Dari", ["Semua Role", "student", "lecturer", "admin"])
+    role = None if role_label == "Semua Role" else role_label
+
+    cursor, _ = page_cursor("feedback", (status, role))
+    rows, next_cursor = get_feedback_page(cursor, FEEDBACK_PAGE_SIZE, status, role)
+    if not rows:
+        st.info("Tidak ada feedback untuk filter ini")
+        return
+    df = pd.DataFrame(
+        [(fb_id, username, fb_role, message, created_at.split("T")[0] if created_at else "", fb_status)
+         for fb_id, _, username, fb_role, message, created_at, fb_status, _ in rows],
+        columns=["ID", "Username", "Role", "Pesan", "Tanggal", "Status"],
+    )
+    event = st.dataframe(
+        df, use_container_width=True, hide_index=True,
+        on_select="rerun", selection_mode="multi-row", key="feedback_table",
+    )
+    selected = [rows[i] for i in event.selection.rows]
+    open_selected = [fb[0] for fb in selected if fb[6] == FEEDBACK_STATUS_OPEN]
+    open_on_page = [fb[0] for fb in rows if fb[6] == FEEDBACK_STATUS_OPEN]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"✅ Tandai {len(open_selected)} Terpilih sebagai Ditangani", disabled=not open_selected):
+            with write_guard():
+                changed = mark_feedback_handled(open_selected)
+                st.success(f"{changed} feedback ditandai sebagai ditangani")
+                st.rerun()
+    with col2:
+        if st.button("✅ Tandai Semua di Halaman Ini", disabled=not open_on_page):
+            with write_guard():
+                changed = mark_feedback_handled(open_on_page)
+                st.success(f"{changed} feedback ditandai sebagai ditangani")
+                st.rerun()
+
+    paginator("feedback", next_cursor, f"{len(rows)} feedback")
+
+    # Display selected feedback
+    for fb_id, user_id, username, fb_role, message, created_at, fb_status, handled_at in selected:
+        created_date = created_at.split("T")[0] if created_at else ""
+        with st.expander(f"👤 **{username}** ({fb_role}) - 📅 {created_date}", expanded=True):
+            st.markdown(f"**Pesan:**\n{message}")
+            if fb_status == FEEDBACK_STATUS_HANDLED:
+                st.caption(f"Ditangani pada {handled_at.split('.')[0].replace('T', ' ') if handled_at else '-'}")
+
+# ========== ADMIN PERFORMANCE PAGE ==========
+def performance_admin_page():
+    """Admin page for SQL tracing and page render profiling"""
+    st.header("⚡ Performa")
+    tab_queries, tab_pages = st.tabs(["🗄️ Query SQL", "⏱️ Render Halaman"])
+    with tab_queries:
+        query_trace_section()
+    with tab_pages:
+        page_profile_section()
+
+def query_trace_section():
+    """Trace SQL queries per helper and per page"""
+    enabled = st.toggle("Aktifkan tracing query", value=query_tracer.enabled,
+                        help="Mencatat setiap statement SQL di semua sesi; matikan lagi setelah selesai")
+    if enabled != query_tracer.enabled:
+        query_tracer.enabled = enabled
+        st.rerun()
+    stats = query_tracer.stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Status", "Aktif" if stats["enabled"] else "Nonaktif")
+    with col2:
+        st.metric("Statement Tercatat", f"{stats['records']}/{stats['max_entries']}")
+    with col3:
+        if st.button("🧹 Reset Data Tracing"):
+            query_tracer.reset()
+            st.rerun()
+    st.caption(f"Data sejak {stats['since'].split('.')[0].replace('T', ' ')}")
+
+    if not stats["records"]:
+        st.info("Belum ada query tercatat. Aktifkan tracing lalu buka halaman lain.")
+        return
+
+    pages = query_tracer.page_stats()
+    if pages:
+        st.subheader("📄 Query per Halaman")
+        df = pd.DataFrame(pages, columns=["page", "renders", "queries", "total_ms"])
+        renders = df["renders"].where(df["renders"] > 0)
+        df["queries_per_render"] = (df["queries"] / renders).astype(float).round(1)
+        df["ms_per_render"] = (df["total_ms"] / renders).astype(float).round(2)
+        df = df.sort_values("queries_per_render", ascending=False)
+        df.columns = ["Halaman", "Render", "Query", "Total (ms)", "Query/Render", "ms/Render"]
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    st.subheader("🔧 Panggilan per Helper")
+    df = pd.DataFrame(query_tracer.helper_stats(), columns=["helper", "calls", "total_ms", "rows"])
+    df["avg_ms"] = (df["total_ms"] / df["calls"]).astype(float).round(3)
+    df = df.sort_values("calls", ascending=False)
+    df.columns = ["Helper", "Panggilan", "Total (ms)", "Baris", "Rata-rata (ms)"]
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    st.subheader("🐢 Statement Terlambat")
+    df = pd.DataFrame(query_tracer.slowest(20),
+                      columns=["duration_ms", "rows", "helper", "page", "db", "statement", "at"])
+    df.columns = ["Durasi (ms)", "Baris", "Helper", "Halaman", "DB", "Statement", "Waktu"]
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+def page_profile_section():
+    """Render time, widget count and memory per page and role"""
+    col1, col2 = st.columns(2)
+    with col1:
+        enabled = st.toggle("Aktifkan profiler halaman", value=page_profiler.enabled,
+                            help="Mencatat waktu render setiap halaman di semua sesi")
+    with col2:
+        memory = st.toggle("Ukur alokasi memori (tracemalloc)", value=page_profiler.track_memory,
+                           help="Memperlambat seluruh proses selama aktif")
+    if enabled != page_profiler.enabled or memory != page_profiler.track_memory:
+        page_profiler.enabled = enabled
+        page_profiler.set_track_memory(memory)
+        st.rerun()
+    stats = page_profiler.stats()
+    if not stats:
+        st.info("Belum ada render tercatat. Aktifkan profiler lalu buka halaman lain.")
+        return
+    st.caption(
+        f"Data sejak {page_profiler.since.split('.')[0].replace('T', ' ')} · "
+        f"persentil dari {PAGE_PROFILE_SAMPLES} render terakhir per halaman · budget p95 {PAGE_RENDER_BUDGET_MS} ms"
+    )
+    df = pd.DataFrame(stats, columns=[
+        "page", "role", "renders", "wall_ms_p50", "wall_ms_p95", "wall_ms_max",
+        "widgets_avg", "peak_kb_p95", "over_budget",
+    ])
+    df.columns = ["Halaman", "Role", "Render", "p50 (ms)", "p95 (ms)", "Maks (ms)",
+                  "Widget", "Memori p95 (KB)", "Lewat Budget"]
+    st.dataframe(df.round(1), use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "📥 Export JSON", page_profiler.export_json(),
+            file_name=f"page_profile_{datetime.now():%Y%m%d_%H%M%S}.json", mime="application/json",
+        )
+    with col2:
+        if st.button("🧹 Reset Profil"):
+            page_profiler.reset()
+            st.rerun()
 
 # ========== LECTURER PAGES ==========
 def materials_page_lecturer(user):
@@ -823,13 +4410,14 @@ def materials_page_lecturer(user):
                     st.error("Semua field harus diisi")
                 else:
                     # Parse jurusan
-                    if jurusan_input.strip().lower() == "semua jurusan":
-                        target_jurusan = ["Semua Jurusan"]
+                    if jurusan_input.strip().lower() == ALL_JURUSAN.lower():
+                        target_jurusan = [ALL_JURUSAN]
                     else:
                         target_jurusan = [j.strip() for j in jurusan_input.split(",")]
-                    add_material(title, link, mata_kuliah, target_jurusan, user[4] or user[1])
-                    st.success(f"✅ Materi '{title}' berhasil ditambahkan")
-                    st.rerun()
+                    with write_guard():
+                        add_material(title, link, mata_kuliah, target_jurusan, user[4] or user[1])
+                        st.success(f"✅ Materi '{title}' berhasil ditambahkan")
+                        st.rerun()
     # List materials dengan index lokal per mata kuliah
     st.markdown("---")
     st.subheader("📖 Daftar Materi Saya")
@@ -847,9 +4435,10 @@ def materials_page_lecturer(user):
                 st.caption(f"Dibuat pada {created_at}")
             with col2:
                 if st.button("🗑️ Hapus", key=f"del_{mat_id}"):
-                    delete_material(mat_id)
-                    st.success("Materi dihapus")
-                    st.rerun()
+                    with write_guard():
+                        delete_material(mat_id)
+                        st.success("Materi dihapus")
+                        st.rerun()
             st.markdown("---")
     else:
         st.info("Belum ada materi")
@@ -871,51 +4460,18 @@ def manage_tasks_lecturer_page(user):
                     st.error("Judul, deskripsi, dan target jurusan harus diisi")
                 else:
                     # Parse jurusan
-                    if jurusan_input.strip().lower() == "semua jurusan":
-                        target_jurusan = ["Semua Jurusan"]
+                    if jurusan_input.strip().lower() == ALL_JURUSAN.lower():
+                        target_jurusan = [ALL_JURUSAN]
                     else:
                         target_jurusan = [j.strip() for j in jurusan_input.split(",")]
                     deadline_str = deadline.isoformat() if deadline else None
-                    add_task(title, desc, mata_kuliah, target_jurusan, user[4] or user[1], deadline_str)
-                    st.success(f"✅ Soal '{title}' berhasil disimpan")
-                    st.rerun()
-    # List tasks dengan format yang dimodifikasi
+                    with write_guard():
+                        add_task(title, desc, mata_kuliah, target_jurusan, user[4] or user[1], deadline_str)
+                        st.success(f"✅ Soal '{title}' berhasil disimpan")
+                        st.rerun()
     st.markdown("---")
     st.subheader("📚 Daftar Soal Saya")
-    tasks = get_all_tasks_by_lecturer(mata_kuliah)
-    if tasks:
-        # Gunakan enumerate untuk membuat index lokal yang dimulai dari 1
-        for local_idx, t in enumerate(tasks, 1):
-            tid, title, desc, _, target_jurusan, created_by, created_at, deadline = t
-            target_list = json.loads(target_jurusan)
-            with st.expander(f"📄 Soal {local_idx}: {title}", expanded=False):  # Diubah di sini
-                st.write(f"**Deskripsi:** {desc}")
-                st.write(f"**Target Jurusan:** {', '.join(target_list)}")
-                if deadline:
-                    st.write(f"**Deadline:** {deadline}")
-                st.caption(f"Dibuat pada {created_at}")
-                # Form untuk edit/hapus tetap menggunakan ID asli dari database
-                with st.form(f"edit_task_{tid}"):
-                    new_title = st.text_input("Judul", value=title, key=f"title_{tid}")
-                    new_desc = st.text_area("Deskripsi", value=desc, key=f"desc_{tid}")
-                    new_deadline = st.date_input(
-                        "Deadline", 
-                        value=None if not deadline else datetime.fromisoformat(deadline).date(),
-                        key=f"deadline_{tid}"
-                    )
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        if st.form_submit_button("💾 Update", key=f"update_{tid}"):
-                            update_task(tid, new_title, new_desc, None, new_deadline.isoformat() if new_deadline else None)
-                            st.success("✅ Soal berhasil diupdate")
-                            st.rerun()
-                    with col2:
-                        if st.form_submit_button("🗑️ Hapus", type="secondary", key=f"delete_{tid}"):
-                            delete_task(tid)
-                            st.success("✅ Soal dihapus")
-                            st.rerun()
-    else:
-        st.info("Belum ada soal")
+    task_list_section(mata_kuliah, "lecturer_tasks")
 
 def grade_answers_lecturer_page(user):
     """Lecturer page to grade answers"""
@@ -925,6 +4481,11 @@ def grade_answers_lecturer_page(user):
     if not tasks:
         st.info("Belum ada tugas")
         return
+    gradebook_export_section(mata_kuliah, tasks)
+    mode = st.radio("Mode Penilaian", ["📋 Grid Massal", "📝 Per Jawaban"], horizontal=True)
+    if mode == "📋 Grid Massal":
+        bulk_grade_answers(mata_kuliah, tasks)
+        return
     for t in tasks:
         tid, title = t[0], t[1]
         with st.expander(f"📝 {title} (ID: {tid})", expanded=False):
@@ -956,29 +4517,71 @@ def grade_answers_lecturer_page(user):
                             key=f"fb_{ans_id}"
                         )
                     if st.form_submit_button("💾 Simpan Nilai"):
-                        update_answer_score(ans_id, new_score, fb)
-                        st.success("✅ Nilai tersimpan")
-                        st.rerun()
+                        with write_guard():
+                            update_answer_score(ans_id, new_score, fb)
+                            st.success("✅ Nilai tersimpan")
+                            st.rerun()
                 st.markdown("---")
 
+def bulk_grade_answers(mata_kuliah, tasks):
+    """Grid penilaian: semua jawaban submitted dimuat sekali, perubahan disimpan sekali"""
+    rows = get_submitted_answers_by_mata_kuliah(mata_kuliah)
+    if not rows:
+        st.info("Belum ada jawaban yang disubmit")
+        return
+    task_titles = {t[0]: t[1] for t in tasks}
+    task_filter = st.selectbox(
+        "Filter Tugas", [None] + list(task_titles),
+        format_func=lambda tid: "Semua Tugas" if tid is None else task_titles[tid],
+    )
+    df = pd.DataFrame(rows, columns=["ID", "Task ID", "Tugas", "Siswa", "Jawaban", "Score", "Feedback", "Finalized"])
+    if task_filter is not None:
+        df = df[df["Task ID"] == task_filter].reset_index(drop=True)
+    df["Score"] = pd.to_numeric(df["Score"])
+    df["Feedback"] = df["Feedback"].fillna("")
+    graded = int(df["Score"].notna().sum())
+    st.caption(f"{len(df)} jawaban · {graded} sudah dinilai · {len(df) - graded} belum dinilai")
+    with st.form("bulk_grade_form"):
+        edited = st.data_editor(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            disabled=["ID", "Task ID", "Tugas", "Siswa", "Jawaban", "Finalized"],
+            column_config={
+                "Task ID": None,
+                "Score": st.column_config.NumberColumn("Score (0-100)", min_value=0, max_value=100, step=1),
+                "Feedback": st.column_config.TextColumn("Feedback"),
+                "Jawaban": st.column_config.TextColumn("Jawaban", width="large"),
+            },
+            key=f"bulk_grade_{task_filter}",
+        )
+        if st.form_submit_button("💾 Simpan Semua Nilai"):
+            changed = (
+                (edited["Score"].fillna(-1) != df["Score"].fillna(-1))
+                | (edited["Feedback"].fillna("") != df["Feedback"])
+            )
+            grades = [
+                (int(row.ID), None if pd.isna(row.Score) else int(row.Score), row.Feedback or None)
+                for row in edited[changed].itertuples(index=False)
+            ]
+            with write_guard():
+                saved = update_answer_scores(grades)
+                st.success(f"✅ {saved} nilai tersimpan")
+                st.rerun()
+
 # ========== STUDENT PAGES ==========
+@cached_query("tasks", "materials")
 def get_available_mata_kuliah_for_student(jurusan):
     """Get list of mata kuliah that have tasks/materials for this jurusan"""
-    conn = get_connection()
-    c = conn.cursor()
-    # Get from BOTH tasks AND materials
-    c.execute("SELECT DISTINCT mata_kuliah FROM tasks UNION SELECT DISTINCT mata_kuliah FROM materials")
-    all_mk = [row[0] for row in c.fetchall()]
-    conn.close()
-    # Filter by jurusan
-    available_mk = []
-    for mk in all_mk:
-        # Check if any task OR material in this MK targets this jurusan
-        tasks = get_tasks_by_mata_kuliah_jurusan(mk, jurusan)
-        materials = get_materials_by_mata_kuliah_jurusan(mk, jurusan)
-        if tasks or materials:  # ✅ Cek keduanya
-            available_mk.append(mk)
-    return available_mk
+    # course_availability sudah menggabungkan tugas dan materi per (jurusan, mata_kuliah)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT DISTINCT mata_kuliah FROM course_availability
+            WHERE jurusan IN (?, ?)
+            ORDER BY mata_kuliah
+        """, (jurusan, ALL_JURUSAN))
+        return [row[0] for row in c.fetchall()]
 
 def materials_page_student(user):
     """Student page to view materials"""
@@ -1019,6 +4622,8 @@ def student_tasks_page(user):
     if not tasks:
         st.info("Belum ada tugas untuk mata kuliah ini")
         return
+    # Semua jawaban untuk mata kuliah ini dimuat sekali; baris draft baru dibuat saat disimpan
+    my_answers = get_answers_for_user_tasks(user[0], selected_mk)
     for t in tasks:
         tid, title, desc, _, target_jurusan, created_by, created_at, deadline = t
         with st.expander(f"📝 {title}", expanded=False):
@@ -1027,23 +4632,20 @@ def student_tasks_page(user):
                 st.write(f"⏰ **Deadline:** {deadline}")
             st.caption(f"Dibuat oleh: {created_by}")
             st.markdown("---")
-            # Get or create answer
-            answer_data = get_or_create_answer(user[0], user[1], tid)
-            answer_id, answer_text, status, submitted_at, finalized_at = answer_data
+            answer_data = my_answers.get(tid)
+            if answer_data:
+                answer_id, answer_text, status, submitted_at, finalized_at, score, feedback = answer_data
+            else:
+                answer_id, answer_text, status, score, feedback = None, "", "draft", None, None
             if status == "submitted":
                 st.success("✅ Tugas ini sudah diselesaikan")
                 st.info(f"**Jawaban Anda:** {answer_text}")
                 st.caption(f"Difinalisasi pada: {finalized_at}")
                 # Show score if graded
-                conn = get_connection()
-                c = conn.cursor()
-                c.execute("SELECT score, feedback FROM answers WHERE id=?", (answer_id,))
-                r = c.fetchone()
-                conn.close()
-                if r and r[0] is not None:
-                    st.metric("Score", f"{r[0]}/100")
-                    if r[1]:
-                        st.write(f"**Feedback:** {r[1]}")
+                if score is not None:
+                    st.metric("Score", f"{score}/100")
+                    if feedback:
+                        st.write(f"**Feedback:** {feedback}")
                 else:
                     st.info("Menunggu penilaian dari dosen")
             else:  # draft
@@ -1061,18 +4663,26 @@ def student_tasks_page(user):
                             if not user_answer.strip():
                                 st.error("Jawaban tidak boleh kosong")
                             else:
-                                save_answer_draft(answer_id, user_answer)
-                                st.success("✅ Draft tersimpan. Anda masih bisa mengubahnya.")
-                                st.rerun()
+                                with write_guard():
+                                    if answer_id is None:
+                                        upsert_answer_draft(user[0], user[1], tid, user_answer)
+                                    else:
+                                        save_answer_draft(answer_id, user_answer)
+                                    st.success("✅ Draft tersimpan. Anda masih bisa mengubahnya.")
+                                    st.rerun()
                     with col2:
                         if st.form_submit_button("✔️ Selesai & Submit", type="primary"):
                             if not user_answer.strip():
                                 st.error("Jawaban tidak boleh kosong")
                             else:
-                                save_answer_draft(answer_id, user_answer)
-                                finalize_answer(answer_id)
-                                st.success("✅ Tugas berhasil diselesaikan dan disubmit!")
-                                st.rerun()
+                                with write_guard():
+                                    if answer_id is None:
+                                        answer_id = upsert_answer_draft(user[0], user[1], tid, user_answer)
+                                    else:
+                                        save_answer_draft(answer_id, user_answer)
+                                    finalize_answer(answer_id)
+                                    st.success("✅ Tugas berhasil diselesaikan dan disubmit!")
+                                    st.rerun()
 
 def student_results_page(user):
     """Student page to view results"""
@@ -1104,15 +4714,52 @@ def student_results_page(user):
     else:
         st.info("Belum ada hasil untuk mata kuliah ini")
 
+# ========== BOOTSTRAP ==========
+@st.cache_resource
+def _bootstrap_status():
+    return {"lock": threading.Lock(), "ready": {}}
+
+def bootstrap():
+    """Siapkan proses sekali saja: migrasi skema, admin default, dan pemanasan cache.
+
+    Hasilnya dicatat per pasangan path database; rerun berikutnya langsung
+    kembali lewat flag tersebut tanpa menyentuh database.
+    """
+    status = _bootstrap_status()
+    key = (STORAGE_BACKEND, DB_PATH, FEEDBACK_DB_PATH)
+    health = status["ready"].get(key)
+    if health is not None:
+        return health
+    with status["lock"]:
+        health = status["ready"].get(key)
+        if health is not None:
+            return health
+        schema_version = create_db()
+        feedback_schema_version = create_feedback_db()  # Create feedback database
+        # Ensure default admin exists
+        if not user_exists("admin"):
+            add_user("admin", "admin123", "admin", "Admin", "", "")
+        get_storage().start()
+        warm_up()
+        health = {
+            "storage": STORAGE_BACKEND,
+            "schema_version": schema_version,
+            "feedback_schema_version": feedback_schema_version,
+            "bootstrapped_at": datetime.now().isoformat(),
+        }
+        status["ready"][key] = health
+    return health
+
+def warm_up():
+    """Isi pool koneksi dan query cache untuk bacaan yang terjadi di setiap halaman"""
+    for jurusan in get_user_jurusan_list():
+        get_available_mata_kuliah_for_student(jurusan)
+    get_feedback_counts(datetime.now().date().isoformat())
+
 # ========== MAIN APP ==========
 def main():
     st.set_page_config(page_title="E-Learning System", page_icon="🎓", layout="wide")
-    create_db()
-    create_feedback_db()  # Create feedback database
-    
-    # Ensure default admin exists
-    if not user_exists("admin"):
-        add_user("admin", "admin123", "admin", "Admin", "", "")
+    bootstrap()
     
     # Session init
     if "user" not in st.session_state:
@@ -1146,14 +4793,19 @@ def main():
             "📚 Manajemen Materi",
             "📝 Manajemen Tugas",
             "📊 Semua Jawaban",
-            "📣 Feedback Users"  # Menu baru untuk feedback
+            "📈 Analitik Nilai",
+            "🔎 Pencarian",
+            "📣 Feedback Users",  # Menu baru untuk feedback
+            "⚡ Performa"
         ])
     elif role == "lecturer":
         menu = st.sidebar.radio("🧭 Navigasi", [
             "Dashboard",
             "📚 Materi Tambahan",
             "📝 Manajemen Tugas",
-            "✏️ Penilaian Jawaban"
+            "✏️ Penilaian Jawaban",
+            "📈 Analitik Nilai",
+            "🔎 Pencarian"
         ])
     else:  # student
         menu = st.sidebar.radio("🧭 Navigasi", [
@@ -1168,6 +4820,11 @@ def main():
         st.rerun()
     
     # ROUTING
+    with page_profiler.profile(menu, role), query_tracer.page(menu):
+        route_page(menu, user)
+
+def route_page(menu, user):
+    role = user[3]
     if menu == "Dashboard":
         dashboard_page(user)
     elif menu == "👥 Manajemen User":
@@ -1197,6 +4854,16 @@ def main():
             view_all_answers_admin_page()
         else:
             st.error("🚫 Hanya admin yang dapat mengakses halaman ini")
+    elif menu == "📈 Analitik Nilai":
+        if role in ("admin", "lecturer"):
+            course_analytics_page(user)
+        else:
+            st.error("🚫 Hanya admin/lecturer yang dapat mengakses halaman ini")
+    elif menu == "🔎 Pencarian":
+        if role in SEARCH_KINDS_BY_ROLE:
+            search_page(user)
+        else:
+            st.error("🚫 Hanya admin/lecturer yang dapat mengakses halaman ini")
     elif menu == "📚 Materi Tambahan":
         if role == "student":
             materials_page_student(user)
@@ -1211,6 +4878,11 @@ def main():
             view_feedback_admin_page()
         else:
             st.error("🚫 Hanya admin yang dapat mengakses halaman ini")
+    elif menu == "⚡ Performa":
+        if role == "admin":
+            performance_admin_page()
+        else:
+            st.error("🚫 Hanya admin yang dapat mengakses halaman ini")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
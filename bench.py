@@ -0,0 +1,447 @@
+"""Micro-benchmark data layer app.py terhadap dataset sintetis.
+
+Membuat dataset realistis (user, mata kuliah, target jurusan multi-jurusan dalam
+JSON, tugas, materi, jawaban, feedback) lewat bulk insert, lalu mengukur setiap
+helper query di app.py pada beberapa skala. Hasil ditulis sebagai JSON agar
+bisa dibandingkan antar-run.
+
+Contoh:
+    python bench.py --scales 1k,10k --json hasil.json
+    python bench.py --scales 100k --data-dir .bench-data   # dataset disimpan & dipakai ulang
+    python bench.py --scales 1k --compare baseline.json --max-regression 1.5
+    python bench.py --scales 1k --only answers --cached     # lewat query cache, hanya nama yang cocok
+    python bench.py --scales 10k --storage memory            # backend in-memory, tanpa I/O disk
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import streamlit.config
+import streamlit.logger
+
+# app.py dipakai di luar `streamlit run`; peringatan "bare mode" tidak relevan di sini
+streamlit.config.set_option("global.showWarningOnDirectExecution", False)
+streamlit.logger.set_log_level("error")
+
+SCALES = {
+    "1k": {"students": 1_000, "courses": 20, "tasks_per_course": 10, "materials_per_course": 5,
+           "answers": 10_000, "feedback": 500},
+    "10k": {"students": 10_000, "courses": 60, "tasks_per_course": 15, "materials_per_course": 8,
+            "answers": 100_000, "feedback": 5_000},
+    "100k": {"students": 100_000, "courses": 150, "tasks_per_course": 20, "materials_per_course": 10,
+             "answers": 1_000_000, "feedback": 20_000},
+}
+
+JURUSAN = [
+    "Teknik Informatika", "Sistem Informasi", "Teknik Industri", "Teknik Sipil", "Teknik Elektro",
+    "Teknik Mesin", "Arsitektur", "Manajemen", "Akuntansi", "Ekonomi Bisnis", "Ilmu Komunikasi",
+    "Hukum", "Psikologi", "Kedokteran", "Farmasi", "Keperawatan", "Biologi", "Kimia", "Fisika",
+    "Matematika", "Statistika", "Sastra Inggris", "Pendidikan Guru", "Agribisnis", "Desain Komunikasi Visual",
+    "Hubungan Internasional", "Ilmu Politik", "Sosiologi", "Teknik Lingkungan", "Perencanaan Wilayah",
+]
+MATA_KULIAH_BASE = [
+    "Kalkulus", "Fisika Dasar", "Bahasa Inggris", "Statistika", "Algoritma", "Basis Data", "Ekonomi Mikro",
+    "Ekonomi Makro", "Akuntansi Dasar", "Pengantar Manajemen", "Kewarganegaraan", "Pancasila",
+    "Bahasa Indonesia", "Metodologi Penelitian", "Etika Profesi",
+]
+ALL_JURUSAN = "Semua Jurusan"
+# Naikkan jika generate_dataset berubah agar dataset lama di --data-dir dibuat ulang
+DATASET_VERSION = 2
+# "Hari ini" untuk get_feedback_counts; feedback sintetis dimulai 2025-01-01
+FEEDBACK_TODAY = "2025-01-08"
+
+def use_database(db_dir, storage="sqlite"):
+    """Arahkan app ke database di db_dir; backend selain sqlite memuat salinan file di db_dir"""
+    import app
+    streamlit.logger.set_log_level("error")
+    app.close_all_connections()
+    app.STORAGE_BACKEND = storage
+    app.DB_PATH = os.path.join(db_dir, "database.db")
+    app.FEEDBACK_DB_PATH = os.path.join(db_dir, "feedback.db")
+    if storage != "sqlite":
+        backend = app.get_storage()
+        for path in (app.DB_PATH, app.FEEDBACK_DB_PATH):
+            backend.load_file(path, path)
+    app.bootstrap()
+    return app
+
+# ========== DATASET GENERATOR ==========
+def generate_dataset(db_dir, students, courses, tasks_per_course, materials_per_course, answers, feedback, seed=1):
+    """Isi database kosong di db_dir dengan dataset sintetis lewat bulk insert"""
+    rng = random.Random(seed)
+    app = use_database(db_dir)
+    now = datetime(2025, 1, 1)
+    mata_kuliah = [
+        MATA_KULIAH_BASE[i] if i < len(MATA_KULIAH_BASE) else f"{MATA_KULIAH_BASE[i % len(MATA_KULIAH_BASE)]} {i // len(MATA_KULIAH_BASE) + 1}"
+        for i in range(courses)
+    ]
+
+    conn = sqlite3.connect(app.DB_PATH, isolation_level=None)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("BEGIN")
+    student_rows = [
+        (f"{15000000 + i}", f"{15000000 + i}", "student", f"Mahasiswa {i}", rng.choice(JURUSAN), "")
+        for i in range(students)
+    ]
+    lecturer_rows = [
+        (f"{98000000 + i}", f"{98000000 + i}", "lecturer", f"Dosen {mk}", "", mk)
+        for i, mk in enumerate(mata_kuliah)
+    ]
+    conn.executemany(
+        "INSERT INTO users(username, password, role, nickname, jurusan, mata_kuliah) VALUES (?, ?, ?, ?, ?, ?)",
+        student_rows + lecturer_rows,
+    )
+
+    task_rows, task_targets = [], []
+    material_rows, material_targets = [], []
+    for mk in mata_kuliah:
+        for kind in ("task", "material"):
+            count = tasks_per_course if kind == "task" else materials_per_course
+            for n in range(count):
+                # 15% untuk semua jurusan, sisanya 1-12 jurusan tertentu
+                targets = [ALL_JURUSAN] if rng.random() < 0.15 else rng.sample(JURUSAN, rng.randint(1, 12))
+                created_at = (now + timedelta(days=rng.randint(0, 120))).isoformat()
+                if kind == "task":
+                    deadline = (now + timedelta(days=rng.randint(121, 180))).date().isoformat()
+                    task_rows.append((f"Tugas {n + 1} {mk}", f"Kerjakan soal {n + 1} untuk {mk}. " * 5, mk,
+                                      json.dumps(targets), f"Dosen {mk}", created_at, deadline))
+                    task_targets.append(targets)
+                else:
+                    material_rows.append((f"Materi {n + 1} {mk}", f"https://youtu.be/{rng.getrandbits(40):x}", mk,
+                                          json.dumps(targets), f"Dosen {mk}", created_at))
+                    material_targets.append(targets)
+    conn.executemany("""
+        INSERT INTO tasks(title, description, mata_kuliah, target_jurusan, created_by, created_at, deadline)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, task_rows)
+    conn.executemany("""
+        INSERT INTO materials(title, link, mata_kuliah, target_jurusan, created_by, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, material_rows)
+    task_ids = [row[0] for row in conn.execute("SELECT id FROM tasks ORDER BY id")]
+    material_ids = [row[0] for row in conn.execute("SELECT id FROM materials ORDER BY id")]
+    conn.executemany("INSERT INTO task_targets(task_id, jurusan) VALUES (?, ?)",
+                     [(tid, j) for tid, targets in zip(task_ids, task_targets) for j in targets])
+    conn.executemany("INSERT INTO material_targets(material_id, jurusan) VALUES (?, ?)",
+                     [(mid, j) for mid, targets in zip(material_ids, material_targets) for j in targets])
+
+    # Jawaban hanya untuk tugas yang memang ditujukan ke jurusan mahasiswa
+    eligible = {j: [] for j in JURUSAN}
+    for tid, targets in zip(task_ids, task_targets):
+        for j in (JURUSAN if ALL_JURUSAN in targets else targets):
+            eligible[j].append(tid)
+    student_ids = [row[0] for row in conn.execute("SELECT id, jurusan FROM users WHERE role='student' ORDER BY id")]
+    lecturer_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE role='lecturer' ORDER BY id")]
+    student_jurusan = dict(conn.execute("SELECT id, jurusan FROM users WHERE role='student'").fetchall())
+    per_student = max(1, answers // max(1, students))
+    answer_rows = []
+    for uid in student_ids:
+        candidates = eligible[student_jurusan[uid]]
+        for tid in rng.sample(candidates, min(per_student, len(candidates))):
+            submitted_at = (now + timedelta(minutes=rng.randint(0, 200_000))).isoformat()
+            if rng.random() < 0.7:
+                score = rng.randint(40, 100) if rng.random() < 0.6 else None
+                answer_rows.append((tid, uid, f"{uid}", f"Jawaban mahasiswa {uid} untuk tugas {tid}. " * 2,
+                                    score, "Bagus" if score and score > 80 else None, "submitted",
+                                    submitted_at, submitted_at))
+            else:
+                answer_rows.append((tid, uid, f"{uid}", f"Draft {uid}/{tid}", None, None, "draft", submitted_at, None))
+            if len(answer_rows) >= answers:
+                break
+        if len(answer_rows) >= answers:
+            break
+    conn.executemany("""
+        INSERT INTO answers(task_id, user_id, username, answer, score, feedback, status, submitted_at, finalized_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, answer_rows)
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.close()
+
+    # 10% feedback dari dosen; separuh yang lebih lama sudah ditangani
+    feedback_rows = []
+    for i in range(feedback):
+        role = "lecturer" if rng.random() < 0.1 else "student"
+        uid = rng.choice(lecturer_ids if role == "lecturer" else student_ids)
+        created_at = now + timedelta(minutes=i)
+        handled = i < feedback // 2 and rng.random() < 0.5
+        feedback_rows.append((uid, f"{uid}", role, f"Feedback #{i}: materi sulit diakses", created_at.isoformat(),
+                              "handled" if handled else "open",
+                              (created_at + timedelta(days=1)).isoformat() if handled else None))
+    fconn = sqlite3.connect(app.FEEDBACK_DB_PATH, isolation_level=None)
+    fconn.execute("BEGIN")
+    fconn.executemany("""
+        INSERT INTO feedback(user_id, username, role, message, created_at, status, handled_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, feedback_rows)
+    fconn.execute("COMMIT")
+    fconn.close()
+    app.query_cache.clear()
+    return {"tasks": len(task_ids), "materials": len(material_ids), "answers": len(answer_rows)}
+
+def prepare_scale(scale, params, data_dir, seed):
+    """Kembalikan direktori database untuk skala ini, membuat dataset jika perlu"""
+    db_dir = os.path.join(data_dir, scale)
+    marker = os.path.join(db_dir, "dataset.json")
+    expected = {"params": params, "seed": seed, "version": DATASET_VERSION}
+    if os.path.exists(marker):
+        with open(marker, encoding="utf-8") as f:
+            info = json.load(f)
+        if {"params": info["params"], "seed": info["seed"], "version": info.get("version")} == expected:
+            return db_dir, info
+    shutil.rmtree(db_dir, ignore_errors=True)
+    os.makedirs(db_dir)
+    started = time.perf_counter()
+    counts = generate_dataset(db_dir, seed=seed, **params)
+    info = dict(expected, counts=counts, generate_seconds=time.perf_counter() - started)
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return db_dir, info
+
+# ========== BENCHMARKS ==========
+class Sample:
+    """Nilai acak dari dataset untuk argumen benchmark"""
+
+    def __init__(self, db_path, feedback_db_path, rng):
+        # Dibaca langsung dari file dataset, bukan lewat app, agar sama untuk semua backend
+        conn = sqlite3.connect(f"file:{feedback_db_path}?mode=ro", uri=True)
+        try:
+            self.max_feedback_id = conn.execute("SELECT MAX(id) FROM feedback").fetchone()[0] or 0
+        finally:
+            conn.close()
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            self.students = conn.execute(
+                "SELECT id, username, password, jurusan FROM users WHERE role='student'"
+            ).fetchall()
+            self.courses = [row[0] for row in conn.execute("SELECT DISTINCT mata_kuliah FROM tasks")]
+            self.tasks = [row[0] for row in conn.execute("SELECT id FROM tasks")]
+            self.answers = conn.execute("""
+                SELECT a.id, a.user_id, a.task_id, t.mata_kuliah FROM answers a JOIN tasks t ON t.id = a.task_id
+            """).fetchall()
+            self.max_answer_id = conn.execute("SELECT MAX(id) FROM answers").fetchone()[0] or 0
+        finally:
+            conn.close()
+        self.rng = rng
+
+    def student(self):
+        return self.rng.choice(self.students)
+
+    def course(self):
+        return self.rng.choice(self.courses)
+
+    def task(self):
+        return self.rng.choice(self.tasks)
+
+    def answer(self):
+        return self.rng.choice(self.answers)
+
+    def feedback_cursor(self):
+        return ("open", self.rng.randint(1, self.max_feedback_id + 1))
+
+def gradebook_rows(app):
+    """iter_gradebook_chunks dihabiskan seperti export, agar yang diukur seluruh query dan bukan generator"""
+    def run(*args):
+        return [row for chunk in app.iter_gradebook_chunks(*args) for row in chunk]
+    return run
+
+def benchmark_cases(app, sample):
+    """(nama, fungsi, pembuat argumen) untuk setiap helper query di app.py"""
+    s = sample
+    return [
+        ("get_all_feedback", app.get_all_feedback, lambda: ()),
+        ("get_feedback_counts", app.get_feedback_counts, lambda: (FEEDBACK_TODAY,)),
+        ("get_feedback_page[first]", app.get_feedback_page, lambda: ()),
+        ("get_feedback_page[middle]", app.get_feedback_page, lambda: (s.feedback_cursor(),)),
+        ("get_feedback_page[role+status]", app.get_feedback_page,
+         lambda: (None, app.FEEDBACK_PAGE_SIZE, "open", "lecturer")),
+        ("report_feedback_by_jurusan", app.report_feedback_by_jurusan, lambda: ()),
+        ("report_feedback_by_mata_kuliah", app.report_feedback_by_mata_kuliah, lambda: ()),
+        ("report_feedback_from_ungraded_students", app.report_feedback_from_ungraded_students, lambda: (1,)),
+        ("list_users", app.list_users, lambda: ()),
+        ("search_users[first]", app.search_users, lambda: ()),
+        ("search_users[prefix]", app.search_users, lambda: (s.student()[1][:4],)),
+        ("count_users", app.count_users, lambda: ()),
+        ("get_user_by_id", app.get_user_by_id, lambda: (s.student()[0],)),
+        ("get_user_by_credentials", app.get_user_by_credentials, lambda: s.student()[1:3]),
+        ("user_exists", app.user_exists, lambda: (s.student()[1],)),
+        ("get_available_mata_kuliah_for_student", app.get_available_mata_kuliah_for_student, lambda: (s.student()[3],)),
+        ("get_tasks_by_mata_kuliah_jurusan", app.get_tasks_by_mata_kuliah_jurusan, lambda: (s.course(), s.student()[3])),
+        ("get_materials_by_mata_kuliah_jurusan", app.get_materials_by_mata_kuliah_jurusan, lambda: (s.course(), s.student()[3])),
+        ("get_all_tasks_by_lecturer", app.get_all_tasks_by_lecturer, lambda: (s.course(),)),
+        ("get_all_materials_by_lecturer", app.get_all_materials_by_lecturer, lambda: (s.course(),)),
+        ("get_all_tasks", app.get_all_tasks, lambda: ()),
+        ("get_all_materials", app.get_all_materials, lambda: ()),
+        ("get_task_mata_kuliah_list", app.get_task_mata_kuliah_list, lambda: ()),
+        ("get_task_titles", app.get_task_titles, lambda: (s.course(),)),
+        ("get_tasks_page[first]", app.get_tasks_page, lambda: ()),
+        ("get_tasks_page[course]", app.get_tasks_page, lambda: (s.course(),)),
+        ("get_task", app.get_task, lambda: (s.task(),)),
+        ("get_or_create_answer[existing]", app.get_or_create_answer, lambda: (lambda a: (a[1], str(a[1]), a[2]))(s.answer())),
+        ("get_answers_for_task", app.get_answers_for_task, lambda: (s.task(),)),
+        ("get_answers_for_user_tasks", app.get_answers_for_user_tasks, lambda: s.answer()[1::2]),
+        ("get_answers_for_user_by_mata_kuliah", app.get_answers_for_user_by_mata_kuliah, lambda: s.answer()[1::2]),
+        ("get_submitted_answers_by_mata_kuliah", app.get_submitted_answers_by_mata_kuliah, lambda: (s.course(),)),
+        ("get_answers_page[first]", app.get_answers_page, lambda: ()),
+        ("get_answers_page[middle]", app.get_answers_page, lambda: (s.rng.randint(1, s.max_answer_id + 1),)),
+        ("get_answers_page[course+status]", app.get_answers_page,
+         lambda: (None, app.ANSWERS_PAGE_SIZE, s.course(), "submitted")),
+        ("get_answer_detail", app.get_answer_detail, lambda: (s.answer()[0],)),
+        ("get_all_answers", app.get_all_answers, lambda: ()),
+        ("get_course_analytics", app.get_course_analytics, lambda: (s.course(),)),
+        ("iter_gradebook_chunks[all]", gradebook_rows(app), lambda: ()),
+        ("iter_gradebook_chunks[course]", gradebook_rows(app), lambda: (s.course(),)),
+        ("iter_gradebook_chunks[course+answer]", gradebook_rows(app),
+         lambda: (s.course(), None, "submitted", None, None, True)),
+        ("search_documents[tugas]", app.search_documents, lambda: ("Tugas", s.course())),
+        ("search_documents[materi]", app.search_documents, lambda: ("Materi", s.course())),
+        ("search_documents[jawaban+common]", app.search_documents, lambda: ("Jawaban", "jawaban mahasiswa")),
+        ("search_documents[jawaban+lecturer]", app.search_documents, lambda: ("Jawaban", "jawaban", s.course())),
+        ("search_documents[feedback]", app.search_documents, lambda: ("Feedback", "materi sulit")),
+    ]
+
+def row_count(result):
+    if isinstance(result, (list, dict)):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])  # (rows, cursor) dari get_answers_page / search_documents
+    return 0 if result is None else 1
+
+def run_case(func, make_args, time_budget, min_iterations, max_iterations):
+    timings = []
+    rows = None
+    func(*make_args())  # pemanasan
+    deadline = time.perf_counter() + time_budget
+    while len(timings) < max_iterations and (len(timings) < min_iterations or time.perf_counter() < deadline):
+        args = make_args()
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - started)
+        if rows is None:
+            rows = row_count(result)
+    timings.sort()
+    return {
+        "iterations": len(timings),
+        "rows_first_call": rows,
+        "min_ms": 1000 * timings[0],
+        "median_ms": 1000 * statistics.median(timings),
+        "mean_ms": 1000 * statistics.fmean(timings),
+        "p95_ms": 1000 * timings[min(len(timings) - 1, int(0.95 * (len(timings) - 1) + 0.5))],
+        "max_ms": 1000 * timings[-1],
+    }
+
+def run_scale(scale, params, args):
+    db_dir, info = prepare_scale(scale, params, args.data_dir, args.seed)
+    app = use_database(db_dir, args.storage)
+    sample = Sample(app.DB_PATH, app.FEEDBACK_DB_PATH, random.Random(args.seed))
+    results = {}
+    for name, func, make_args in benchmark_cases(app, sample):
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        if not args.cached:
+            func = getattr(func, "uncached", func)
+        results[name] = run_case(func, make_args, args.time_budget, args.min_iterations, args.max_iterations)
+        if not args.quiet:
+            r = results[name]
+            print(f"  {name:<42}{r['median_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['iterations']:>8}{r['rows_first_call']:>9}",
+                  file=sys.stderr)
+    app.close_all_connections()
+    return {"dataset": info, "benchmarks": results}
+
+def compare(report, baseline, max_regression):
+    """Cetak rasio median terhadap baseline; kembalikan daftar benchmark yang regresi"""
+    regressions = []
+    print(f"{'skala/benchmark':<50}{'baseline':>10}{'sekarang':>10}{'rasio':>8}")
+    for scale, data in report["results"].items():
+        base_scale = baseline.get("results", {}).get(scale, {}).get("benchmarks", {})
+        for name, result in data["benchmarks"].items():
+            if name not in base_scale:
+                continue
+            before, after = base_scale[name]["median_ms"], result["median_ms"]
+            ratio = after / before if before else float("inf")
+            flag = " <-- REGRESI" if max_regression and ratio > max_regression else ""
+            print(f"{scale + '/' + name:<50}{before:>10.3f}{after:>10.3f}{ratio:>8.2f}{flag}")
+            if flag:
+                regressions.append(f"{scale}/{name}")
+    return regressions
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1k", help=f"daftar skala dipisah koma ({', '.join(SCALES)})")
+    parser.add_argument("--data-dir", help="simpan dataset di sini dan pakai ulang (default: direktori sementara)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", action="append", help="hanya benchmark yang namanya mengandung teks ini (boleh berulang)")
+    parser.add_argument("--cached", action="store_true", help="ukur lewat query cache (default: query langsung)")
+    parser.add_argument("--storage", choices=("sqlite", "memory"), default="sqlite",
+                        help="backend storage app (memory: dataset dimuat ke RAM sebelum diukur)")
+    parser.add_argument("--time-budget", type=float, default=1.0, help="detik per benchmark")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--max-iterations", type=int, default=2000)
+    parser.add_argument("--json", dest="json_path", help="tulis hasil JSON ke path ini ('-' untuk stdout)")
+    parser.add_argument("--compare", help="file JSON hasil run sebelumnya sebagai baseline")
+    parser.add_argument("--max-regression", type=float, help="exit 1 jika median lebih lambat dari baseline x rasio ini")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"skala tidak dikenal: {', '.join(unknown)}")
+    temp_dir = None
+    if not args.data_dir:
+        temp_dir = args.data_dir = tempfile.mkdtemp(prefix="elearning-bench-")
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cached": args.cached,
+            "storage": args.storage,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    try:
+        for scale in scales:
+            if not args.quiet:
+                print(f"[{scale}] {'benchmark':<40}{'median ms':>10}{'p95 ms':>10}{'iter':>8}{'rows':>9}", file=sys.stderr)
+            report["results"][scale] = run_scale(scale, SCALES[scale], args)
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"GAGAL: {len(regressions)} benchmark regresi", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Export gradebook dari database.db ke CSV/Parquet untuk job terjadwal.
+
+Baris di-stream dari database per potongan tetap, jadi memori tetap datar
+berapa pun jumlah jawaban.
+
+Contoh:
+    python export_gradebook.py --out nilai.csv
+    python export_gradebook.py --format parquet --mata-kuliah Kalkulus --status submitted --out kalkulus.parquet
+    python export_gradebook.py --from 2025-01-01 --to 2025-06-30 --include-answer --out semester.csv
+"""
+import argparse
+import sys
+import time
+
+import streamlit.config
+import streamlit.logger
+
+# app.py dipakai di luar `streamlit run`; peringatan "bare mode" tidak relevan di sini
+streamlit.config.set_option("global.showWarningOnDirectExecution", False)
+streamlit.logger.set_log_level("error")
+
+def main(argv=None):
+    import app
+    streamlit.logger.set_log_level("error")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="path file hasil")
+    parser.add_argument("--format", choices=app.GRADEBOOK_FORMATS,
+                        help="default: dari ekstensi --out (.parquet), selain itu csv")
+    parser.add_argument("--db", default=app.DB_PATH, help=f"database utama (default: {app.DB_PATH})")
+    parser.add_argument("--mata-kuliah")
+    parser.add_argument("--task-id", type=int)
+    parser.add_argument("--status", choices=("submitted", "draft"))
+    parser.add_argument("--from", dest="date_from", help="tanggal submit awal (YYYY-MM-DD, inklusif)")
+    parser.add_argument("--to", dest="date_to", help="tanggal submit akhir (YYYY-MM-DD, inklusif)")
+    parser.add_argument("--include-answer", action="store_true", help="sertakan teks jawaban")
+    parser.add_argument("--chunk-rows", type=int, default=app.GRADEBOOK_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    app.DB_PATH = args.db
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "csv")
+    started = time.perf_counter()
+    total = app.write_gradebook(
+        args.out, fmt, args.include_answer, args.chunk_rows,
+        mata_kuliah=args.mata_kuliah, task_id=args.task_id, status=args.status,
+        date_from=args.date_from, date_to=args.date_to,
+    )
+    print(f"{total} baris ditulis ke {args.out} ({fmt}) dalam {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Load test lonjakan deadline untuk data layer app.py.
+
+Menjalankan fungsi data layer asli (get_or_create_answer, save_answer_draft,
+finalize_answer, get_answers_for_task, update_answer_scores) dari banyak thread (dan opsional banyak
+proses) terhadap database sementara, lalu melaporkan throughput, latensi
+p50/p95/p99 per operasi, dan jumlah error "database is locked".
+
+Contoh:
+    python loadtest.py --students 500 --tasks 5 --threads 32 --duration 30
+    python loadtest.py --processes 4 --threads 16 --mix open=2,draft=5,submit=1,grade=1 --json hasil.json
+    python loadtest.py --max-lock-errors 0 --max-p99-ms 250   # exit code 1 jika melewati batas
+    python loadtest.py --storage memory --threads 32           # tanpa I/O disk (satu proses)
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import streamlit.config
+import streamlit.logger
+
+# app.py dipakai di luar `streamlit run`; peringatan "bare mode" tidak relevan di sini
+streamlit.config.set_option("global.showWarningOnDirectExecution", False)
+streamlit.logger.set_log_level("error")
+
+DEFAULT_MIX = "open=2,draft=5,submit=1,grade=1"
+OPERATIONS = ("open", "draft", "submit", "grade")
+# Operasi grade: dosen membuka jawaban submitted satu tugas lalu menilai sebanyak ini sekaligus
+GRADE_BATCH_SIZE = 10
+ERROR_SAMPLE_LIMIT = 5
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"operasi tidak dikenal: {name!r} (pilihan: {', '.join(OPERATIONS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+def use_database(db_dir, storage="sqlite"):
+    """Arahkan app ke database di db_dir (dipanggil di setiap proses)"""
+    import app
+    streamlit.logger.set_log_level("error")
+    app.STORAGE_BACKEND = storage
+    app.DB_PATH = os.path.join(db_dir, "database.db")
+    app.FEEDBACK_DB_PATH = os.path.join(db_dir, "feedback.db")
+    app.bootstrap()
+    return app
+
+def prepare_database(db_dir, students, tasks, storage):
+    app = use_database(db_dir, storage)
+    app.insert_new_users([(f"mhs{i:06d}", "pw", "student", f"Mahasiswa {i}", "Teknik Informatika", "")
+                          for i in range(students)])
+    app.add_user("dosen_lt", "pw", "lecturer", "Dosen Load Test", "", "Load Test")
+    for i in range(tasks):
+        app.add_task(f"Tugas {i + 1}", "Soal load test", "Load Test", ["Semua Jurusan"], "Dosen Load Test")
+    student_ids = [row[0] for row in app.list_users() if row[2] == "student" and row[1].startswith("mhs")]
+    task_ids = [row[0] for row in app.get_all_tasks_by_lecturer("Load Test")]
+    return student_ids, task_ids
+
+def is_lock_error(exc):
+    return isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc)
+
+def run_worker_process(db_dir, student_ids, task_ids, mix, threads, duration, seed, storage="sqlite"):
+    """Jalankan `threads` thread beban selama `duration` detik; kembalikan sampel mentah"""
+    app = use_database(db_dir, storage)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+    results = {name: [] for name in OPERATIONS}
+    errors = {"lock": 0, "queue_full": 0, "other": 0}
+    error_samples = []
+    lock = threading.Lock()
+
+    def worker(worker_seed):
+        rng = random.Random(worker_seed)
+        local = {name: [] for name in OPERATIONS}
+        local_errors = {"lock": 0, "queue_full": 0, "other": 0}
+        local_samples = []
+        while time.perf_counter() < deadline:
+            op = rng.choices(names, weights)[0]
+            user_id = rng.choice(student_ids)
+            task_id = rng.choice(task_ids)
+            started = time.perf_counter()
+            try:
+                if op == "open":
+                    app.get_or_create_answer(user_id, f"mhs{user_id}", task_id)
+                elif op == "draft":
+                    answer_id = app.get_or_create_answer(user_id, f"mhs{user_id}", task_id)[0]
+                    app.save_answer_draft(answer_id, f"draft {rng.random()} " * 20)
+                elif op == "submit":
+                    answer_id = app.get_or_create_answer(user_id, f"mhs{user_id}", task_id)[0]
+                    app.save_answer_draft(answer_id, f"jawaban akhir {rng.random()} " * 20)
+                    app.finalize_answer(answer_id)
+                else:
+                    submitted = app.get_answers_for_task(task_id)
+                    graded = rng.sample(submitted, min(GRADE_BATCH_SIZE, len(submitted)))
+                    app.update_answer_scores([(row[0], rng.randint(0, 100), "dinilai load test") for row in graded])
+            except app.WriteQueueFull:
+                local_errors["queue_full"] += 1
+                continue
+            except Exception as exc:
+                local_errors["lock" if is_lock_error(exc) else "other"] += 1
+                if len(local_samples) < ERROR_SAMPLE_LIMIT:
+                    local_samples.append(f"{op}: {type(exc).__name__}: {exc}")
+                continue
+            local[op].append(time.perf_counter() - started)
+        with lock:
+            for name in OPERATIONS:
+                results[name].extend(local[name])
+            for name in errors:
+                errors[name] += local_errors[name]
+            error_samples.extend(local_samples[:ERROR_SAMPLE_LIMIT - len(error_samples)])
+
+    workers = [threading.Thread(target=worker, args=(seed * 1000 + i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    app.draft_buffer.flush()
+    elapsed = time.perf_counter() - started
+    return {"latencies": results, "errors": errors, "error_samples": error_samples, "elapsed": elapsed}
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(p * (len(sorted_values) - 1))))]
+
+def summarize(parts):
+    elapsed = max(part["elapsed"] for part in parts)
+    latencies = {name: [] for name in OPERATIONS}
+    errors = {"lock": 0, "queue_full": 0, "other": 0}
+    error_samples = []
+    for part in parts:
+        for name in OPERATIONS:
+            latencies[name].extend(part["latencies"][name])
+        for name in errors:
+            errors[name] += part["errors"][name]
+        error_samples.extend(part["error_samples"])
+    report = {"elapsed_seconds": elapsed, "operations": {}, "errors": errors, "error_samples": error_samples[:ERROR_SAMPLE_LIMIT]}
+    all_latencies = []
+    for name, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        all_latencies.extend(values)
+        report["operations"][name] = {
+            "count": len(values),
+            "throughput_per_s": len(values) / elapsed,
+            "p50_ms": 1000 * percentile(values, 0.50),
+            "p95_ms": 1000 * percentile(values, 0.95),
+            "p99_ms": 1000 * percentile(values, 0.99),
+            "max_ms": 1000 * values[-1],
+        }
+    all_latencies.sort()
+    report["total"] = {
+        "count": len(all_latencies),
+        "throughput_per_s": len(all_latencies) / elapsed,
+        "p50_ms": 1000 * percentile(all_latencies, 0.50),
+        "p95_ms": 1000 * percentile(all_latencies, 0.95),
+        "p99_ms": 1000 * percentile(all_latencies, 0.99),
+        "max_ms": 1000 * all_latencies[-1] if all_latencies else 0.0,
+    }
+    return report
+
+def print_report(report, config):
+    print(f"Load test: {config['processes']} proses x {config['threads']} thread, "
+          f"{config['students']} mahasiswa, {config['tasks']} tugas, {report['elapsed_seconds']:.1f} s")
+    print(f"{'operasi':<10}{'jumlah':>10}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, row in list(report["operations"].items()) + [("TOTAL", report["total"])]:
+        print(f"{name:<10}{row['count']:>10}{row['throughput_per_s']:>10.1f}{row['p50_ms']:>10.2f}"
+              f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['max_ms']:>10.2f}")
+    errors = report["errors"]
+    print(f"error: database locked={errors['lock']}, antrean penuh={errors['queue_full']}, lain={errors['other']}")
+    for sample in report["error_samples"]:
+        print(f"  {sample}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=16, help="thread per proses")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0, help="lama beban dalam detik")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"bobot operasi, default {DEFAULT_MIX}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--storage", choices=("sqlite", "memory"), default="sqlite",
+                        help="backend storage app (memory hanya bisa dengan --processes 1)")
+    parser.add_argument("--db-dir", help="direktori database (default: direktori sementara yang dihapus setelahnya)")
+    parser.add_argument("--json", dest="json_path", help="tulis laporan JSON ke path ini ('-' untuk stdout)")
+    parser.add_argument("--max-lock-errors", type=int, help="gagal (exit 1) jika error locked melebihi angka ini")
+    parser.add_argument("--max-p99-ms", type=float, help="gagal (exit 1) jika p99 total melebihi angka ini")
+    args = parser.parse_args(argv)
+    if args.storage == "memory" and args.processes != 1:
+        parser.error("--storage memory tidak dibagi antar-proses; pakai --processes 1")
+
+    db_dir = args.db_dir or tempfile.mkdtemp(prefix="elearning-loadtest-")
+    try:
+        student_ids, task_ids = prepare_database(db_dir, args.students, args.tasks, args.storage)
+        if args.processes == 1:
+            parts = [run_worker_process(db_dir, student_ids, task_ids, args.mix, args.threads, args.duration, args.seed,
+                                        args.storage)]
+        else:
+            with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+                parts = pool.starmap(run_worker_process, [
+                    (db_dir, student_ids, task_ids, args.mix, args.threads, args.duration, args.seed + i)
+                    for i in range(args.processes)
+                ])
+    finally:
+        if not args.db_dir:
+            shutil.rmtree(db_dir, ignore_errors=True)
+
+    report = summarize(parts)
+    config = {key: value for key, value in vars(args).items() if key != "json_path"}
+    report["config"] = config
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report, config)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    failed = False
+    if args.max_lock_errors is not None and report["errors"]["lock"] > args.max_lock_errors:
+        print(f"GAGAL: {report['errors']['lock']} error locked > {args.max_lock_errors}", file=sys.stderr)
+        failed = True
+    if args.max_p99_ms is not None and report["total"]["p99_ms"] > args.max_p99_ms:
+        print(f"GAGAL: p99 {report['total']['p99_ms']:.1f} ms > {args.max_p99_ms} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
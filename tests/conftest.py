@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def use_storage(tmp_path, monkeypatch):
+    """Pindahkan app ke database baru di tmp_path untuk backend tertentu; kembalikan path-nya"""
+    def use(backend="sqlite", name=None):
+        app.draft_buffer.flush()
+        app.close_all_connections()
+        directory = tmp_path / (name or backend)
+        directory.mkdir(exist_ok=True)
+        monkeypatch.setattr(app, "STORAGE_BACKEND", backend)
+        monkeypatch.setattr(app, "DB_PATH", str(directory / "database.db"))
+        monkeypatch.setattr(app, "FEEDBACK_DB_PATH", str(directory / "feedback.db"))
+        app.bootstrap()
+        return directory
+    yield use
+    app.draft_buffer.flush()
+    app.close_all_connections()
@@ -0,0 +1,201 @@
+import json
+
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+
+import api
+import app
+
+TOKEN = "rahasia"
+
+
+class ApiTestCase(AsyncHTTPTestCase):
+    @pytest.fixture(autouse=True)
+    def seeded_storage(self, use_storage):
+        use_storage("sqlite")
+        app.add_user("budi", "pw", "student", "Budi", "Teknik Informatika", "")
+        app.add_user("sari", "pw", "student", "Sari", "Sistem Informasi", "")
+        app.add_user("dosen", "pw", "lecturer", "Dosen", "", "Matematika")
+        self.student_id, self.other_student_id, self.lecturer_id = (
+            app.get_user_by_credentials(username, "pw")[0] for username in ("budi", "sari", "dosen")
+        )
+        self.task_id = app.add_tasks([("Tugas 1", "soal", "Matematika", ["Semua Jurusan"], "Dosen", None)])[0]
+
+    def get_app(self):
+        return api.make_app(TOKEN, workers=2)
+
+    def request(self, method, path, body=None, token=TOKEN):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if body is None and method in ("POST", "PUT", "PATCH"):
+            body = "{}"
+        response = self.fetch(api.API_PREFIX + path, method=method, headers=headers, body=body,
+                              allow_nonstandard_methods=True)
+        data = json.loads(response.body) if response.body and response.code != 204 else None
+        return response.code, data
+
+    def answer_for(self, user_id):
+        code, answer = self.request("POST", "/answers", {"user_id": user_id, "task_id": self.task_id})
+        assert code == 201, answer
+        return answer
+
+
+class TestAuth(ApiTestCase):
+    def test_missing_or_wrong_token_is_rejected(self):
+        for token in (None, "salah", TOKEN + "x"):
+            code, data = self.request("GET", "/users", token=token)
+            assert code == 401
+            assert data == {"error": "token tidak valid"}
+
+    def test_valid_token(self):
+        code, data = self.request("GET", "/health")
+        assert code == 200
+        assert data["storage"] == "sqlite"
+
+
+class TestValidation(ApiTestCase):
+    def assert_400(self, method, path, body=None):
+        code, data = self.request(method, path, body)
+        assert code == 400, (path, body, code, data)
+        assert data["error"]
+        return data["error"]
+
+    def test_malformed_bodies_and_arguments(self):
+        self.assert_400("POST", "/users", "{bukan json")
+        self.assert_400("POST", "/users", "[1, 2]")
+        self.assert_400("POST", "/tasks", {"tasks": "bukan list"})
+        self.assert_400("POST", "/tasks", {"tasks": [{"title": "", "description": "d", "mata_kuliah": "M",
+                                                       "target_jurusan": ["TI"]}]})
+        self.assert_400("POST", "/tasks", {"tasks": [{"title": "t", "description": "d", "mata_kuliah": "M",
+                                                       "target_jurusan": "TI"}]})
+        self.assert_400("PATCH", f"/tasks/{self.task_id}", {"deadline": "besok"})
+        self.assert_400("GET", "/users?cursor=%5B1%5D")
+        self.assert_400("GET", "/answers?status=lain")
+        self.assert_400("GET", "/gradebook?from=kemarin")
+        self.assert_400("GET", "/gradebook?format=xlsx")
+
+    def test_user_patch_validates_each_field(self):
+        path = f"/users/{self.student_id}"
+        assert "role" in self.assert_400("PATCH", path, {"role": "superuser"})
+        assert "role" in self.assert_400("PATCH", path, {"role": "lecturer"})
+        assert "password" in self.assert_400("PATCH", path, {"password": ""})
+        assert "password" in self.assert_400("PATCH", path, {"password": 1234})
+        assert "nickname" in self.assert_400("PATCH", path, {"nickname": ["Budi"]})
+        assert "username" in self.assert_400("PATCH", path, {"username": "  "})
+        assert "mata_kuliah" in self.assert_400("PATCH", path, {"mata_kuliah": "Fisika"})
+        assert "jurusan" in self.assert_400("PATCH", f"/users/{self.lecturer_id}", {"jurusan": "Teknik Informatika"})
+        assert "password" in self.assert_400("PATCH", "/users", {"users": [{"id": self.student_id, "password": "x"}]})
+        assert "role" in self.assert_400("PATCH", "/users", {"users": [{"id": self.student_id, "role": "admin"}]})
+        # Tidak ada yang tersimpan dari permintaan yang ditolak
+        assert app.get_user_by_id.uncached(self.student_id) == (
+            self.student_id, "budi", "student", "Budi", "Teknik Informatika", "")
+        assert app.get_user_by_credentials("budi", "pw") is not None
+
+    def test_user_patch_applies_valid_changes(self):
+        code, data = self.request("PATCH", f"/users/{self.student_id}",
+                                  {"role": "student", "nickname": "Budi S", "jurusan": "Sistem Informasi",
+                                   "password": "baru123"})
+        assert code == 200
+        assert data == {"id": self.student_id, "username": "budi", "role": "student", "nickname": "Budi S",
+                        "jurusan": "Sistem Informasi", "mata_kuliah": ""}
+        assert app.get_user_by_credentials("budi", "baru123") is not None
+        code, data = self.request("PATCH", "/users", {"users": [{"id": self.lecturer_id, "mata_kuliah": "Fisika"}]})
+        assert (code, data) == (200, {"updated": 1})
+        code, _ = self.request("PATCH", f"/users/{self.student_id}", {"username": "sari"})
+        assert code == 409
+
+    def test_answer_bodies(self):
+        self.assert_400("POST", "/answers", {"user_id": "1", "task_id": self.task_id})
+        self.assert_400("POST", "/answers", {"user_id": self.lecturer_id, "task_id": self.task_id})
+        answer = self.answer_for(self.student_id)
+        self.assert_400("PUT", f"/answers/{answer['id']}/draft", {"answer": "   "})
+        self.assert_400("POST", f"/answers/{answer['id']}/submit", {"answer": 5})
+
+    def test_score_bodies(self):
+        answer = self.answer_for(self.student_id)
+        self.assert_400("PUT", f"/answers/{answer['id']}/score", {"score": 101})
+        self.assert_400("PUT", f"/answers/{answer['id']}/score", {"score": True})
+        self.assert_400("POST", "/scores", {"grades": [{"answer_id": answer["id"], "score": "90"}]})
+        self.assert_400("POST", "/scores", {"grades": [{"score": 90}]})
+
+
+class TestNotFound(ApiTestCase):
+    def test_missing_resources(self):
+        for method, path, body in (
+            ("GET", "/users/999", None),
+            ("PATCH", "/users/999", {"nickname": "x"}),
+            ("PATCH", "/users", {"users": [{"id": 999, "nickname": "x"}]}),
+            ("GET", "/tasks/999", None),
+            ("PATCH", "/tasks/999", {"title": "x"}),
+            ("GET", "/materials/999", None),
+            ("PATCH", "/materials/999", {"title": "x"}),
+            ("GET", "/answers/999", None),
+            ("PUT", "/answers/999/score", {"score": 90}),
+            ("PUT", "/answers/999/draft", {"answer": "x"}),
+            ("POST", "/answers/999/submit", None),
+            ("POST", "/answers", {"user_id": 999, "task_id": self.task_id}),
+            ("POST", "/answers", {"user_id": self.student_id, "task_id": 999}),
+        ):
+            code, data = self.request(method, path, body)
+            assert code == 404, (method, path, code, data)
+            assert data["error"]
+
+    def test_unknown_route(self):
+        response = self.fetch(api.API_PREFIX + "/tidak-ada", headers={"Authorization": f"Bearer {TOKEN}"})
+        assert response.code == 404
+
+
+class TestAnswers(ApiTestCase):
+    def test_create_save_draft_and_submit(self):
+        answer = self.answer_for(self.student_id)
+        assert (answer["status"], answer["answer"], answer["username"]) == ("draft", "", "budi")
+        code, again = self.request("POST", "/answers", {"user_id": self.student_id, "task_id": self.task_id})
+        assert (code, again["id"]) == (200, answer["id"])
+
+        code, data = self.request("PUT", f"/answers/{answer['id']}/draft", {"answer": "draft pertama"})
+        assert (code, data) == (202, {"id": answer["id"], "status": "draft", "answer": "draft pertama"})
+        code, data = self.request("PUT", f"/answers/{answer['id']}/draft", {"answer": "draft kedua"})
+        assert code == 202
+
+        # Submit tanpa body menulis draft yang masih di buffer lebih dulu
+        code, data = self.request("POST", f"/answers/{answer['id']}/submit")
+        assert code == 200
+        assert (data["status"], data["answer"]) == ("submitted", "draft kedua")
+        assert data["finalized_at"]
+
+        code, _ = self.request("PUT", f"/answers/{answer['id']}/draft", {"answer": "terlambat"})
+        assert code == 409
+        code, _ = self.request("POST", f"/answers/{answer['id']}/submit", {"answer": "terlambat"})
+        assert code == 409
+        assert self.request("GET", f"/answers/{answer['id']}")[1]["answer"] == "draft kedua"
+
+    def test_submit_with_answer_text(self):
+        answer = self.answer_for(self.student_id)
+        code, data = self.request("POST", f"/answers/{answer['id']}/submit", {"answer": "langsung submit"})
+        assert code == 200
+        assert (data["status"], data["answer"]) == ("submitted", "langsung submit")
+
+
+class TestScores(ApiTestCase):
+    def test_bulk_scoring_counts_only_existing_answers(self):
+        first = self.answer_for(self.student_id)
+        second = self.answer_for(self.other_student_id)
+        code, data = self.request("POST", "/scores", {"grades": [
+            {"answer_id": first["id"], "score": 90, "feedback": "bagus"},
+            {"answer_id": second["id"], "score": 0},
+            {"answer_id": 999, "score": 50},
+        ]})
+        assert (code, data) == (200, {"updated": 2})
+        assert self.request("GET", f"/answers/{first['id']}")[1]["score"] == 90
+        assert self.request("GET", f"/answers/{first['id']}")[1]["feedback"] == "bagus"
+        assert self.request("GET", f"/answers/{second['id']}")[1]["score"] == 0
+
+    def test_empty_batch(self):
+        assert self.request("POST", "/scores", {"grades": []}) == (200, {"updated": 0})
+
+    def test_single_score(self):
+        answer = self.answer_for(self.student_id)
+        code, data = self.request("PUT", f"/answers/{answer['id']}/score", {"score": 75, "feedback": "ok"})
+        assert code == 200
+        assert (data["score"], data["feedback"]) == (75, "ok")
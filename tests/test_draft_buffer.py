@@ -0,0 +1,76 @@
+import pytest
+
+import app
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def buffer(request, use_storage, monkeypatch):
+    """DraftWriteBuffer baru (flush latar praktis tidak pernah jalan) yang mencatat setiap tulisan"""
+    use_storage(request.param)
+    buffer = app.DraftWriteBuffer(flush_interval=3600)
+    monkeypatch.setattr(app, "draft_buffer", buffer)
+    buffer.writes = []
+    write_answer_drafts = app.write_answer_drafts
+    def recording_write(db_path, drafts):
+        buffer.writes.append(list(drafts))
+        return write_answer_drafts(db_path, drafts)
+    monkeypatch.setattr(app, "write_answer_drafts", recording_write)
+    return buffer
+
+
+@pytest.fixture
+def answer():
+    """(user_id, task_id, answer_id) untuk draft kosong baru"""
+    app.add_user("budi", "pw", "student", "Budi", "Teknik Informatika", "")
+    app.add_task("Tugas 1", "soal", "Matematika", ["Semua Jurusan"], "Dosen")
+    user_id = app.get_user_by_credentials("budi", "pw")[0]
+    task_id = app.get_all_tasks()[0][0]
+    return user_id, task_id, app.get_or_create_answer(user_id, "budi", task_id)[0]
+
+
+def stored(user_id, task_id):
+    """(answer, status) langsung dari backend, tanpa buffer"""
+    return app.get_user_task_answer(user_id, task_id)[1:3]
+
+
+def test_repeated_saves_coalesce_into_one_write(buffer, answer):
+    user_id, task_id, answer_id = answer
+    for text in ("satu", "dua", "tiga"):
+        app.save_answer_draft(answer_id, text)
+    assert buffer.writes == []
+    assert stored(user_id, task_id) == ("", "draft")
+    # Read-your-writes sebelum flush
+    assert app.get_or_create_answer(user_id, "budi", task_id)[1] == "tiga"
+    assert app.get_answers_for_user_tasks(user_id, "Matematika")[task_id][1] == "tiga"
+
+    assert buffer.flush() == 1
+    assert [[(text, aid) for text, _, aid in drafts] for drafts in buffer.writes] == [[("tiga", answer_id)]]
+    stats = buffer.stats()
+    assert (stats["enqueued"], stats["coalesced"], stats["flushes"], stats["flushed_rows"]) == (3, 2, 1, 1)
+    assert stored(user_id, task_id) == ("tiga", "draft")
+    assert buffer.flush() == 0
+
+
+def test_finalize_flushes_pending_draft_first(buffer, answer):
+    user_id, task_id, answer_id = answer
+    app.save_answer_draft(answer_id, "jawaban akhir")
+    app.finalize_answer(answer_id)
+    assert len(buffer.writes) == 1
+    assert buffer.stats()["queue_depth"] == 0
+    assert stored(user_id, task_id) == ("jawaban akhir", "submitted")
+
+
+def test_pending_text_only_overlays_drafts(buffer, answer):
+    user_id, task_id, answer_id = answer
+    app.save_answer_draft(answer_id, "tersimpan")
+    buffer.flush()
+    # Draft baru masih di buffer saat jawaban di-submit lewat jalur lain
+    app.save_answer_draft(answer_id, "belum di-flush")
+    app.submit_answer(answer_id)
+
+    answers = app.get_answers_for_user_tasks(user_id, "Matematika")
+    assert answers[task_id][1:3] == ("tersimpan", "submitted")
+    assert app.get_or_create_answer(user_id, "budi", task_id)[1:3] == ("tersimpan", "submitted")
+    # Flush berikutnya juga tidak mengubah jawaban submitted
+    buffer.flush()
+    assert stored(user_id, task_id) == ("tersimpan", "submitted")
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+import app
+
+# (id, task_id, user_id, answer, score, status)
+BASELINE_ANSWERS = [
+    (1, 1, 2, "draft lama", None, "draft"),
+    (2, 1, 2, "submitted belum dinilai", None, "submitted"),
+    (3, 1, 2, "submitted dinilai", 85, "submitted"),
+    (4, 2, 2, "draft", None, "draft"),
+    (5, 2, 2, "submitted", None, "submitted"),
+    (6, 1, 3, "draft pertama", None, "draft"),
+    (7, 1, 3, "draft kedua", None, "draft"),
+    (8, 2, 3, "satu-satunya", 70, "submitted"),
+]
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """Database versi awal (skema dasar, user_version 0) berisi jawaban ganda per (user, task)"""
+    directory = tmp_path / "sqlite"
+    directory.mkdir()
+    conn = sqlite3.connect(directory / "database.db")
+    with conn:
+        app._migration_base_schema(conn)
+        conn.executemany("INSERT INTO users(id, username, password, role) VALUES (?, ?, 'pw', 'student')",
+                         [(2, "budi"), (3, "sari")])
+        conn.executemany("INSERT INTO tasks(id, title, mata_kuliah, target_jurusan) VALUES (?, ?, 'Matematika', '[]')",
+                         [(1, "Tugas 1"), (2, "Tugas 2")])
+        conn.executemany("""
+            INSERT INTO answers(id, task_id, user_id, username, answer, score, status, submitted_at)
+            VALUES (?, ?, ?, 'x', ?, ?, ?, '2026-01-01T00:00:00')
+        """, BASELINE_ANSWERS)
+    conn.close()
+    return directory
+
+
+def test_duplicate_answers_are_archived_not_deleted(baseline_db, use_storage):
+    use_storage("sqlite")
+    with app.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(app.MIGRATIONS)
+        kept = conn.execute("SELECT id, answer, score, status FROM answers ORDER BY id").fetchall()
+        archived = conn.execute("""
+            SELECT id, task_id, user_id, answer, score, status, kept_answer_id, archived_at IS NOT NULL
+            FROM answers_duplicates ORDER BY id
+        """).fetchall()
+    # Yang dinilai menang atas yang submitted, submitted atas draft, lalu id terkecil
+    assert kept == [
+        (3, "submitted dinilai", 85, "submitted"),
+        (5, "submitted", None, "submitted"),
+        (6, "draft pertama", None, "draft"),
+        (8, "satu-satunya", 70, "submitted"),
+    ]
+    assert archived == [
+        (1, 1, 2, "draft lama", None, "draft", 3, 1),
+        (2, 1, 2, "submitted belum dinilai", None, "submitted", 3, 1),
+        (4, 2, 2, "draft", None, "draft", 5, 1),
+        (7, 1, 3, "draft kedua", None, "draft", 6, 1),
+    ]
+    assert app.get_user_task_answer(2, 1)[0] == 3
+
+
+def test_answer_index_is_unique_after_migration(baseline_db, use_storage):
+    use_storage("sqlite")
+    with pytest.raises(sqlite3.IntegrityError):
+        with app.db_transaction() as conn:
+            conn.execute("INSERT INTO answers(task_id, user_id, username, answer) VALUES (1, 2, 'budi', 'lagi')")
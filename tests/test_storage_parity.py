@@ -0,0 +1,329 @@
+"""Paritas backend: setiap helper di STORAGE_HELPERS dijalankan pada SQLiteStorage
+dan MemoryStorage atas data yang sama, lalu hasilnya dibandingkan."""
+import re
+
+import pandas as pd
+import pytest
+
+import app
+
+TIMESTAMP = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d+)?")
+
+USERS = [
+    ("budi1", "student", "Budi Santoso", "Teknik Informatika"),
+    ("budiman", "student", "budiman", "Sistem Informasi"),
+    ("elan", "student", "Élan", ""),
+    ("sari", "student", "Sari", "Teknik Informatika"),
+    ("mi1", "student", "Mahasiswa MI", "Manajemen Informatika"),
+]
+
+TASKS = [
+    ("Aljabar Linear", "matriks dan vektor aljabar", "Matematika", ["Teknik Informatika"], "Dosen", "2026-12-01"),
+    ("Kalkulus", "turunan café linear", "Matematika", ["Semua Jurusan"], "Dosen", None),
+    ("Sel", "biologi aljabar", "Biologi", ["Sistem Informasi", "Teknik Informatika", "Sistem Informasi"], "Dosen", ""),
+    ("Kimia Dasar", "atom", "Kimia", ["Manajemen Informatika"], "Dosen", "2026-01-01"),
+    ("Statistika", "aljabar aljabar aljabar peluang", "Matematika", ["Sistem Informasi"], "Dosen", None),
+]
+
+MATERIALS = [
+    ("Modul aljabar", "http://a", "Matematika", ["Sistem Informasi"], "Dosen"),
+    ("Catatan café", None, "Biologi", ["Semua Jurusan"], "Dosen"),
+    ("Ringkasan", "http://c", "Matematika", ["Semua Jurusan"], "Dosen"),
+]
+
+SEARCH_TEXTS = ("aljabar", "alj", "linear aljabar", "cafe", "café", "hello world", "", "!!")
+
+
+def normalize(value):
+    """Bentuk pembanding: timestamp disamarkan, DataFrame/float dibulatkan, set diurutkan"""
+    if isinstance(value, pd.DataFrame):
+        frame = value.round(6).astype(object).where(value.notna(), None).reset_index()
+        return [list(map(str, frame.columns))] + normalize(frame.values.tolist())
+    if isinstance(value, pd.Series):
+        return normalize(value.round(6).tolist())
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, str):
+        return TIMESTAMP.sub("<ts>", value)
+    if isinstance(value, float):
+        return None if value != value else round(value, 6)
+    return value
+
+
+class Trace:
+    """Jalankan helper lewat app (tanpa query cache) dan catat hasilnya per label"""
+
+    def __init__(self):
+        self.results = {}
+        self.called = set()
+
+    def __call__(self, label, name, *args, **kwargs):
+        func = getattr(app, name)
+        func = getattr(func, "uncached", func)
+        try:
+            result = func(*args, **kwargs)
+            if name.startswith("iter_"):
+                result = list(result)
+        except Exception as error:  # backend harus gagal dengan cara yang sama
+            result = ("error", type(error).__name__)
+        self.called.add(name)
+        assert label not in self.results, label
+        self.results[label] = normalize(result)
+        return result
+
+
+def run_reads(call, tag):
+    call(f"{tag}/list_users", "list_users")
+    call(f"{tag}/user_by_id", "get_user_by_id", 2)
+    call(f"{tag}/user_by_id/missing", "get_user_by_id", 999)
+    call(f"{tag}/user_exists", "user_exists", "budi1")
+    call(f"{tag}/user_exists/missing", "user_exists", "nope")
+    call(f"{tag}/credentials", "get_user_by_credentials", "budi1", "pw")
+    call(f"{tag}/credentials/bad", "get_user_by_credentials", "budi1", "salah")
+    call(f"{tag}/jurusan_list", "get_user_jurusan_list")
+    call(f"{tag}/user_chunks", "iter_user_chunks", 3)
+
+    # Urutan dan cursor direktori user (prefix NOCASE, filter role/jurusan)
+    for search in (None, "b", "BUDI", "é", "zz"):
+        for role in (None, "student"):
+            for jurusan in (None, "Teknik Informatika"):
+                key = f"{tag}/users/{search}/{role}/{jurusan}"
+                call(f"{key}/count", "count_users", search, role, jurusan)
+                cursor, page = None, 0
+                while True:
+                    rows, cursor = call(f"{key}/page{page}", "search_users", search, role, jurusan, cursor, 2)
+                    page += 1
+                    if cursor is None or page > 10:
+                        break
+
+    # Penargetan jurusan, termasuk "Semua Jurusan"
+    jurusan_list = ("Teknik Informatika", "Sistem Informasi", "Manajemen Informatika", "Jurusan Lain")
+    for jurusan in jurusan_list:
+        call(f"{tag}/available/{jurusan}", "get_available_mata_kuliah_for_student", jurusan)
+    for mata_kuliah in ("Matematika", "Biologi", "Kimia"):
+        for jurusan in jurusan_list:
+            call(f"{tag}/tasks/{mata_kuliah}/{jurusan}", "get_tasks_by_mata_kuliah_jurusan", mata_kuliah, jurusan)
+            call(f"{tag}/materials/{mata_kuliah}/{jurusan}", "get_materials_by_mata_kuliah_jurusan",
+                 mata_kuliah, jurusan)
+        call(f"{tag}/lecturer_tasks/{mata_kuliah}", "get_all_tasks_by_lecturer", mata_kuliah)
+        call(f"{tag}/lecturer_materials/{mata_kuliah}", "get_all_materials_by_lecturer", mata_kuliah)
+        call(f"{tag}/task_titles/{mata_kuliah}", "get_task_titles", mata_kuliah)
+        call(f"{tag}/count_tasks/{mata_kuliah}", "count_tasks", mata_kuliah)
+        call(f"{tag}/submitted/{mata_kuliah}", "get_submitted_answers_by_mata_kuliah", mata_kuliah)
+        call(f"{tag}/analytics/{mata_kuliah}", "get_course_analytics", mata_kuliah)
+        call(f"{tag}/gradebook/{mata_kuliah}", "iter_gradebook_chunks", mata_kuliah, None, None, None, None, True, 2)
+        for user_id in (2, 3, 6):
+            call(f"{tag}/user_answers/{user_id}/{mata_kuliah}", "get_answers_for_user_by_mata_kuliah",
+                 user_id, mata_kuliah)
+            call(f"{tag}/course_answers/{user_id}/{mata_kuliah}", "get_user_course_answers", user_id, mata_kuliah)
+    call(f"{tag}/all_tasks", "get_all_tasks")
+    call(f"{tag}/all_materials", "get_all_materials")
+    call(f"{tag}/task_courses", "get_task_mata_kuliah_list")
+    call(f"{tag}/count_tasks", "count_tasks")
+    call(f"{tag}/task", "get_task", 1)
+    call(f"{tag}/task/missing", "get_task", 999)
+    call(f"{tag}/material", "get_material", 1)
+    call(f"{tag}/material/missing", "get_material", 999)
+
+    # Cursor halaman tugas (mata_kuliah, id)
+    for mata_kuliah in (None, "Matematika"):
+        cursor, page = None, 0
+        while True:
+            rows, cursor = call(f"{tag}/tasks_page/{mata_kuliah}/{page}", "get_tasks_page", mata_kuliah, cursor, 2)
+            page += 1
+            if cursor is None or page > 10:
+                break
+
+    for task_id in (1, 2, 3):
+        call(f"{tag}/answers_for_task/{task_id}", "get_answers_for_task", task_id)
+        call(f"{tag}/user_task_answer/{task_id}", "get_user_task_answer", 3, task_id)
+    call(f"{tag}/all_answers", "get_all_answers")
+    call(f"{tag}/answer_detail", "get_answer_detail", 1)
+    call(f"{tag}/answer_detail/missing", "get_answer_detail", 999)
+
+    # Cursor halaman jawaban (id DESC) dengan setiap filter
+    filters = ({}, {"status": "submitted"}, {"mata_kuliah": "Matematika"}, {"username": "BUD"},
+               {"username": "b_"}, {"task_id": 1})
+    for number, filter_kwargs in enumerate(filters):
+        before_id, page = None, 0
+        while True:
+            rows, before_id = call(f"{tag}/answers_page/{number}/{page}", "get_answers_page",
+                                   before_id=before_id, limit=2, **filter_kwargs)
+            page += 1
+            if before_id is None or page > 10:
+                break
+    call(f"{tag}/gradebook/submitted", "iter_gradebook_chunks",
+         status="submitted", date_from="2000-01-01", date_to="2999-01-01")
+    call(f"{tag}/gradebook/task", "iter_gradebook_chunks", task_id=2)
+
+    call(f"{tag}/all_feedback", "get_all_feedback")
+    call(f"{tag}/feedback_counts", "get_feedback_counts", "2000-01-01")
+    for number, filter_kwargs in enumerate(({}, {"status": "open"}, {"role": "lecturer"})):
+        cursor, page = None, 0
+        while True:
+            rows, cursor = call(f"{tag}/feedback_page/{number}/{page}", "get_feedback_page",
+                                cursor=cursor, limit=2, **filter_kwargs)
+            page += 1
+            if cursor is None or page > 10:
+                break
+    call(f"{tag}/report/jurusan", "report_feedback_by_jurusan")
+    call(f"{tag}/report/mata_kuliah", "report_feedback_by_mata_kuliah")
+    for min_ungraded in (1, 2):
+        call(f"{tag}/report/ungraded/{min_ungraded}", "report_feedback_from_ungraded_students", min_ungraded)
+
+    # Peringkat pencarian (BM25 vs FTS5), scope dosen, dan offset
+    for kind in ("Tugas", "Materi", "Jawaban", "Feedback"):
+        for text in SEARCH_TEXTS:
+            call(f"{tag}/search/{kind}/{text}", "search_documents", kind, text)
+            call(f"{tag}/search/{kind}/{text}/Matematika", "search_documents", kind, text, "Matematika")
+        call(f"{tag}/search/{kind}/offset", "search_documents", kind, "aljabar", None, 1, 1)
+    call(f"{tag}/search/unknown", "search_documents", "Tidak Ada", "aljabar")
+
+
+def run_scenario(call):
+    call("create_db", "create_db")
+    call("create_feedback_db", "create_feedback_db")
+    for username, role, nickname, jurusan in USERS:
+        call(f"add_user/{username}", "add_user", username, "pw", role, nickname, jurusan, "")
+    call("add_user/dosen", "add_user", "dosen", "pw", "lecturer", "Dosen", "", "Matematika")
+    call("add_user/dosen2", "add_user", "dosen2", "pw", "lecturer", "Dosen Dua", "", "")
+    call("add_user/duplicate", "add_user", "budi1", "x")
+    call("insert_new_users", "insert_new_users", [
+        ("baru", "pwpw", "student", "", "Sistem Informasi", ""),
+        ("budi1", "pwpw", "student", "", "", ""),
+    ])
+    call("update_users_info/conflict", "update_users_info", [(2, "zz", None, None, None), (3, "sari", None, None, None)])
+    call("update_users_info", "update_users_info",
+         [(2, "", "Budi S", "Sistem Informasi", None), (4, None, None, "", None)])
+    call("update_user_password", "update_user_password", 2, "pw")
+
+    call("add_tasks", "add_tasks", TASKS)
+    call("add_materials", "add_materials", MATERIALS)
+    call("update_task", "update_task", 4, title="Kimia Lanjut", target_jurusan=["Teknik Informatika"], deadline="")
+    call("update_material", "update_material", 1, link="http://b", target_jurusan=["Manajemen Informatika"])
+    call("delete_material", "delete_material", 2)
+
+    texts = ("hello world aljabar", "café linear " * 20, "Hello")
+    for user_id, username in ((2, "budi1"), (3, "budiman"), (4, "elan"), (5, "sari")):
+        for task_id in (1, 2, 3):
+            row = call(f"create_answer_draft/{user_id}/{task_id}", "create_answer_draft", user_id, username, task_id)
+            text = texts[(user_id + task_id) % len(texts)]
+            call(f"write_answer_drafts/{user_id}/{task_id}", "write_answer_drafts",
+                 app.DB_PATH, [(text, "2026-01-01T00:00:00", row[0])])
+            if (user_id + task_id) % 3:
+                call(f"submit_answer/{user_id}/{task_id}", "submit_answer", row[0])
+    call("write_answer_drafts/submitted", "write_answer_drafts", app.DB_PATH, [("ditimpa", "2026-01-02T00:00:00", 2)])
+    call("upsert_answer_draft/new", "upsert_answer_draft", 6, "mi1", 1, "draft aljabar")
+    call("upsert_answer_draft/again", "upsert_answer_draft", 6, "mi1", 1, "draft dua")
+    call("update_answer_scores", "update_answer_scores", [(2, 90, "ok"), (3, 70, None), (999, 1, None), (5, 55, "hm")])
+
+    feedback = (
+        (2, "budi1", "student", "hello world"),
+        (3, "budiman", "student", "aljabar susah"),
+        (2, "budi1", "student", "café"),
+        (7, "dosen", "lecturer", "hello aljabar"),
+        (None, "anon", "student", "hello"),
+        (3, "budiman", "student", "world"),
+    )
+    for number, values in enumerate(feedback):
+        call(f"add_feedback/{number}", "add_feedback", *values)
+    call("mark_feedback_handled", "mark_feedback_handled", [1, 3, 3, 999])
+
+    run_reads(call, "before-delete")
+    call("delete_task", "delete_task", 2)
+    run_reads(call, "after-delete")
+
+
+@pytest.fixture
+def traces(use_storage):
+    results = {}
+    for backend in ("sqlite", "memory"):
+        use_storage(backend)
+        trace = Trace()
+        run_scenario(trace)
+        results[backend] = trace
+    return results
+
+
+def assert_same(traces, prefix=""):
+    sqlite, memory = traces["sqlite"].results, traces["memory"].results
+    assert list(sqlite) == list(memory)
+    labels = [label for label in sqlite if label.startswith(prefix)]
+    assert labels, prefix
+    mismatched = [label for label in labels if sqlite[label] != memory[label]]
+    assert not mismatched, {label: (sqlite[label], memory[label]) for label in mismatched[:5]}
+
+
+def test_every_helper_is_exercised(traces):
+    for trace in traces.values():
+        assert trace.called == set(app.STORAGE_HELPERS)
+        errors = [label for label, result in trace.results.items()
+                  if isinstance(result, list) and result[:1] == ["error"]]
+        assert errors == ["update_users_info/conflict", "before-delete/search/unknown", "after-delete/search/unknown"]
+
+
+def test_writes_agree(traces):
+    sqlite = traces["sqlite"].results
+    assert sqlite["add_user/duplicate"] is False
+    assert sqlite["update_answer_scores"] == 3
+    for label in sqlite:
+        if not label.startswith(("before-delete/", "after-delete/")):
+            assert sqlite[label] == traces["memory"].results[label], label
+
+
+def test_ordering_and_cursors_agree(traces):
+    sqlite = traces["sqlite"].results
+    # Skenario harus benar-benar melewati beberapa halaman
+    assert "before-delete/users/None/None/None/page3" in sqlite
+    assert "before-delete/answers_page/0/3" in sqlite
+    assert "before-delete/tasks_page/None/2" in sqlite
+    for prefix in ("users/", "tasks_page/", "answers_page/", "feedback_page/", "list_users",
+                   "all_tasks", "all_materials", "all_answers", "user_chunks", "gradebook/"):
+        assert_same(traces, f"before-delete/{prefix}")
+        assert_same(traces, f"after-delete/{prefix}")
+
+
+def test_search_ranking_agrees(traces):
+    # Judul berbobot lebih tinggi, lalu frekuensi kata: urutannya bukan urutan id
+    ranked = traces["sqlite"].results["before-delete/search/Tugas/aljabar"][0]
+    assert [row[1] for row in ranked] == ["Aljabar Linear", "Statistika", "Sel"]
+    assert_same(traces, "before-delete/search/")
+    assert_same(traces, "after-delete/search/")
+
+
+def test_semua_jurusan_targeting_agrees(traces):
+    sqlite = traces["sqlite"].results
+    titles = [row[1] for row in sqlite["before-delete/tasks/Matematika/Jurusan Lain"]]
+    assert titles == ["Kalkulus"]
+    assert "Matematika" in sqlite["before-delete/available/Jurusan Lain"]
+    for prefix in ("available/", "tasks/", "materials/"):
+        assert_same(traces, f"before-delete/{prefix}")
+        assert_same(traces, f"after-delete/{prefix}")
+
+
+def test_all_reads_agree(traces):
+    assert_same(traces, "before-delete/")
+    assert_same(traces, "after-delete/")
+
+
+def test_load_file_matches_source(use_storage):
+    source = use_storage("sqlite")
+    run_scenario(Trace())
+    direct = Trace()
+    run_reads(direct, "after-delete")
+
+    use_storage("memory", name="loaded")
+    storage = app.get_storage()
+    for name in ("database.db", "feedback.db"):
+        path = str(source / name)
+        target = app.DB_PATH if name == "database.db" else app.FEEDBACK_DB_PATH
+        storage.load_file(target, path)
+    app.query_cache.invalidate_all()
+    loaded = Trace()
+    run_reads(loaded, "after-delete")
+    mismatched = [label for label in direct.results if direct.results[label] != loaded.results[label]]
+    assert not mismatched, mismatched[:5]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+import app
+
+COLUMNS = ["ID", "Username", "Role", "Nickname", "Jurusan", "Mata Kuliah"]
+
+
+def directory(*rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def test_role_specific_edits_are_reported_instead_of_dropped_silently():
+    original = directory(
+        (1, "budi", "student", "Budi", "Teknik Informatika", ""),
+        (2, "dosen", "lecturer", "Dosen", "", "Matematika"),
+        (3, "admin", "admin", "Admin", "", ""),
+    )
+    edited = original.copy()
+    edited.loc[0, ["Jurusan", "Mata Kuliah"]] = ["Sistem Informasi", "Fisika"]
+    edited.loc[1, "Jurusan"] = "Teknik Informatika"
+    edited.loc[2, ["Nickname", "Mata Kuliah"]] = ["Root", "Kimia"]
+
+    changes, ignored = app.user_directory_changes(original, edited)
+
+    assert changes == [
+        (1, "budi", "Budi", "Sistem Informasi", None),
+        (3, "admin", "Root", None, None),
+    ]
+    assert ignored == [
+        ("budi", "student", "Mata Kuliah"),
+        ("dosen", "lecturer", "Jurusan"),
+        ("admin", "admin", "Mata Kuliah"),
+    ]
+
+
+def test_unchanged_directory_has_no_changes():
+    original = directory((1, "budi", "student", "Budi", "Teknik Informatika", ""))
+    assert app.user_directory_changes(original, original.copy()) == ([], [])
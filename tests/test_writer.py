@@ -0,0 +1,103 @@
+import sqlite3
+import threading
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def writer(use_storage):
+    use_storage("sqlite")
+    writer = app._get_writer(app.DB_PATH)
+    writer.execute(lambda conn: conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, text TEXT UNIQUE)"))
+    return writer
+
+
+def insert(text):
+    def operation(conn):
+        return conn.execute("INSERT INTO notes(text) VALUES (?)", (text,)).lastrowid
+    return operation
+
+
+def insert_then_fail(text):
+    def operation(conn):
+        conn.execute("INSERT INTO notes(text) VALUES (?)", (text,))
+        raise ValueError("gagal setelah insert")
+    return operation
+
+
+def hold_writer(writer):
+    """Tahan thread writer di satu operasi sampai event yang dikembalikan di-set"""
+    started, release = threading.Event(), threading.Event()
+    def operation(conn):
+        started.set()
+        release.wait(5)
+    future = writer.submit(operation)
+    assert started.wait(5)
+    return future, release
+
+
+def note_texts():
+    with app.get_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT text FROM notes ORDER BY id")]
+
+
+def test_failed_operation_only_rolls_back_its_savepoint(writer):
+    blocker, release = hold_writer(writer)
+    futures = [writer.submit(insert("a")), writer.submit(insert_then_fail("b")),
+               writer.submit(insert("a")), writer.submit(insert("c"))]
+    commits = writer.commits
+    release.set()
+    blocker.result(5)
+    assert futures[0].result(5) == 1
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[2].result(5)
+    # Insert "b" ikut di-rollback bersama savepoint-nya, jadi id 2 dipakai lagi
+    assert futures[3].result(5) == 2
+    # Satu COMMIT untuk blocker, satu lagi untuk keempat operasi yang antre bersama
+    assert writer.commits == commits + 2
+    assert note_texts() == ["a", "c"]
+
+
+class RacingWriter(app.DatabaseWriter):
+    """Writer yang thread pertamanya mati tepat setelah submit() memeriksa thread
+    tetapi sebelum operasinya masuk antrean"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.armed = threading.Event()
+        self.released = threading.Event()
+        self.crashed = False
+        self.intercept = False
+
+    def _check_external_changes(self):
+        if not self.crashed:
+            self.crashed = True
+            self.armed.wait(5)
+            raise sqlite3.OperationalError("koneksi writer putus")
+        super()._check_external_changes()
+
+    def _release(self, error):
+        super()._release(error)
+        self.released.set()
+
+    def _ensure_started(self):
+        super()._ensure_started()
+        if self.intercept:
+            self.intercept = False
+            self.armed.set()
+            self.released.wait(5)
+
+
+def test_operation_queued_while_writer_exits_still_runs(writer):
+    racing = RacingWriter(app.DB_PATH)
+    racing.start()
+    racing.intercept = True
+    try:
+        assert racing.execute(insert("setelah restart"), timeout=5) == 1
+    finally:
+        racing.stop()
+    assert note_texts() == ["setelah restart"]